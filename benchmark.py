@@ -0,0 +1,214 @@
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import integrators
+import jit
+from bodies import DoublePendulum, PendulumChain, Projectile, SimplePendulum
+from double_pendulum_ensemble import GRAVITY_REAL, DoublePendulumEnsemble
+from pendulum_wave import PendulumWave
+from physics import make_double_pendulum_rhs, make_projectile_rhs, make_simple_pendulum_rhs
+
+# --- Suíte de Benchmarks ---
+# 1. Vazão da física (passos/s) de cada núcleo (pêndulo simples, pêndulo duplo, projétil),
+#    na forma escalar (um corpo, pelo integrador genérico), no laço step_many de bodies.py
+#    (como nos scripts) e em lote (ensemble NumPy); e o step_many da corrente de 100 elos e
+#    da onda de 1001 pêndulos.
+# 2. Tempo por fase do frame (events, update, draw, flip) de cada script Pygame, rodando
+#    com o driver de vídeo "dummy" do SDL (sem janela) no modo benchmark de profiling.py.
+# Os resultados são gravados em JSON para comparar commits:
+#   python benchmark.py -o antes.json
+#   python benchmark.py -o depois.json --compare antes.json
+
+SCRIPTS = ('simple_pendulum.py', 'double_pendulum.py', 'projectile_motion.py', 'n_pendulum.py')
+BATCH_SIZE = 10000
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# --- Repete a função até somar pelo menos min_seconds; devolve segundos por chamada ---
+def time_per_call(function, min_seconds):
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds or calls < 3:
+        function()
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return elapsed / calls
+
+
+# --- Estados iniciais de cada núcleo (escalar e em lote) ---
+def kernel_cases(batch_size):
+    simple_rhs = make_simple_pendulum_rhs(5.0)
+    double_rhs = make_double_pendulum_rhs(2.0, 2.0, 1.0, 1.0)
+    projectile_rhs = make_projectile_rhs(-GRAVITY_REAL)
+    angles = np.linspace(-1.0, 1.0, batch_size)
+    return {
+        'simple_pendulum': (simple_rhs, np.array([math.radians(45), 0.0]),
+                            np.stack((angles, np.zeros(batch_size)))),
+        'double_pendulum': (double_rhs, np.array([math.radians(90), 0.0, 0.0, 0.0]),
+                            np.stack((angles + math.pi / 2, angles, np.zeros(batch_size), np.zeros(batch_size)))),
+        'projectile': (projectile_rhs, np.array([0.0, 0.5, 7.0, 7.0]),
+                       np.stack((np.zeros(batch_size), np.full(batch_size, 0.5),
+                                 10 * np.cos(angles), 10 * np.sin(angles)))),
+    }
+
+
+def benchmark_kernels(integrator_names, batch_size, min_seconds, steps_per_call=100):
+    results = {}
+    dt = 1 / 60
+    for kernel, (rhs, scalar_state, batch_state) in kernel_cases(batch_size).items():
+        for name in integrator_names:
+            stepper = integrators.get_stepper(name)
+
+            def run_steps(state):
+                def run():
+                    y = state
+                    for step_index in range(steps_per_call):
+                        y = stepper(rhs, step_index * dt, y, dt)
+                return run
+
+            scalar_seconds = time_per_call(run_steps(scalar_state), min_seconds) / steps_per_call
+            batch_seconds = time_per_call(run_steps(batch_state), min_seconds) / steps_per_call
+            results[f'{kernel}/{name}/scalar'] = {'steps_per_sec': 1 / scalar_seconds}
+            results[f'{kernel}/{name}/batch'] = {'steps_per_sec': 1 / batch_seconds,
+                                                 'member_steps_per_sec': batch_size / batch_seconds,
+                                                 'batch_size': batch_size}
+
+    # Corpos de bodies.py: n passos por chamada no laço escalar compacto
+    bodies = {
+        'simple_pendulum': lambda name: SimplePendulum(5.0, math.radians(45), integrator=name),
+        'double_pendulum': lambda name: DoublePendulum(2.0, 2.0, 1.0, 1.0, math.radians(90), integrator=name),
+        'projectile': lambda name: Projectile(0.0, 0.5, 7.0, 7.0, integrator=name),
+        'pendulum_chain_100': lambda name: PendulumChain(np.full(100, 0.04), 0.01, math.radians(60), integrator=name),
+        'pendulum_wave_1001': lambda name: PendulumWave.classic(1001, 5.0, math.radians(45), integrator=name),
+    }
+    for kernel, make_body in bodies.items():
+        for name in integrator_names:
+            body = make_body(name)
+            body.step_many(1, dt) # Com o Numba, a primeira chamada compila o laço
+            seconds = time_per_call(lambda: body.step_many(steps_per_call, dt), min_seconds) / steps_per_call
+            results[f'{kernel}/{name}/step_many'] = {'steps_per_sec': 1 / seconds}
+
+    # Caminho rápido do ensemble (Euler no lugar, sem arrays intermediários do integrador)
+    ensemble = DoublePendulumEnsemble.perturbed(90.0, 0.0, batch_size, spread_degrees=1.0, seed=0)
+    seconds = time_per_call(lambda: ensemble.run(steps_per_call, dt), min_seconds) / steps_per_call
+    results['double_pendulum/ensemble_euler/batch'] = {'steps_per_sec': 1 / seconds,
+                                                      'member_steps_per_sec': batch_size / seconds,
+                                                      'batch_size': batch_size}
+    return results
+
+
+# --- Roda um script Pygame no modo benchmark, sem janela, e lê o resumo das fases ---
+def benchmark_frames(script, frames):
+    with tempfile.TemporaryDirectory() as temporary_dir:
+        output_path = os.path.join(temporary_dir, 'frames.json')
+        environment = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy',
+                           SIM_BENCH_FRAMES=str(frames), SIM_BENCH_OUTPUT=output_path,
+                           SIM_RECORD_DIR=temporary_dir)
+        completed = subprocess.run([sys.executable, os.path.join(ROOT_DIR, script)], env=environment,
+                                   cwd=ROOT_DIR, capture_output=True, text=True)
+        if completed.returncode != 0 or not os.path.exists(output_path):
+            raise RuntimeError(f"{script} falhou no modo benchmark:\n{completed.stderr}")
+        with open(output_path) as output_file:
+            return json.load(output_file)['phases']
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_info():
+    info = {'python': platform.python_version(), 'numpy': np.__version__,
+            'platform': platform.platform(), 'machine': platform.machine()}
+    try:
+        import pygame
+        info['pygame'] = pygame.version.ver
+    except ImportError:
+        info['pygame'] = None
+    # Backend dos laços step_many (compare resultados só entre execuções com o mesmo)
+    info['jit'] = jit.BACKEND
+    info['numba'] = jit.numba.__version__ if jit.numba is not None else None
+    return info
+
+
+# --- Compara com um JSON anterior: razão > 1 significa mais rápido agora ---
+def compare(current, baseline, threshold):
+    rows = []
+    for key, values in current['kernels'].items():
+        old = baseline.get('kernels', {}).get(key)
+        if old:
+            rows.append((f'kernel {key}', values['steps_per_sec'] / old['steps_per_sec']))
+    for script, phases in current.get('frames', {}).items():
+        for phase, values in phases.items():
+            old = baseline.get('frames', {}).get(script, {}).get(phase)
+            if old and values['avg_ms'] > 0:
+                rows.append((f'frame {script} {phase}', old['avg_ms'] / values['avg_ms']))
+
+    regressions = 0
+    for label, ratio in rows:
+        flag = ''
+        if ratio < 1 - threshold:
+            flag = '  <-- REGRESSÃO'
+            regressions += 1
+        print(f'{label:60s} {ratio:6.2f}x{flag}')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de vazão da física e do tempo de frame.")
+    parser.add_argument('-o', '--output', help="Grava os resultados em JSON")
+    parser.add_argument('--compare', help="JSON anterior para comparação")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Queda relativa considerada regressão")
+    parser.add_argument('--integrators', nargs='+', default=['euler', 'rk4'], choices=list(integrators.INTEGRATORS))
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--min-seconds', type=float, default=0.5, help="Tempo mínimo de medição por caso")
+    parser.add_argument('--frames', type=int, default=600, help="Frames por script no benchmark de frame")
+    parser.add_argument('--skip-frames', action='store_true', help="Pula o benchmark de frame (Pygame)")
+    args = parser.parse_args(argv)
+
+    results = {'commit': git_commit(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'environment': environment_info()}
+
+    results['kernels'] = benchmark_kernels(args.integrators, args.batch_size, args.min_seconds)
+    for key, values in results['kernels'].items():
+        line = f"{key:45s} {values['steps_per_sec']:12.0f} passos/s"
+        if 'member_steps_per_sec' in values:
+            line += f"  {values['member_steps_per_sec']:14.0f} membro-passos/s"
+        print(line)
+
+    if not args.skip_frames:
+        results['frames'] = {}
+        for script in SCRIPTS:
+            phases = benchmark_frames(script, args.frames)
+            results['frames'][script] = phases
+            print(f"{script}: " + ', '.join(f"{phase} {values['avg_ms']:.3f}ms (p99 {values['p99_ms']:.3f})"
+                                            for phase, values in phases.items()))
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        print(f"\nComparação com {args.compare} (commit {baseline.get('commit')}):")
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
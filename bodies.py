@@ -0,0 +1,555 @@
+import math
+
+import numpy as np
+
+import integrators
+from double_pendulum_ensemble import GRAVITY_REAL
+from jit import jit
+from physics import (chain_accelerations, make_chain_pendulum_rhs, make_double_pendulum_rhs, make_projectile_rhs,
+                     make_simple_pendulum_rhs)
+
+# --- Corpos Simulados com Laço de Passos Compacto ---
+# SimplePendulum, DoublePendulum e Projectile guardam o estado em atributos float
+# (__slots__, sem dict por instância) e avançam n passos com step_many(n, dt). O laço
+# (_*_kernel) é uma função só de escalares, math e do array de trace: sem busca de
+# atributos e sem arrays NumPy ou tuplas por passo (exceto o par de acelerações do pêndulo
+# duplo), com as mesmas contas de integrators.py para 'euler', 'verlet' e 'rk4'. Com o
+# Numba instalado os laços são compilados (jit.py); sem ele rodam em Python puro, com
+# resultados iguais. 'rk45' passa pelo AdaptiveStepper, em Python.
+# PendulumChain (N elos) guarda ângulos e velocidades em arrays, alterados no lugar pelo laço.
+# trace: array (n, 1 + campos) opcional que recebe (tempo, estado) depois de cada passo.
+# Exemplo:
+#   pendulum = SimplePendulum(5.0, math.radians(45))
+#   pendulum.step_many(100000, 1 / 600)
+
+_EULER, _VERLET, _RK4, _ADAPTIVE = range(4)
+_METHODS = {'euler': _EULER, 'verlet': _VERLET, 'rk4': _RK4, 'rk45': _ADAPTIVE}
+_NO_TRACE = np.empty((0, 0)) # Trace vazio quando nada é gravado (os laços compilados pedem um array)
+
+
+class _Body:
+    __slots__ = ('time', 'integrator', '_method', '_adaptive')
+    FIELDS = ()
+
+    def set_integrator(self, name):
+        stepper = integrators.get_stepper(name) # Valida o nome
+        self.integrator = name
+        self._method = _METHODS[name]
+        # O RK45 guarda o tamanho de passo entre chamadas
+        self._adaptive = stepper if self._method == _ADAPTIVE else None
+
+    # --- Estado no formato de integrators.py (array novo) ---
+    @property
+    def state(self):
+        return np.array([getattr(self, name) for name in self.FIELDS])
+
+    @state.setter
+    def state(self, values):
+        for name, value in zip(self.FIELDS, values):
+            setattr(self, name, float(value))
+
+    # --- Tudo o que a integração precisa para continuar: (tempo, campos..., passo do RK45) ---
+    def snapshot(self):
+        h = self._adaptive.h if self._adaptive is not None else None
+        return (self.time, *(getattr(self, name) for name in self.FIELDS), math.nan if h is None else h)
+
+    def restore(self, snapshot):
+        self.time = float(snapshot[0])
+        self.state = snapshot[1:-1]
+        if self._adaptive is not None:
+            self._adaptive.h = None if math.isnan(snapshot[-1]) else float(snapshot[-1])
+
+    def step(self, dt):
+        return self.step_many(1, dt)
+
+    # --- RK45: um passo adaptativo por dt, no estado em array ---
+    def _step_adaptive(self, n, dt, trace):
+        rhs = self.derivatives()
+        state = self.state
+        t = self.time
+        for i in range(n):
+            state = self._adaptive(rhs, t, state, dt)
+            t += dt
+            if trace is not None:
+                trace[i, 0] = t
+                trace[i, 1:] = state
+        self.state = state
+        self.time = t
+        return n
+
+
+# --- Laço do pêndulo simples: devolve (ângulo, velocidade angular, tempo) ---
+@jit
+def _simple_pendulum_kernel(method, n, dt, gravity_over_length, angle, angular_velocity, t, trace, tracing):
+    sin = math.sin
+    half = dt / 2
+    sixth = dt / 6
+    for i in range(n):
+        if method == 1: # Verlet
+            angular_velocity -= gravity_over_length * sin(angle) * half
+            angle += angular_velocity * dt
+            angular_velocity -= gravity_over_length * sin(angle) * half
+        elif method == 2: # RK4
+            k1 = -gravity_over_length * sin(angle)
+            w2 = angular_velocity + k1 * half
+            k2 = -gravity_over_length * sin(angle + angular_velocity * half)
+            w3 = angular_velocity + k2 * half
+            k3 = -gravity_over_length * sin(angle + w2 * half)
+            w4 = angular_velocity + k3 * dt
+            k4 = -gravity_over_length * sin(angle + w3 * dt)
+            angle += (angular_velocity + 2 * w2 + 2 * w3 + w4) * sixth
+            angular_velocity += (k1 + 2 * k2 + 2 * k3 + k4) * sixth
+        else: # Euler semi-implícito
+            angular_velocity -= gravity_over_length * sin(angle) * dt
+            angle += angular_velocity * dt
+        t += dt
+        if tracing:
+            row = trace[i]
+            row[0] = t
+            row[1] = angle
+            row[2] = angular_velocity
+    return angle, angular_velocity, t
+
+
+# --- Pêndulo Simples: ângulo a partir da vertical (rad) e velocidade angular (rad/s) ---
+class SimplePendulum(_Body):
+    __slots__ = ('length', 'gravity', 'angle', 'angular_velocity')
+    FIELDS = ('angle', 'angular_velocity')
+
+    def __init__(self, length, angle=0.0, angular_velocity=0.0, gravity=GRAVITY_REAL, integrator='verlet'):
+        if not length > 0:
+            raise ValueError("O comprimento deve ser > 0.")
+        self.length = float(length)
+        self.gravity = float(gravity)
+        self.angle = float(angle)
+        self.angular_velocity = float(angular_velocity)
+        self.time = 0.0
+        self.set_integrator(integrator)
+
+    def derivatives(self):
+        return make_simple_pendulum_rhs(self.length, self.gravity)
+
+    def step_many(self, n, dt, trace=None):
+        if self._adaptive is not None:
+            return self._step_adaptive(n, dt, trace)
+        self.angle, self.angular_velocity, self.time = _simple_pendulum_kernel(
+            self._method, n, dt, self.gravity / self.length, self.angle, self.angular_velocity, self.time,
+            _NO_TRACE if trace is None else trace, trace is not None)
+        return n
+
+
+# --- Acelerações angulares do pêndulo duplo (escalares; mesmas contas do ensemble) ---
+@jit
+def _double_accelerations(theta1, theta2, omega1, omega2, L1, L2, M2, two_M1_plus_M2, sum_mass, g):
+    sin = math.sin
+    cos = math.cos
+    sin_delta = sin(theta1 - theta2)
+    cos_delta = cos(theta1 - theta2)
+    sin_theta2 = sin(theta2)
+    cos_theta2 = cos(theta2)
+    omega1_sq_L1 = omega1 * omega1 * L1
+    omega2_sq_L2 = omega2 * omega2 * L2
+    den = two_M1_plus_M2 - M2 * (2 * cos_delta * cos_delta - 1)
+    if den == 0:
+        den = 1e-9
+    alpha1 = (-g * two_M1_plus_M2 * sin(theta1) - M2 * g * (sin_delta * cos_theta2 - cos_delta * sin_theta2)
+              - 2 * M2 * sin_delta * (omega2_sq_L2 + omega1_sq_L1 * cos_delta)) / (L1 * den)
+    cos_theta1 = cos_delta * cos_theta2 - sin_delta * sin_theta2
+    alpha2 = (2 * sin_delta * (omega1_sq_L1 * sum_mass + g * sum_mass * cos_theta1 + omega2_sq_L2 * M2 * cos_delta)) / (L2 * den)
+    return alpha1, alpha2
+
+
+# --- Laço do pêndulo duplo: devolve (theta1, theta2, omega1, omega2, tempo) ---
+@jit
+def _double_pendulum_kernel(method, n, dt, L1, L2, M1, M2, g, theta1, theta2, omega1, omega2, t, trace, tracing):
+    accelerations = _double_accelerations
+    two_M1_plus_M2 = 2 * M1 + M2
+    sum_mass = M1 + M2
+    half = dt / 2
+    sixth = dt / 6
+    for i in range(n):
+        if method == 1: # Verlet
+            alpha1, alpha2 = accelerations(theta1, theta2, omega1, omega2, L1, L2, M2, two_M1_plus_M2, sum_mass, g)
+            omega1 += alpha1 * half
+            omega2 += alpha2 * half
+            theta1 += omega1 * dt
+            theta2 += omega2 * dt
+            alpha1, alpha2 = accelerations(theta1, theta2, omega1, omega2, L1, L2, M2, two_M1_plus_M2, sum_mass, g)
+            omega1 += alpha1 * half
+            omega2 += alpha2 * half
+        elif method == 2: # RK4
+            a1, b1 = accelerations(theta1, theta2, omega1, omega2, L1, L2, M2, two_M1_plus_M2, sum_mass, g)
+            u2 = omega1 + a1 * half
+            v2 = omega2 + b1 * half
+            a2, b2 = accelerations(theta1 + omega1 * half, theta2 + omega2 * half, u2, v2,
+                                   L1, L2, M2, two_M1_plus_M2, sum_mass, g)
+            u3 = omega1 + a2 * half
+            v3 = omega2 + b2 * half
+            a3, b3 = accelerations(theta1 + u2 * half, theta2 + v2 * half, u3, v3,
+                                   L1, L2, M2, two_M1_plus_M2, sum_mass, g)
+            u4 = omega1 + a3 * dt
+            v4 = omega2 + b3 * dt
+            a4, b4 = accelerations(theta1 + u3 * dt, theta2 + v3 * dt, u4, v4,
+                                   L1, L2, M2, two_M1_plus_M2, sum_mass, g)
+            theta1 += (omega1 + 2 * u2 + 2 * u3 + u4) * sixth
+            theta2 += (omega2 + 2 * v2 + 2 * v3 + v4) * sixth
+            omega1 += (a1 + 2 * a2 + 2 * a3 + a4) * sixth
+            omega2 += (b1 + 2 * b2 + 2 * b3 + b4) * sixth
+        else: # Euler semi-implícito
+            alpha1, alpha2 = accelerations(theta1, theta2, omega1, omega2, L1, L2, M2, two_M1_plus_M2, sum_mass, g)
+            omega1 += alpha1 * dt
+            omega2 += alpha2 * dt
+            theta1 += omega1 * dt
+            theta2 += omega2 * dt
+        t += dt
+        if tracing:
+            row = trace[i]
+            row[0] = t
+            row[1] = theta1
+            row[2] = theta2
+            row[3] = omega1
+            row[4] = omega2
+    return theta1, theta2, omega1, omega2, t
+
+
+# --- Pêndulo Duplo: ângulos a partir da vertical (rad) e velocidades angulares (rad/s) ---
+class DoublePendulum(_Body):
+    __slots__ = ('L1', 'L2', 'M1', 'M2', 'gravity', 'theta1', 'theta2', 'omega1', 'omega2')
+    FIELDS = ('theta1', 'theta2', 'omega1', 'omega2')
+
+    def __init__(self, L1, L2, M1, M2, theta1=0.0, theta2=0.0, omega1=0.0, omega2=0.0, gravity=GRAVITY_REAL,
+                 integrator='verlet'):
+        if not (L1 > 0 and L2 > 0 and M1 > 0 and M2 > 0):
+            raise ValueError("Comprimentos e massas devem ser > 0.")
+        self.L1, self.L2, self.M1, self.M2 = float(L1), float(L2), float(M1), float(M2)
+        self.gravity = float(gravity)
+        self.theta1, self.theta2 = float(theta1), float(theta2)
+        self.omega1, self.omega2 = float(omega1), float(omega2)
+        self.time = 0.0
+        self.set_integrator(integrator)
+
+    def derivatives(self):
+        return make_double_pendulum_rhs(self.L1, self.L2, self.M1, self.M2, self.gravity)
+
+    def step_many(self, n, dt, trace=None):
+        if self._adaptive is not None:
+            return self._step_adaptive(n, dt, trace)
+        self.theta1, self.theta2, self.omega1, self.omega2, self.time = _double_pendulum_kernel(
+            self._method, n, dt, self.L1, self.L2, self.M1, self.M2, self.gravity,
+            self.theta1, self.theta2, self.omega1, self.omega2, self.time,
+            _NO_TRACE if trace is None else trace, trace is not None)
+        return n
+
+
+# --- Subpassos do pêndulo de N elos para um passo dt (estabilidade) ---
+# A frequência mais alta da corrente vem das trações das hastes: a massa i sente rigidez
+# transversal |T_i| / l_i + |T_i+1| / l_i+1, e a frequência fica limitada por
+# sqrt(2 * max(rigidez / m_i)) (Gershgorin). Num chicote a ponta leve gira rápido e as
+# trações crescem muitas vezes acima do peso, então o passo fixo sozinho diverge (NaN).
+# O passo é dividido em subpassos iguais até dt * frequência / subpassos <= CHAIN_STEP_LIMIT
+# (bem abaixo dos limites de estabilidade do RK4 e do Verlet), no máximo CHAIN_MAX_SUBSTEPS
+# (um estado que diverge mesmo assim não congela o laço); com um subpasso as contas são as
+# mesmas do passo fixo. tension: trações da última chamada de chain_accelerations.
+CHAIN_STEP_LIMIT = 0.25
+CHAIN_MAX_SUBSTEPS = 256
+
+
+@jit
+def _chain_substeps(dt, tension, lengths, inverse_masses, omega):
+    links = len(tension)
+    rate_squared = 0.0
+    fastest = 0.0
+    for i in range(links):
+        stiffness = abs(tension[i]) / lengths[i]
+        if i < links - 1:
+            stiffness += abs(tension[i + 1]) / lengths[i + 1]
+        rate_squared = max(rate_squared, 2 * stiffness * inverse_masses[i])
+        fastest = max(fastest, abs(omega[i]))
+    rate = max(math.sqrt(rate_squared), fastest)
+    if not rate * dt > CHAIN_STEP_LIMIT: # Inclui NaN: o estado inválido não multiplica os subpassos
+        return 1
+    return int(min(math.ceil(rate * dt / CHAIN_STEP_LIMIT), CHAIN_MAX_SUBSTEPS))
+
+
+# --- Laço do pêndulo de N elos: altera theta e omega no lugar e devolve o tempo ---
+# Acelerações de physics.chain_accelerations (O(N) por avaliação); rascunhos alocados uma
+# vez por chamada, não por passo. Cada passo dt vira _chain_substeps passos de dt / k,
+# com a primeira avaliação de acelerações (que dá as trações) reaproveitada no primeiro.
+@jit
+def _chain_kernel(method, n, dt, lengths, inverse_masses, g, theta, omega, t, trace, tracing):
+    accelerations = chain_accelerations
+    links = len(theta)
+    work = np.empty((4, links))
+    alpha = np.empty(links)
+    theta_stage = np.empty(links)
+    omega_stage = np.empty(links)
+    theta_sum = np.empty(links)
+    omega_sum = np.empty(links)
+    for i in range(n):
+        accelerations(theta, omega, lengths, inverse_masses, g, alpha, work)
+        substeps = _chain_substeps(dt, work[3], lengths, inverse_masses, omega)
+        h = dt / substeps
+        half = h / 2
+        sixth = h / 6
+        for substep in range(substeps):
+            if substep > 0:
+                accelerations(theta, omega, lengths, inverse_masses, g, alpha, work)
+            if method == 1: # Verlet
+                for j in range(links):
+                    omega[j] += alpha[j] * half
+                    theta[j] += omega[j] * h
+                accelerations(theta, omega, lengths, inverse_masses, g, alpha, work)
+                for j in range(links):
+                    omega[j] += alpha[j] * half
+            elif method == 2: # RK4 (somas na mesma ordem do pêndulo duplo)
+                for j in range(links):
+                    theta_sum[j] = omega[j]
+                    omega_sum[j] = alpha[j]
+                    theta_stage[j] = theta[j] + omega[j] * half
+                    omega_stage[j] = omega[j] + alpha[j] * half
+                accelerations(theta_stage, omega_stage, lengths, inverse_masses, g, alpha, work)
+                for j in range(links):
+                    velocity = omega_stage[j]
+                    theta_sum[j] += 2 * velocity
+                    omega_sum[j] += 2 * alpha[j]
+                    theta_stage[j] = theta[j] + velocity * half
+                    omega_stage[j] = omega[j] + alpha[j] * half
+                accelerations(theta_stage, omega_stage, lengths, inverse_masses, g, alpha, work)
+                for j in range(links):
+                    velocity = omega_stage[j]
+                    theta_sum[j] += 2 * velocity
+                    omega_sum[j] += 2 * alpha[j]
+                    theta_stage[j] = theta[j] + velocity * h
+                    omega_stage[j] = omega[j] + alpha[j] * h
+                accelerations(theta_stage, omega_stage, lengths, inverse_masses, g, alpha, work)
+                for j in range(links):
+                    theta[j] += (theta_sum[j] + omega_stage[j]) * sixth
+                    omega[j] += (omega_sum[j] + alpha[j]) * sixth
+            else: # Euler semi-implícito
+                for j in range(links):
+                    omega[j] += alpha[j] * h
+                    theta[j] += omega[j] * h
+        t += dt
+        if tracing:
+            row = trace[i]
+            row[0] = t
+            for j in range(links):
+                row[1 + j] = theta[j]
+                row[1 + links + j] = omega[j]
+    return t
+
+
+# --- Pêndulo de N elos: ângulos absolutos a partir da vertical (rad) e velocidades (rad/s) ---
+# lengths e masses por elo (massa pontual na ponta de cada haste); theta e omega escalares
+# valem para todos os elos. O estado (state, snapshot, trace) é [theta..., omega...].
+class PendulumChain(_Body):
+    __slots__ = ('lengths', 'masses', 'inverse_masses', 'gravity', 'theta', 'omega')
+    FIELDS = ('theta', 'omega')
+
+    def __init__(self, lengths, masses, theta=0.0, omega=0.0, gravity=GRAVITY_REAL, integrator='verlet'):
+        self.lengths = np.array(lengths, dtype=float).reshape(-1)
+        links = len(self.lengths)
+        self.masses = np.array(np.broadcast_to(np.asarray(masses, dtype=float), links))
+        if links == 0 or not (np.all(self.lengths > 0) and np.all(self.masses > 0)):
+            raise ValueError("Comprimentos e massas devem ser > 0 (pelo menos um elo).")
+        self.inverse_masses = 1 / self.masses
+        self.gravity = float(gravity)
+        self.theta = np.array(np.broadcast_to(np.asarray(theta, dtype=float), links))
+        self.omega = np.array(np.broadcast_to(np.asarray(omega, dtype=float), links))
+        self.time = 0.0
+        self.set_integrator(integrator)
+
+    @property
+    def links(self):
+        return len(self.lengths)
+
+    @property
+    def state(self):
+        return np.concatenate((self.theta, self.omega))
+
+    @state.setter
+    def state(self, values):
+        values = np.asarray(values, dtype=float)
+        self.theta[:] = values[:self.links]
+        self.omega[:] = values[self.links:]
+
+    def snapshot(self):
+        h = self._adaptive.h if self._adaptive is not None else None
+        return (self.time, *self.state.tolist(), math.nan if h is None else h)
+
+    def derivatives(self):
+        return make_chain_pendulum_rhs(self.lengths, self.masses, self.gravity)
+
+    def step_many(self, n, dt, trace=None):
+        if self._adaptive is not None:
+            return self._step_adaptive(n, dt, trace)
+        self.time = _chain_kernel(self._method, n, dt, self.lengths, self.inverse_masses, self.gravity,
+                                  self.theta, self.omega, self.time, _NO_TRACE if trace is None else trace,
+                                  trace is not None)
+        return n
+
+    # --- Posições das massas (m) em relação ao pivô, y para baixo ---
+    def positions(self):
+        return np.cumsum(self.lengths * np.sin(self.theta)), np.cumsum(self.lengths * np.cos(self.theta))
+
+    # --- Energia mecânica (J), com a energia potencial zero na altura do pivô ---
+    def energy(self):
+        velocity_x = np.cumsum(self.lengths * self.omega * np.cos(self.theta))
+        velocity_y = np.cumsum(-self.lengths * self.omega * np.sin(self.theta))
+        _, y = self.positions()
+        return float(np.sum(self.masses * (0.5 * (velocity_x * velocity_x + velocity_y * velocity_y) - self.gravity * y)))
+
+
+# --- O passo (y, vy) -> (y1, vy1) desceu até o chão? (também no lançamento do chão) ---
+@jit
+def _lands(y, velocity_y, y1, velocity_y1, ground, down):
+    return ((y1 - ground) * down >= 0 and velocity_y1 * down > 0
+            and ((y - ground) * down < 0 or (y == ground and velocity_y * down < 0)))
+
+
+# --- Laço do projétil ---
+# Devolve (passos, x, y, vx, vy, tempo, pico, x1, y1, vx1, vy1). Se o projétil tocou o
+# chão, passos é o índice do passo do impacto, o primeiro estado é o do início desse passo
+# e o segundo o do fim (o instante exato é achado fora); senão passos = n.
+@jit
+def _projectile_kernel(method, n, dt, g, linear, quadratic, has_ground, ground, x, y, velocity_x, velocity_y, t,
+                       peak, trace, tracing):
+    sqrt = math.sqrt
+    down = 1.0 if g >= 0 else -1.0
+    half = dt / 2
+    sixth = dt / 6
+    for i in range(n):
+        if method == 1: # Verlet
+            damping = linear + quadratic * sqrt(velocity_x * velocity_x + velocity_y * velocity_y)
+            half_x = velocity_x - damping * velocity_x * half
+            half_y = velocity_y + (g - damping * velocity_y) * half
+            x1 = x + half_x * dt
+            y1 = y + half_y * dt
+            damping = linear + quadratic * sqrt(half_x * half_x + half_y * half_y)
+            velocity_x1 = half_x - damping * half_x * half
+            velocity_y1 = half_y + (g - damping * half_y) * half
+        elif method == 2: # RK4
+            damping = linear + quadratic * sqrt(velocity_x * velocity_x + velocity_y * velocity_y)
+            ax1 = -damping * velocity_x
+            ay1 = g - damping * velocity_y
+            vx2 = velocity_x + ax1 * half
+            vy2 = velocity_y + ay1 * half
+            damping = linear + quadratic * sqrt(vx2 * vx2 + vy2 * vy2)
+            ax2 = -damping * vx2
+            ay2 = g - damping * vy2
+            vx3 = velocity_x + ax2 * half
+            vy3 = velocity_y + ay2 * half
+            damping = linear + quadratic * sqrt(vx3 * vx3 + vy3 * vy3)
+            ax3 = -damping * vx3
+            ay3 = g - damping * vy3
+            vx4 = velocity_x + ax3 * dt
+            vy4 = velocity_y + ay3 * dt
+            damping = linear + quadratic * sqrt(vx4 * vx4 + vy4 * vy4)
+            ax4 = -damping * vx4
+            ay4 = g - damping * vy4
+            x1 = x + (velocity_x + 2 * vx2 + 2 * vx3 + vx4) * sixth
+            y1 = y + (velocity_y + 2 * vy2 + 2 * vy3 + vy4) * sixth
+            velocity_x1 = velocity_x + (ax1 + 2 * ax2 + 2 * ax3 + ax4) * sixth
+            velocity_y1 = velocity_y + (ay1 + 2 * ay2 + 2 * ay3 + ay4) * sixth
+        else: # Euler semi-implícito
+            damping = linear + quadratic * sqrt(velocity_x * velocity_x + velocity_y * velocity_y)
+            velocity_x1 = velocity_x - damping * velocity_x * dt
+            velocity_y1 = velocity_y + (g - damping * velocity_y) * dt
+            x1 = x + velocity_x1 * dt
+            y1 = y + velocity_y1 * dt
+
+        if has_ground and _lands(y, velocity_y, y1, velocity_y1, ground, down):
+            return i, x, y, velocity_x, velocity_y, t, peak, x1, y1, velocity_x1, velocity_y1
+        x, y, velocity_x, velocity_y = x1, y1, velocity_x1, velocity_y1
+        t += dt
+        if (peak - y) * down > 0:
+            peak = y
+        if tracing:
+            row = trace[i]
+            row[0] = t
+            row[1] = x
+            row[2] = y
+            row[3] = velocity_x
+            row[4] = velocity_y
+    return n, x, y, velocity_x, velocity_y, t, peak, x, y, velocity_x, velocity_y
+
+
+# --- Projétil: posição e velocidade em qualquer unidade, gravidade com sinal em y ---
+# Com ground definido, step_many para no primeiro cruzamento do chão no sentido da
+# gravidade, no instante exato dentro do passo (integrators.locate_crossing), e marca
+# landed. peak é o y mais alto (contra a gravidade) já alcançado.
+class Projectile(_Body):
+    __slots__ = ('x', 'y', 'velocity_x', 'velocity_y', 'gravity', 'linear_drag', 'quadratic_drag',
+                 'ground', 'landed', 'peak')
+    FIELDS = ('x', 'y', 'velocity_x', 'velocity_y')
+
+    def __init__(self, x, y, velocity_x, velocity_y, gravity=-GRAVITY_REAL, ground=None, linear_drag=0.0,
+                 quadratic_drag=0.0, integrator='verlet'):
+        self.x, self.y = float(x), float(y)
+        self.velocity_x, self.velocity_y = float(velocity_x), float(velocity_y)
+        self.gravity = float(gravity)
+        self.ground = ground
+        self.linear_drag = float(linear_drag)
+        self.quadratic_drag = float(quadratic_drag)
+        self.landed = False
+        self.peak = self.y
+        self.time = 0.0
+        self.set_integrator(integrator)
+
+    def derivatives(self):
+        return make_projectile_rhs(self.gravity, self.linear_drag, self.quadratic_drag)
+
+    # --- Devolve quantos passos foram dados (menos que n se tocou o chão) ---
+    def step_many(self, n, dt, trace=None):
+        if self.landed:
+            return 0
+        if self._adaptive is not None:
+            return self._step_adaptive(n, dt, trace)
+        steps, x, y, velocity_x, velocity_y, t, self.peak, *end = _projectile_kernel(
+            self._method, n, dt, self.gravity, self.linear_drag, self.quadratic_drag,
+            self.ground is not None, 0.0 if self.ground is None else float(self.ground),
+            self.x, self.y, self.velocity_x, self.velocity_y, self.time, self.peak,
+            _NO_TRACE if trace is None else trace, trace is not None)
+        if steps < n:
+            x, y, velocity_x, velocity_y, t = self._impact((x, y, velocity_x, velocity_y), end, t, dt)
+            if trace is not None:
+                trace[steps] = (t, x, y, velocity_x, velocity_y)
+            steps += 1
+        self.x, self.y, self.velocity_x, self.velocity_y, self.time = x, y, velocity_x, velocity_y, t
+        return steps
+
+    def _step_adaptive(self, n, dt, trace):
+        rhs = self.derivatives()
+        down = 1.0 if self.gravity >= 0 else -1.0
+        state = self.state
+        t = self.time
+        for i in range(n):
+            end = self._adaptive(rhs, t, state, dt)
+            if self.ground is not None and _lands(state[1], state[3], end[1], end[3], self.ground, down):
+                *state, t = self._impact(state, end, t, dt)
+            else:
+                state = end
+                t += dt
+                if (self.peak - state[1]) * down > 0:
+                    self.peak = float(state[1])
+            if trace is not None:
+                trace[i, 0] = t
+                trace[i, 1:] = state
+            if self.landed:
+                n = i + 1
+                break
+        self.state = state
+        self.time = t
+        return n
+
+    # --- Estado e instante exatos do impacto dentro do passo (interpolante de Hermite) ---
+    def _impact(self, start, end, t, dt):
+        rhs = self.derivatives()
+        start = np.array(start, dtype=float)
+        end = np.array(end, dtype=float)
+        fraction = float(integrators.locate_crossing(start[1], start[3], end[1], end[3], dt, self.ground,
+                                                     1.0 if self.gravity >= 0 else -1.0))
+        impact = integrators.hermite_interpolate(start, rhs(t, start), end, rhs(t + dt, end), dt, fraction)
+        x, _, velocity_x, velocity_y = impact.tolist()
+        self.landed = True
+        return x, float(self.ground), velocity_x, velocity_y, t + fraction * dt
@@ -0,0 +1,160 @@
+import copy
+import math
+
+import numpy as np
+
+from recorder import ReplayCursor
+
+# --- Histórico por Checkpoints (busca no tempo sem gravar cada passo) ---
+# CheckpointHistory avança um pêndulo de bodies.py com step_many e guarda o estado completo
+# (body.snapshot(): tempo, campos e o passo do RK45) a cada interval passos, em arrays de
+# tamanho fixo: a memória nunca passa de memory_bytes. Quando os arrays enchem, o intervalo
+# dobra e os checkpoints fora dos novos múltiplos saem (desbaste), então o histórico inteiro
+# continua coberto, com checkpoints mais espaçados. O estado no passo i sai do checkpoint
+# anterior restaurado numa cópia do corpo, integrando no máximo interval passos com o mesmo
+# integrador e o mesmo dt: o resultado é igual bit a bit ao da execução direta. As trocas de
+# integrador (set_integrator) ficam registradas pelo passo e são refeitas no mesmo ponto.
+# Exemplo:
+#   history = CheckpointHistory(DoublePendulum(2.0, 2.0, 1.0, 1.0, math.radians(120)), 1 / 120)
+#   history.advance(10 ** 6)
+#   time, theta1, theta2, omega1, omega2 = history.state_at_step(654321)
+
+CHECKPOINT_INTERVAL = 256 # Passos entre checkpoints (antes de qualquer desbaste)
+CHECKPOINT_MEMORY = 4 * 2 ** 20 # Bytes para os checkpoints
+
+
+class CheckpointHistory:
+    def __init__(self, body, dt, interval=CHECKPOINT_INTERVAL, memory_bytes=CHECKPOINT_MEMORY):
+        self.body = body
+        self.dt = dt
+        self.interval = interval
+        self.start_time = body.time
+        width = len(body.snapshot())
+        self.row_width = width - 1 # Linhas devolvidas: tempo e campos (sem o passo do RK45)
+        self.max_checkpoints = max(memory_bytes // (8 * (width + 1)), 2) # Linha + número do passo
+        self._steps = np.empty(self.max_checkpoints, dtype=np.int64)
+        self._rows = np.empty((self.max_checkpoints, width))
+        self.count = 0
+        self.step_count = 0 # Passos dados pelo corpo desde o início do histórico
+        # (passo, integrador): trocas feitas ao chegar no passo; a primeira vale desde antes do passo 0
+        self.integrator_changes = [(-1, body.integrator)]
+
+        # Cópia do corpo usada nas buscas (o corpo ao vivo nunca é mexido)
+        self._probe = copy.copy(body)
+        self._probe.set_integrator(body.integrator)
+        self._probe_step = None
+        self._save()
+
+    @property
+    def end_time(self):
+        return self.body.time
+
+    # --- Avança o corpo n passos; trace (n, 1 + campos) opcional, como em step_many ---
+    def advance(self, n, trace=None):
+        done = 0
+        while done < n:
+            # Para exatamente no próximo múltiplo do intervalo para gravar o checkpoint
+            taken = min(n - done, self.interval - self.step_count % self.interval)
+            self.body.step_many(taken, self.dt, None if trace is None else trace[done:done + taken])
+            done += taken
+            self.step_count += taken
+            if self.step_count % self.interval == 0:
+                self._save()
+        return n
+
+    def set_integrator(self, name):
+        self.body.set_integrator(name)
+        self.integrator_changes.append((self.step_count, name))
+
+    def _save(self):
+        if self.count == self.max_checkpoints:
+            self._thin()
+        self._steps[self.count] = self.step_count
+        self._rows[self.count] = self.body.snapshot()
+        self.count += 1
+
+    # --- Desbaste: dobra o intervalo e fica só com os checkpoints nos novos múltiplos ---
+    def _thin(self):
+        self.interval *= 2
+        keep = self._steps[:self.count] % self.interval == 0
+        kept = int(np.count_nonzero(keep))
+        self._steps[:kept] = self._steps[:self.count][keep]
+        self._rows[:kept] = self._rows[:self.count][keep]
+        self.count = kept
+
+    def _integrator_before(self, step):
+        return [name for change_step, name in self.integrator_changes if change_step < step][-1]
+
+    # --- Leva a cópia até o passo (trace recebe os estados dos passos depois da posição atual) ---
+    def _replay_to(self, step, trace=None):
+        index = int(np.searchsorted(self._steps[:self.count], step, side='right')) - 1
+        checkpoint_step = int(self._steps[index])
+        # Continua da posição atual da cópia se ela está entre o checkpoint e o destino
+        # (avançar devagar pelo replay não reintegra nada); com trace, sempre continua
+        if trace is None and not (self._probe_step is not None and checkpoint_step <= self._probe_step <= step):
+            self._probe.set_integrator(self._integrator_before(checkpoint_step))
+            self._probe.restore(self._rows[index])
+            self._probe_step = checkpoint_step
+        done = 0
+        for change_step, name in self.integrator_changes:
+            if self._probe_step <= change_step < step:
+                done += self._step_probe(change_step - self._probe_step, trace, done)
+                self._probe.set_integrator(name)
+        self._step_probe(step - self._probe_step, trace, done)
+
+    def _step_probe(self, n, trace, offset):
+        if n:
+            self._probe.step_many(n, self.dt, None if trace is None else trace[offset:offset + n])
+            self._probe_step += n
+        return n
+
+    # --- Estado (tempo, campos...) depois de step passos ---
+    def state_at_step(self, step):
+        if not 0 <= step <= self.step_count:
+            raise IndexError(f"Passo fora do histórico: {step} (0 a {self.step_count}).")
+        self._replay_to(step)
+        return self._probe.snapshot()[:-1]
+
+    # --- Estados dos passos [start, stop), uma linha (tempo, campos...) por passo ---
+    def rows(self, start, stop):
+        stop = min(stop, self.step_count + 1)
+        rows = np.empty((max(stop - start, 0), self.row_width))
+        if len(rows):
+            rows[0] = self.state_at_step(start)
+            self._replay_to(stop - 1, rows[1:])
+        return rows
+
+    # --- Último passo com tempo <= t ---
+    def step_at(self, t):
+        step = math.floor((t - self.start_time) / self.dt + 1e-6)
+        return min(max(step, 0), self.step_count)
+
+
+# --- Cursor de replay sobre um CheckpointHistory (mesma interface de ReplayCursor) ---
+# index é o número do passo; cada busca reintegra no máximo um intervalo de checkpoints.
+class CheckpointCursor(ReplayCursor):
+    def __init__(self, history):
+        self.history = history
+        self.playing = False
+        self.index = history.step_count
+        self.time = history.end_time
+
+    @property
+    def start_time(self):
+        return self.history.start_time
+
+    @property
+    def end_time(self):
+        return self.history.end_time
+
+    def seek(self, t):
+        self.time = min(max(t, self.start_time), self.end_time)
+        self.index = self.history.step_at(self.time)
+
+    def current(self):
+        return list(self.history.state_at_step(self.index))
+
+    def rows(self, indices):
+        if len(indices) == 0:
+            return np.empty((0, self.history.row_width))
+        return self.history.rows(int(indices[0]), int(indices[-1]) + 1)[indices - indices[0]]
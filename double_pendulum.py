@@ -1,11 +1,29 @@
 import pygame
+import os
 import sys
 import math
 
+import numpy as np
+
+import integrators
+from bodies import DoublePendulum
+from checkpoints import CheckpointCursor, CheckpointHistory
+from frame_loop import STEP_BATCH, FixedTimestep
+from frame_export import EXPORT_FRAMES, EXPORT_PATH, FrameExporter
+from layers import LayeredScreen
+from physics_thread import PHYSICS_THREAD, PhysicsLoop
+from profiling import BENCH_FRAMES, BENCH_OUTPUT, TRACE_OUTPUT, FrameProfiler
+from recorder import REPLAY_PATH, ReplayCursor, StateRecorder, open_recording, recording_path
+from text_cache import draw_text, get_font, render_text
+from trail import TrailRenderer
+
 # --- Configurações Iniciais ---
 WIDTH, HEIGHT = 800, 600
 FPS = 60 
 DT = 1 / FPS 
+INTEGRATOR = 'rk4' # 'euler', 'rk4', 'verlet' ou 'rk45' (tecla 'I' alterna)
+PHYSICS_SUBSTEPS = 2 # Passos de física por DT
+TIME_WARP = 1.0 # Tempo simulado por segundo real (teclas '+' e '-')
 
 # Cores
 WHITE = (255, 255, 255)
@@ -36,6 +54,9 @@ pygame.display.set_caption("Simulação de Pêndulo Duplo")
 # Clock para controlar o FPS
 clock = pygame.time.Clock()
 
+# Passo fixo da física, desacoplado da taxa de quadros
+timestep = FixedTimestep(DT, PHYSICS_SUBSTEPS, TIME_WARP)
+
 # Gravidade no mundo real (m/s^2)
 GRAVITY_REAL = 9.81 # m/s^2
 
@@ -49,7 +70,7 @@ class InputBox:
         self.color = INACTIVE_COLOR 
         self.text = text
         self.label = label
-        self.font = pygame.font.Font(None, 24)
+        self.font = get_font(24)
         self.active = False
         self.txt_surface = self.font.render(text, True, LIGHT_GREY)
         self.label_surface = self.font.render(label, True, WHITE)
@@ -110,9 +131,30 @@ bob_radius_pixel = 10 # Raio dos bobs em pixels
 is_simulating = False
 time_since_launch = 0.0
 
-# Para desenhar a trajetória do segundo bob 
-trajectory_points_bob2 = []
-MAX_TRAJECTORY_POINTS = 2000 # Limite de pontos para não sobrecarregar a memória
+# --- Integrador numérico e corpo simulado (DoublePendulum, avançado com step_many) ---
+integrator_name = INTEGRATOR
+double_pendulum = None
+
+# Trajetória do segundo bob: o caminho inteiro em níveis de detalhe (trail.LodTrail), com
+# memória limitada, guardado na escala base (PIXELS_PER_METER) e desenhado com o zoom da vista
+trajectory_bob2 = TrailRenderer((WIDTH, HEIGHT), WHITE, 1)
+MAX_TRAJECTORY_POINTS = 2000 # Pontos do rastro refeitos ao saltar no replay
+
+# Zoom da vista em torno do pivô (roda do mouse)
+VIEW_ZOOM_MIN = 0.125
+VIEW_ZOOM_MAX = 4.0
+view_zoom = 1.0
+
+# Gravação do histórico de estado em disco (com SIM_RECORD_DIR, uma por execução) e replay (tecla 'V')
+RECORD_FIELDS = ('time', 'theta1', 'theta2', 'omega1', 'omega2')
+recorder = None
+trace_buffer = np.empty((STEP_BATCH, len(RECORD_FIELDS))) # Estados de um lote, gravados de uma vez
+# Checkpoints em memória da execução: o replay busca por eles quando a execução não foi gravada
+history = None
+# Cursor enquanto o replay está ativo: ReplayCursor sobre a gravação (busca binária no memmap,
+# nada é recalculado) ou, sem gravação, CheckpointCursor (reintegra desde o checkpoint anterior)
+replay = None
+replay_recording = None # Gravação aberta com SIM_REPLAY (replay sem execução nesta sessão)
 
 # --- Instâncias das Caixas de Input ---
 input_box_L1 = InputBox(WIDTH - 150, 10, 140, 32, '2.0', 'Comp. 1 (m):')
@@ -133,7 +175,7 @@ def reset_double_pendulum(reset_inputs=False):
            theta1_radians, omega1_radians_per_sec, \
            theta2_radians, omega2_radians_per_sec, \
            bob1_pos_pixel, bob2_pos_pixel, is_simulating, time_since_launch, \
-           trajectory_points_bob2
+           double_pendulum, replay
 
     if reset_inputs:
         input_box_L1.text = '2.0'
@@ -166,7 +208,17 @@ def reset_double_pendulum(reset_inputs=False):
 
     is_simulating = False
     time_since_launch = 0.0
-    trajectory_points_bob2.clear()
+    timestep.reset()
+    trajectory_bob2.clear()
+    replay = None
+    if recorder is not None:
+        recorder.flush()
+
+    # Recria o corpo (o RK45 guarda o tamanho de passo)
+    double_pendulum = None
+    if L1_real > 0 and L2_real > 0 and M1_real > 0 and M2_real > 0:
+        double_pendulum = DoublePendulum(L1_real, L2_real, M1_real, M2_real, theta1_radians, theta2_radians,
+                                         omega1_radians_per_sec, omega2_radians_per_sec, GRAVITY_REAL, integrator_name)
 
     # Bob 1
     bob1_x_pixel = pivot_point_pixel[0] + L1_real * PIXELS_PER_METER * math.sin(theta1_radians)
@@ -183,85 +235,266 @@ def reset_double_pendulum(reset_inputs=False):
 # --- Função para Iniciar a Simulação ---
 def start_simulation():
 
-    global is_simulating
+    global is_simulating, history
     reset_double_pendulum(reset_inputs=False)
 
     # Validação mínima
     if L1_real > 0 and L2_real > 0 and M1_real > 0 and M2_real > 0:
         is_simulating = True
+        history = CheckpointHistory(double_pendulum, timestep.physics_dt)
+        start_recording()
     else:
         print("Valores de entrada inválidos para simulação (comprimentos e massas devem ser > 0).")
         is_simulating = False
 
 
+# --- Abre a gravação da nova execução (a anterior fica completa em disco) ---
+def start_recording():
+    global recorder
+    if recorder is not None:
+        recorder.close()
+        recorder = None
+    path = recording_path('double_pendulum')
+    if path is not None:
+        recorder = StateRecorder(path, RECORD_FIELDS, {'L1': L1_real, 'L2': L2_real, 'M1': M1_real, 'M2': M2_real,
+                                                       'gravity': GRAVITY_REAL, 'integrator': integrator_name})
+        recorder.append(0.0, (theta1_radians, theta2_radians, omega1_radians_per_sec, omega2_radians_per_sec))
+
+
+# --- Posições (pixels) do segundo bob para arrays de ângulos ---
+def bob2_pixel_positions(theta1, theta2):
+    x = pivot_point_pixel[0] + (L1_real * np.sin(theta1) + L2_real * np.sin(theta2)) * PIXELS_PER_METER
+    y = pivot_point_pixel[1] + (L1_real * np.cos(theta1) + L2_real * np.cos(theta2)) * PIXELS_PER_METER
+    return np.column_stack((x, y)).astype(np.int32)
+
+
+# --- Pontos do rastro nos registros [start, stop): um a cada PHYSICS_SUBSTEPS, como um por frame ao vivo ---
+def replay_trail_points(start, stop):
+    stride = timestep.substeps
+    rows = replay.rows(np.arange(-(-start // stride) * stride, stop, stride))
+    return bob2_pixel_positions(rows[:, 1], rows[:, 2])
+
+
+# --- Posição na tela de um ponto na escala base (zoom da vista em torno do pivô) ---
+def to_view(point):
+    return (int(pivot_point_pixel[0] + (point[0] - pivot_point_pixel[0]) * view_zoom),
+            int(pivot_point_pixel[1] + (point[1] - pivot_point_pixel[1]) * view_zoom))
+
+
+# --- Muda o zoom da vista (o rastro é redesenhado no nível de detalhe do novo zoom) ---
+def set_view_zoom(zoom):
+    global view_zoom
+    view_zoom = min(max(zoom, VIEW_ZOOM_MIN), VIEW_ZOOM_MAX)
+    trajectory_bob2.set_view(view_zoom, pivot_point_pixel)
+
+
+# --- Mostra o estado na posição do cursor de replay (lido da gravação ou reintegrado pelos checkpoints) ---
+def show_replay_frame(previous_index=None):
+    global theta1_radians, theta2_radians, omega1_radians_per_sec, omega2_radians_per_sec, \
+           time_since_launch, bob1_pos_pixel, bob2_pos_pixel
+    time_since_launch, theta1_radians, theta2_radians, omega1_radians_per_sec, omega2_radians_per_sec = replay.current()
+
+    bob1_x_pixel = pivot_point_pixel[0] + L1_real * PIXELS_PER_METER * math.sin(theta1_radians)
+    bob1_y_pixel = pivot_point_pixel[1] + L1_real * PIXELS_PER_METER * math.cos(theta1_radians)
+    bob1_pos_pixel = (int(bob1_x_pixel), int(bob1_y_pixel))
+
+    bob2_x_pixel = bob1_pos_pixel[0] + L2_real * PIXELS_PER_METER * math.sin(theta2_radians)
+    bob2_y_pixel = bob1_pos_pixel[1] + L2_real * PIXELS_PER_METER * math.cos(theta2_radians)
+    bob2_pos_pixel = (int(bob2_x_pixel), int(bob2_y_pixel))
+
+    # Avanço curto: só acrescenta os pontos novos; salto ou volta: refaz o rastro
+    if previous_index is not None and 0 <= replay.index - previous_index <= MAX_TRAJECTORY_POINTS:
+        for point in replay_trail_points(previous_index + 1, replay.index + 1):
+            trajectory_bob2.append(point)
+    else:
+        start = max(0, replay.index - MAX_TRAJECTORY_POINTS * timestep.substeps)
+        trajectory_bob2.replace(replay_trail_points(start, replay.index + 1))
+
+
+# --- Entra/sai do replay da última execução ---
+# Execução gravada: lê a gravação (um registro por passo, o índice é o passo); sem gravação:
+# checkpoints; sem execução nesta sessão: a gravação de SIM_REPLAY.
+def toggle_replay():
+    global replay, L1_real, L2_real, M1_real, M2_real
+    if replay is None:
+        if recorder is not None and len(recorder) > 0:
+            replay = ReplayCursor(recorder.records)
+            metadata = recorder.metadata
+        elif history is not None and history.step_count > 0:
+            replay = CheckpointCursor(history)
+            metadata = {'L1': history.body.L1, 'L2': history.body.L2, 'M1': history.body.M1, 'M2': history.body.M2}
+        elif replay_recording is not None:
+            replay = ReplayCursor(replay_recording.records)
+            metadata = replay_recording.metadata
+        else:
+            return
+        L1_real, L2_real, M1_real, M2_real = metadata['L1'], metadata['L2'], metadata['M1'], metadata['M2']
+        show_replay_frame()
+    elif is_simulating:
+        # Volta ao vivo: o corpo não foi mexido pelo replay (as buscas usam uma cópia)
+        replay.seek(replay.end_time)
+        show_replay_frame()
+        replay = None
+        timestep.reset()
+    else:
+        reset_double_pendulum(reset_inputs=False)
+
+
+# --- Teclas do replay: espaço (play/pausa), setas (±1 s; Shift: ±10 s), PgUp/PgDn (±10%), Home/End ---
+REPLAY_KEYS = (pygame.K_SPACE, pygame.K_LEFT, pygame.K_RIGHT, pygame.K_PAGEUP, pygame.K_PAGEDOWN, pygame.K_HOME, pygame.K_END)
+
+def handle_replay_key(event):
+    previous_index = replay.index
+    seek_seconds = 10.0 if event.mod & pygame.KMOD_SHIFT else 1.0
+    page_seconds = 0.1 * (replay.end_time - replay.start_time)
+    if event.key == pygame.K_SPACE:
+        replay.toggle_playing()
+    elif event.key == pygame.K_LEFT:
+        replay.seek_relative(-seek_seconds)
+    elif event.key == pygame.K_RIGHT:
+        replay.seek_relative(seek_seconds)
+    elif event.key == pygame.K_PAGEUP:
+        replay.seek_relative(-page_seconds)
+    elif event.key == pygame.K_PAGEDOWN:
+        replay.seek_relative(page_seconds)
+    elif event.key == pygame.K_HOME:
+        replay.seek(replay.start_time)
+    elif event.key == pygame.K_END:
+        replay.seek(replay.end_time)
+    show_replay_frame(previous_index)
+
+
+# --- Física do intervalo de tempo real dado; devolve (tempo, theta1, theta2, omega1, omega2) ---
+# Chamada no frame ou pela thread de física (physics_thread.py).
+def update_physics(seconds):
+    if is_simulating and replay is None:
+        # Avança ângulos e velocidades angulares com o integrador selecionado, em lotes de
+        # passos fixos (step_many) até consumir o tempo real dado
+        for n_steps in timestep.batches(seconds):
+            if recorder is not None:
+                history.advance(n_steps, trace_buffer[:n_steps])
+                recorder.extend(trace_buffer[:n_steps])
+            else:
+                history.advance(n_steps)
+    if double_pendulum is None:
+        return None
+    return (double_pendulum.time, double_pendulum.theta1, double_pendulum.theta2,
+            double_pendulum.omega1, double_pendulum.omega2)
+
+
 # Botão de Iniciar
 start_button_rect = pygame.Rect(WIDTH - 150, 270, 140, 40) # Posição ajustada
-start_button_text = pygame.font.Font(None, 30).render("INICIAR", True, BLACK)
+start_button_text = render_text("INICIAR", 30, BLACK)
+
+
+# --- Parte estática desenhada por cima do rastro: pivô, caixas de input, botão e textos fixos ---
+def draw_ui(surface):
+    pygame.draw.circle(surface, YELLOW, pivot_point_pixel, 5)
+    for box in input_boxes:
+        box.draw(surface)
+    pygame.draw.rect(surface, GREEN, start_button_rect)
+    surface.blit(start_button_text, (start_button_rect.x + (start_button_rect.width - start_button_text.get_width()) // 2,
+                                     start_button_rect.y + (start_button_rect.height - start_button_text.get_height()) // 2))
+    draw_text(surface, "Pressione 'R' para Resetar", 20, WHITE, 10, HEIGHT - 30)
 
-# --- Função para renderizar texto na tela ---
-def draw_text(surface, text, font_size, color, x, y):
-    font = pygame.font.Font(None, font_size)
-    text_surface = font.render(text, True, color)
-    surface.blit(text_surface, (x, y))
 
+# Desenho por retângulos sujos: o rastro é uma camada persistente; só os fios, os bobs
+# e o HUD são redesenhados a cada frame
+layers = LayeredScreen(screen, lambda surface: surface.fill(BLACK), [trajectory_bob2], draw_ui)
+hud_text = layers.track(draw_text)
 
 # --- Inicializa o pêndulo (para o estado inicial ao abrir o programa) ---
 reset_double_pendulum(reset_inputs=True)
 
+# Exportação de frames (SIM_EXPORT): sem janela, e a física nunca descarta passos por orçamento
+exporter = None
+if EXPORT_PATH:
+    exporter = FrameExporter(EXPORT_PATH, screen.get_size())
+    timestep.max_update_time = math.inf
+
+# Gravação de outra execução (SIM_REPLAY): abre direto no replay
+if REPLAY_PATH:
+    try:
+        replay_recording = open_recording(REPLAY_PATH, RECORD_FIELDS)
+    except (OSError, ValueError) as error:
+        sys.exit(f"Não foi possível abrir a gravação: {error}")
+
+# Modo benchmark ou exportação: a simulação começa sozinha
+if BENCH_FRAMES or exporter is not None:
+    start_simulation()
+elif replay_recording is not None:
+    toggle_replay()
+
+# Física no próprio frame ou numa thread (SIM_PHYSICS_THREAD=1; nunca no benchmark e na exportação)
+physics = PhysicsLoop(update_physics, threaded=PHYSICS_THREAD and not BENCH_FRAMES and exporter is None)
+
+# Tempo gasto em cada fase do frame
+profiler = FrameProfiler()
+
 # --- Loop Principal do Jogo ---
 running = True
+frame_seconds = DT # Tempo real do último frame
 while running:
+    profiler.begin_frame()
+
     # 1. Eventos
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+    # Mudanças na simulação (cliques, teclas) esperam o lote de física em andamento na thread
+    events = pygame.event.get()
+    with physics.changes(events):
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
         
 
-        for box in input_boxes:
-            box.handle_event(event)
-
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            if start_button_rect.collidepoint(event.pos):
-                start_simulation()
-
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_r: 
-                reset_double_pendulum(reset_inputs=False) 
-
+            for box in input_boxes:
+                box.handle_event(event)
+            layers.handle_event(event)
+
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if start_button_rect.collidepoint(event.pos):
+                    start_simulation()
+
+            if event.type == pygame.MOUSEWHEEL and event.y:
+                set_view_zoom(view_zoom * 2 ** (0.25 * event.y))
+
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_r: 
+                    reset_double_pendulum(reset_inputs=False) 
+                elif event.key == pygame.K_i and not any(box.active for box in input_boxes):
+                    integrator_name = integrators.next_integrator_name(integrator_name)
+                    if is_simulating:
+                        # A troca fica no histórico para as buscas refazerem no mesmo passo
+                        history.set_integrator(integrator_name)
+                    elif double_pendulum is not None:
+                        double_pendulum.set_integrator(integrator_name)
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS) and not any(box.active for box in input_boxes):
+                    timestep.faster()
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS) and not any(box.active for box in input_boxes):
+                    timestep.slower()
+                elif event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
+                elif event.key == pygame.K_v and not any(box.active for box in input_boxes):
+                    toggle_replay()
+                elif replay is not None and event.key in REPLAY_KEYS and not any(box.active for box in input_boxes):
+                    handle_replay_key(event)
+
+
+    profiler.mark('events')
 
     # 2. Atualização
-    if is_simulating:
+    if replay is not None:
+        # Replay: o cursor anda pelo tempo simulado do frame, sem integrar nada
+        previous_index = replay.index
+        replay.advance(frame_seconds * timestep.time_warp)
+        show_replay_frame(previous_index)
+    elif is_simulating:
         
        
-        delta_theta = theta1_radians - theta2_radians
-        sum_mass = M1_real + M2_real
-
-        # Denominador comum para ambas as acelerações
-        den = (2 * M1_real + M2_real - M2_real * math.cos(2 * delta_theta))
-        if den == 0: 
-            den = 1e-9 
-
-        # Aceleração Angular do Pêndulo 1 
-        num1_term1 = -GRAVITY_REAL * (2 * M1_real + M2_real) * math.sin(theta1_radians)
-        num1_term2 = -M2_real * GRAVITY_REAL * math.sin(theta1_radians - 2 * theta2_radians)
-        num1_term3 = -2 * M2_real * math.sin(delta_theta) * (omega2_radians_per_sec**2 * L2_real + omega1_radians_per_sec**2 * L1_real * math.cos(delta_theta))
-        alpha1_radians_per_sec2 = (num1_term1 + num1_term2 + num1_term3) / (L1_real * den)
-
-        # Aceleração Angular do Pêndulo 2 
-        num2_term1 = 2 * math.sin(delta_theta)
-        num2_term2 = (omega1_radians_per_sec**2 * L1_real * sum_mass + GRAVITY_REAL * sum_mass * math.cos(theta1_radians) + omega2_radians_per_sec**2 * L2_real * M2_real * math.cos(delta_theta))
-        alpha2_radians_per_sec2 = (num2_term1 * num2_term2) / (L2_real * den)
-
-
-        # Atualiza velocidades e ângulos (Método de Euler Simples)
-        omega1_radians_per_sec += alpha1_radians_per_sec2 * DT
-        theta1_radians += omega1_radians_per_sec * DT
-
-        omega2_radians_per_sec += alpha2_radians_per_sec2 * DT
-        theta2_radians += omega2_radians_per_sec * DT
-
-        
-        time_since_launch += DT
+        # Avança ângulos e velocidades angulares (ou, com a física em thread, só lê o último estado)
+        profiler.begin_section('update/physics')
+        time_since_launch, theta1_radians, theta2_radians, omega1_radians_per_sec, omega2_radians_per_sec = \
+            physics.latest(frame_seconds)
+        profiler.end_section()
 
         
         bob1_x_pixel = pivot_point_pixel[0] + L1_real * PIXELS_PER_METER * math.sin(theta1_radians)
@@ -273,60 +506,96 @@ while running:
         bob2_pos_pixel = (int(bob2_x_pixel), int(bob2_y_pixel))
 
        
-        trajectory_points_bob2.append(bob2_pos_pixel)
-        if len(trajectory_points_bob2) > MAX_TRAJECTORY_POINTS:
-            trajectory_points_bob2.pop(0)
-
+        profiler.begin_section('update/trail')
+        trajectory_bob2.append(bob2_pos_pixel)
+        profiler.end_section()
 
-    # 3. Desenho
-    screen.fill(BLACK) 
 
-    # Desenha o rastro do segundo bob
-    if len(trajectory_points_bob2) > 1:
-        pygame.draw.lines(screen, WHITE, False, trajectory_points_bob2, 1) 
+    profiler.mark('update')
 
-    # Desenha o ponto de pivô
-    pygame.draw.circle(screen, YELLOW, pivot_point_pixel, 5)
+    # 3. Desenho (fundo, rastro, pivô, caixas de input e botão vêm prontos da composição)
+    profiler.begin_section('draw/layers')
+    layers.begin_frame()
+    profiler.end_section()
 
     # Desenha o primeiro fio e bob
-    pygame.draw.line(screen, BLUE, pivot_point_pixel, bob1_pos_pixel, 2)
-    pygame.draw.circle(screen, RED, bob1_pos_pixel, bob_radius_pixel)
+    bob1_view, bob2_view = to_view(bob1_pos_pixel), to_view(bob2_pos_pixel)
+    layers.add(pygame.draw.line(screen, BLUE, pivot_point_pixel, bob1_view, 2))
+    layers.add(pygame.draw.circle(screen, RED, bob1_view, bob_radius_pixel))
 
     # Desenha o segundo fio e bob
-    pygame.draw.line(screen, MAGENTA, bob1_pos_pixel, bob2_pos_pixel, 2)
-    pygame.draw.circle(screen, CYAN, bob2_pos_pixel, bob_radius_pixel)
-
-
-    # Desenha as caixas de input
-    for box in input_boxes:
-        box.draw(screen)
-    
-    # Desenha o botão de Iniciar
-    pygame.draw.rect(screen, GREEN, start_button_rect)
-    screen.blit(start_button_text, (start_button_rect.x + (start_button_rect.width - start_button_text.get_width()) // 2,
-                                     start_button_rect.y + (start_button_rect.height - start_button_text.get_height()) // 2))
+    layers.add(pygame.draw.line(screen, MAGENTA, bob1_view, bob2_view, 2))
+    layers.add(pygame.draw.circle(screen, CYAN, bob2_view, bob_radius_pixel))
 
 
     # --- Exibir Parâmetros ---
-    draw_text(screen, f"L1: {L1_real:.2f}m, M1: {M1_real:.2f}kg", 20, WHITE, 10, 10)
-    draw_text(screen, f"L2: {L2_real:.2f}m, M2: {M2_real:.2f}kg", 20, WHITE, 10, 30)
+    profiler.begin_section('draw/hud')
+    hud_text(screen, f"L1: {L1_real:.2f}m, M1: {M1_real:.2f}kg", 20, WHITE, 10, 10)
+    hud_text(screen, f"L2: {L2_real:.2f}m, M2: {M2_real:.2f}kg", 20, WHITE, 10, 30)
     
-    draw_text(screen, f"Theta1: {math.degrees(theta1_radians):.2f}°", 20, WHITE, 10, 60)
-    draw_text(screen, f"Omega1: {math.degrees(omega1_radians_per_sec):.2f}°/s", 20, WHITE, 10, 80)
+    hud_text(screen, f"Theta1: {math.degrees(theta1_radians):.2f}°", 20, WHITE, 10, 60)
+    hud_text(screen, f"Omega1: {math.degrees(omega1_radians_per_sec):.2f}°/s", 20, WHITE, 10, 80)
     
-    draw_text(screen, f"Theta2: {math.degrees(theta2_radians):.2f}°", 20, WHITE, 10, 110)
-    draw_text(screen, f"Omega2: {math.degrees(omega2_radians_per_sec):.2f}°/s", 20, WHITE, 10, 130)
-
-    draw_text(screen, f"Tempo Total: {time_since_launch:.2f}s", 20, WHITE, 10, 160)
-    draw_text(screen, "Pressione 'R' para Resetar", 20, WHITE, 10, HEIGHT - 30)
-
-
+    hud_text(screen, f"Theta2: {math.degrees(theta2_radians):.2f}°", 20, WHITE, 10, 110)
+    hud_text(screen, f"Omega2: {math.degrees(omega2_radians_per_sec):.2f}°/s", 20, WHITE, 10, 130)
+
+    hud_text(screen, f"Tempo Total: {time_since_launch:.2f}s", 20, WHITE, 10, 160)
+    hud_text(screen, f"Integrador: {integrator_name.upper()} (tecla 'I')", 20, WHITE, 10, 190)
+    hud_text(screen, f"Vel. Simulação: {timestep.time_warp:g}x (teclas '+'/'-')" + (" [atrasado]" if timestep.lagging else "")
+             + (f" [física em thread: {physics.updates_per_second:.0f}/s]" if physics.threaded else ""), 20, WHITE, 10, 210)
+    hud_text(screen, f"Zoom: {view_zoom:.2f}x (roda do mouse), rastro: {len(trajectory_bob2)} pontos, "
+             f"nível {trajectory_bob2.trail.level_for_zoom(view_zoom)}", 20, LIGHT_GREY, 10, HEIGHT - 55)
+    if replay is not None:
+        source = (f"{history.count} checkpoints, a cada {history.interval} passos" if isinstance(replay, CheckpointCursor)
+                  else f"gravação: {len(replay.records)} registros")
+        hud_text(screen, f"Replay: {replay.time:.2f}s / {replay.end_time:.2f}s" + ("" if replay.playing else " [pausado]")
+                 + f" ({source})", 20, YELLOW, 10, 230)
+        hud_text(screen, "Espaço: play/pausa, Setas: ±1s (Shift ±10s), PgUp/PgDn, Home/End, 'V': sair", 20, YELLOW, 10, 250)
+    elif recorder is not None:
+        hud_text(screen, "Gravando (tecla 'V' para replay)", 20, LIGHT_GREY, 10, 230)
+    elif history is not None:
+        hud_text(screen, "Tecla 'V' para replay", 20, LIGHT_GREY, 10, 230)
+    elif replay_recording is not None:
+        hud_text(screen, f"Tecla 'V': replay de {os.path.basename(replay_recording.path)}", 20, LIGHT_GREY, 10, 230)
+    profiler.end_section()
+
+    # Sobreposição de tempos por fase (tecla F3)
+    profiler.draw_overlay(screen, hud_text, 10, 280, YELLOW)
+
+
+
+    profiler.mark('draw')
+
+    layers.end_frame()
+    profiler.mark('flip')
+    if exporter is not None:
+        exporter.submit(screen)
+    profiler.end_frame()
+
+
+    if BENCH_FRAMES or exporter is not None:
+        # Benchmark/exportação: sem espera pelo FPS, e um DT simulado por frame
+        clock.tick()
+        frame_seconds = DT
+        if BENCH_FRAMES:
+            running = running and profiler.frame_count < BENCH_FRAMES
+        if exporter is not None:
+            running = running and exporter.frame_count < EXPORT_FRAMES
+    else:
+        frame_seconds = clock.tick(FPS) / 1000
 
-    pygame.display.flip()
 
+physics.close()
+if exporter is not None:
+    exporter.close()
 
-    clock.tick(FPS)
+if BENCH_FRAMES and BENCH_OUTPUT:
+    profiler.write_json(BENCH_OUTPUT, script='double_pendulum.py')
+if TRACE_OUTPUT:
+    profiler.write_trace(TRACE_OUTPUT, 'double_pendulum.py')
 
+if recorder is not None:
+    recorder.close()
 
 pygame.quit()
 sys.exit()
\ No newline at end of file
@@ -0,0 +1,169 @@
+import math
+
+import numpy as np
+
+import integrators
+
+# --- Motor de Ensemble do Pêndulo Duplo (sem janela) ---
+# Integra N pêndulos duplos de uma só vez, com o estado guardado em arrays NumPy.
+# As equações são as mesmas de double_pendulum.py, apenas vetorizadas.
+
+# Gravidade no mundo real (m/s^2)
+GRAVITY_REAL = 9.81 # m/s^2
+
+
+# --- Acelerações Angulares (vetorizadas) ---
+def angular_accelerations(theta1, omega1, theta2, omega2, L1, L2, M1, M2, g=GRAVITY_REAL):
+    delta_theta = theta1 - theta2
+    sum_mass = M1 + M2
+    sin_delta = np.sin(delta_theta)
+    cos_delta = np.cos(delta_theta)
+    sin_theta2 = np.sin(theta2)
+    cos_theta2 = np.cos(theta2)
+    omega1_sq_L1 = omega1 * omega1 * L1
+    omega2_sq_L2 = omega2 * omega2 * L2
+
+    # Denominador comum para ambas as acelerações
+    # (cos(2*delta) = 2*cos(delta)^2 - 1, evita uma chamada trigonométrica por membro)
+    den = 2 * M1 + M2 - M2 * (2 * cos_delta * cos_delta - 1)
+    den = np.where(den == 0, 1e-9, den)
+
+    # Aceleração Angular do Pêndulo 1
+    # (sin(theta1 - 2*theta2) = sin(delta - theta2))
+    num1_term1 = -g * (2 * M1 + M2) * np.sin(theta1)
+    num1_term2 = -M2 * g * (sin_delta * cos_theta2 - cos_delta * sin_theta2)
+    num1_term3 = -2 * M2 * sin_delta * (omega2_sq_L2 + omega1_sq_L1 * cos_delta)
+    alpha1 = (num1_term1 + num1_term2 + num1_term3) / (L1 * den)
+
+    # Aceleração Angular do Pêndulo 2
+    # (cos(theta1) = cos(delta + theta2))
+    cos_theta1 = cos_delta * cos_theta2 - sin_delta * sin_theta2
+    num2_term1 = 2 * sin_delta
+    num2_term2 = omega1_sq_L1 * sum_mass + g * sum_mass * cos_theta1 + omega2_sq_L2 * M2 * cos_delta
+    alpha2 = (num2_term1 * num2_term2) / (L2 * den)
+
+    return alpha1, alpha2
+
+
+class DoublePendulumEnsemble:
+    def __init__(self, theta1, theta2, L1=2.0, L2=2.0, M1=1.0, M2=1.0,
+                 omega1=0.0, omega2=0.0, g=GRAVITY_REAL, integrator='euler', dtype=np.float64):
+        # Parâmetros por membro (escalares são aplicados a todos os membros)
+        self.L1 = np.asarray(L1, dtype=dtype)
+        self.L2 = np.asarray(L2, dtype=dtype)
+        self.M1 = np.asarray(M1, dtype=dtype)
+        self.M2 = np.asarray(M2, dtype=dtype)
+        self.g = g
+
+        shape = np.broadcast_shapes(np.shape(theta1), np.shape(theta2), np.shape(omega1), np.shape(omega2),
+                                    self.L1.shape, self.L2.shape, self.M1.shape, self.M2.shape)
+        if np.any(self.L1 <= 0) or np.any(self.L2 <= 0) or np.any(self.M1 <= 0) or np.any(self.M2 <= 0):
+            raise ValueError("Comprimentos e massas devem ser > 0.")
+
+        # Estado (em radianos) num único array (4, *shape), no formato de integrators.py:
+        # [theta1, theta2, omega1, omega2]
+        self.state = np.empty((4,) + shape, dtype=dtype)
+        self.state[0] = theta1
+        self.state[1] = theta2
+        self.state[2] = omega1
+        self.state[3] = omega2
+
+        self.integrator = integrator
+        self._stepper = integrators.get_stepper(integrator)
+        self.time = 0.0
+
+    # --- Construtor a partir de ângulos em graus (como nas caixas de input) ---
+    @classmethod
+    def from_degrees(cls, theta1_degrees, theta2_degrees, **kwargs):
+        return cls(np.radians(theta1_degrees), np.radians(theta2_degrees), **kwargs)
+
+    # --- Ensemble de condições iniciais perturbadas (estudos de sensibilidade) ---
+    @classmethod
+    def perturbed(cls, theta1_degrees, theta2_degrees, n, spread_degrees=1e-6, seed=None, **kwargs):
+        rng = np.random.default_rng(seed)
+        theta1 = math.radians(theta1_degrees) + np.radians(rng.uniform(-spread_degrees, spread_degrees, n))
+        theta2 = math.radians(theta2_degrees) + np.radians(rng.uniform(-spread_degrees, spread_degrees, n))
+        return cls(theta1, theta2, **kwargs)
+
+    # --- Visões de cada variável do estado ---
+    @property
+    def theta1(self):
+        return self.state[0]
+
+    @property
+    def theta2(self):
+        return self.state[1]
+
+    @property
+    def omega1(self):
+        return self.state[2]
+
+    @property
+    def omega2(self):
+        return self.state[3]
+
+    def __len__(self):
+        return self.theta1.size
+
+    @property
+    def shape(self):
+        return self.theta1.shape
+
+    # --- Sub-ensemble com os membros selecionados (máscara booleana ou índices) ---
+    def select(self, members):
+        subset = object.__new__(type(self))
+        subset.__dict__.update(self.__dict__)
+        subset.state = self.state[:, members]
+        for name in ('L1', 'L2', 'M1', 'M2'):
+            value = getattr(self, name)
+            if value.ndim:
+                setattr(subset, name, np.broadcast_to(value, self.shape)[members])
+        subset._stepper = integrators.get_stepper(self.integrator)
+        return subset
+
+    def accelerations(self):
+        return angular_accelerations(self.theta1, self.omega1, self.theta2, self.omega2,
+                                     self.L1, self.L2, self.M1, self.M2, self.g)
+
+    # --- Derivadas do estado, no formato de integrators.py ---
+    def derivatives(self, t, y):
+        alpha1, alpha2 = angular_accelerations(y[0], y[2], y[1], y[3],
+                                               self.L1, self.L2, self.M1, self.M2, self.g)
+        return np.stack((y[2], y[3], alpha1, alpha2))
+
+    # --- Passo de integração (Euler semi-implícito por padrão, como em double_pendulum.py) ---
+    def step(self, dt):
+        if self.integrator == 'euler':
+            # Caminho rápido: atualiza o estado no lugar, sem arrays intermediários do integrador
+            alpha1, alpha2 = self.accelerations()
+            self.state[2] += alpha1 * dt
+            self.state[3] += alpha2 * dt
+            self.state[0] += self.state[2] * dt
+            self.state[1] += self.state[3] * dt
+        else:
+            self.state[...] = self._stepper(self.derivatives, self.time, self.state, dt)
+
+        self.time += dt
+
+    def run(self, n_steps, dt):
+        for _ in range(n_steps):
+            self.step(dt)
+        return self
+
+    # --- Posições dos bobs em metros (origem no pivô, y para baixo) ---
+    def positions(self):
+        x1 = self.L1 * np.sin(self.theta1)
+        y1 = self.L1 * np.cos(self.theta1)
+        x2 = x1 + self.L2 * np.sin(self.theta2)
+        y2 = y1 + self.L2 * np.cos(self.theta2)
+        return x1, y1, x2, y2
+
+    # --- Energia total (J), útil para medir o desvio numérico ---
+    def energy(self):
+        _, y1, _, y2 = self.positions()
+        potential = -(self.M1 * self.g * y1 + self.M2 * self.g * y2)
+        v1_squared = (self.L1 * self.omega1)**2
+        v2_squared = v1_squared + (self.L2 * self.omega2)**2 + \
+            2 * self.L1 * self.L2 * self.omega1 * self.omega2 * np.cos(self.theta1 - self.theta2)
+        kinetic = 0.5 * self.M1 * v1_squared + 0.5 * self.M2 * v2_squared
+        return potential + kinetic
@@ -0,0 +1,215 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import integrators
+from double_pendulum_ensemble import GRAVITY_REAL, DoublePendulumEnsemble
+
+# --- Varredura de Parâmetros do Pêndulo Duplo ("mapas de flip") ---
+# Divide uma grade N-D de parâmetros (por padrão theta1 x theta2, em graus) em blocos
+# ("tiles") distribuídos num pool de processos. Cada bloco é integrado como um ensemble
+# vetorizado e gravado em disco assim que termina; uma varredura interrompida retoma
+# pulando os blocos já gravados. Resultados por membro:
+#   flip_time  - tempo até o primeiro flip (|theta| > 180 graus), NaN se não houve
+#   flip_arm   - 0 = nenhum flip, 1 = braço 1 virou primeiro, 2 = braço 2 virou primeiro
+#   final_winding - voltas completas do braço 2 no estado final (classificação final)
+# Exemplo:
+#   python flip_sweep.py --axis theta1 -180 180 801 --axis theta2 -180 180 801 --t-max 100 -o mapa
+
+AXIS_NAMES = ('theta1', 'theta2', 'L1', 'L2', 'M1', 'M2')
+RESULT_FIELDS = ('flip_time', 'flip_arm', 'final_winding')
+MANIFEST_NAME = 'manifest.json'
+
+
+# --- Especificação da varredura (gravada no manifesto, para retomar com segurança) ---
+def make_spec(axes, fixed, t_max, dt, integrator, tile_size, gravity=GRAVITY_REAL):
+    return {
+        'axes': {name: [float(start), float(stop), int(count)] for name, (start, stop, count) in axes.items()},
+        'fixed': {name: float(value) for name, value in fixed.items()},
+        't_max': float(t_max),
+        'dt': float(dt),
+        'integrator': integrator,
+        'tile_size': int(tile_size),
+        'gravity': float(gravity),
+    }
+
+
+def grid_shape(spec):
+    return tuple(count for _, _, count in spec['axes'].values())
+
+
+def tile_count(spec):
+    return math.ceil(math.prod(grid_shape(spec)) / spec['tile_size'])
+
+
+# --- Parâmetros dos membros de um bloco (índices planos na grade) ---
+def tile_parameters(spec, tile_index):
+    shape = grid_shape(spec)
+    total = math.prod(shape)
+    flat = np.arange(tile_index * spec['tile_size'], min((tile_index + 1) * spec['tile_size'], total))
+    coordinates = np.unravel_index(flat, shape)
+    parameters = dict(spec['fixed'])
+    for (name, (start, stop, count)), index in zip(spec['axes'].items(), coordinates):
+        parameters[name] = np.linspace(start, stop, count)[index]
+    return parameters
+
+
+# --- Energia mínima para que cada braço possa virar (partindo do repouso) ---
+def can_flip(theta1, theta2, L1, L2, M1, M2, g):
+    energy = -g * ((M1 + M2) * L1 * np.cos(theta1) + M2 * L2 * np.cos(theta2))
+    flip_arm1_energy = g * ((M1 + M2) * L1 - M2 * L2)
+    flip_arm2_energy = g * (M2 * L2 - (M1 + M2) * L1)
+    return energy >= np.minimum(flip_arm1_energy, flip_arm2_energy)
+
+
+# --- Integra um bloco e classifica cada membro ---
+def compute_tile(spec, tile_index):
+    parameters = tile_parameters(spec, tile_index)
+    theta1 = np.radians(parameters.pop('theta1'))
+    theta2 = np.radians(parameters.pop('theta2'))
+    g = spec['gravity']
+    ensemble = DoublePendulumEnsemble(theta1, theta2, g=g, integrator=spec['integrator'], **parameters)
+    n_members = len(ensemble)
+
+    flip_time = np.full(n_members, np.nan)
+    flip_arm = np.zeros(n_members, dtype=np.int8)
+    final_theta2 = ensemble.theta2.copy()
+
+    # Membros sem energia para virar nunca são integrados
+    members = np.flatnonzero(can_flip(ensemble.theta1, ensemble.theta2, ensemble.L1, ensemble.L2,
+                                      ensemble.M1, ensemble.M2, g))
+    active = ensemble.select(members)
+    dt = spec['dt']
+    n_steps = int(round(spec['t_max'] / dt))
+    for step_index in range(1, n_steps + 1):
+        if len(members) == 0:
+            break
+        previous = np.abs(active.state[:2])
+        active.step(dt)
+        current = np.abs(active.state[:2])
+        flipped = current > math.pi
+        any_flipped = flipped[0] | flipped[1]
+        if any_flipped.any():
+            # Instante do flip interpolado linearmente dentro do passo, para cada braço
+            crossing = np.clip((math.pi - previous) / np.maximum(current - previous, 1e-300), 0.0, 1.0)
+            crossing = np.where(flipped, crossing, np.inf)[:, any_flipped]
+            done = members[any_flipped]
+            flip_time[done] = (step_index - 1 + crossing.min(axis=0)) * dt
+            flip_arm[done] = crossing.argmin(axis=0) + 1
+            final_theta2[done] = active.theta2[any_flipped]
+            # Compacta o ensemble: membros que já viraram saem da integração
+            members = members[~any_flipped]
+            active = active.select(~any_flipped)
+    final_theta2[members] = active.theta2
+
+    final_winding = np.floor((final_theta2 + math.pi) / (2 * math.pi)).astype(np.int32)
+    return {'flip_time': flip_time, 'flip_arm': flip_arm, 'final_winding': final_winding}
+
+
+def tile_path(out_dir, tile_index):
+    return os.path.join(out_dir, f'tile_{tile_index:06d}.npz')
+
+
+# --- Executado em cada processo do pool: calcula e grava um bloco ---
+# compute(spec, tile_index) -> {campo: array por membro}; outras varreduras (ex.:
+# lyapunov.py) passam a sua própria função, definida no nível do módulo.
+def run_tile(spec, out_dir, tile_index, compute=compute_tile):
+    results = compute(spec, tile_index)
+    path = tile_path(out_dir, tile_index)
+    temporary_path = path + '.tmp.npz'
+    np.savez(temporary_path, **results)
+    # Renomeação atômica: um bloco interrompido nunca fica meio gravado
+    os.replace(temporary_path, path)
+    return tile_index
+
+
+def load_or_create_manifest(out_dir, spec):
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as manifest_file:
+            existing = json.load(manifest_file)
+        if existing != spec:
+            raise ValueError(f"{out_dir} contém outra varredura; use outro diretório para novos parâmetros.")
+    else:
+        with open(manifest_path, 'w') as manifest_file:
+            json.dump(spec, manifest_file, indent=2)
+
+
+# --- Roda (ou retoma) a varredura; devolve os índices dos blocos calculados agora ---
+def run_sweep(spec, out_dir, workers=None, progress=True, compute=compute_tile):
+    load_or_create_manifest(out_dir, spec)
+    pending = [index for index in range(tile_count(spec)) if not os.path.exists(tile_path(out_dir, index))]
+    total = tile_count(spec)
+    if progress:
+        print(f"{total - len(pending)}/{total} blocos já prontos; calculando {len(pending)}.", file=sys.stderr)
+
+    start_time = time.perf_counter()
+    done = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_tile, spec, out_dir, index, compute) for index in pending]
+        for future in as_completed(futures):
+            done.append(future.result())
+            if progress:
+                elapsed = time.perf_counter() - start_time
+                print(f"\rbloco {len(done)}/{len(pending)} ({elapsed:.1f}s)", end='', file=sys.stderr)
+    if progress and pending:
+        print(file=sys.stderr)
+    return done
+
+
+# --- Junta os blocos gravados em arrays com a forma da grade ---
+def assemble(out_dir, fields=RESULT_FIELDS):
+    with open(os.path.join(out_dir, MANIFEST_NAME)) as manifest_file:
+        spec = json.load(manifest_file)
+    shape = grid_shape(spec)
+    tiles = [np.load(tile_path(out_dir, index)) for index in range(tile_count(spec))]
+    return {field: np.concatenate([tile[field] for tile in tiles]).reshape(shape) for field in fields}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Varredura paralela de mapas de flip do pêndulo duplo.")
+    parser.add_argument('--axis', nargs=4, action='append', metavar=('NOME', 'INÍCIO', 'FIM', 'PONTOS'),
+                        help=f"Eixo da grade ({', '.join(AXIS_NAMES)}); ângulos em graus. Repetível.")
+    parser.add_argument('--L1', type=float, default=2.0)
+    parser.add_argument('--L2', type=float, default=2.0)
+    parser.add_argument('--M1', type=float, default=1.0)
+    parser.add_argument('--M2', type=float, default=1.0)
+    parser.add_argument('--theta1', type=float, default=90.0)
+    parser.add_argument('--theta2', type=float, default=0.0)
+    parser.add_argument('--t-max', type=float, default=100.0, help="Tempo simulado máximo (s)")
+    parser.add_argument('--dt', type=float, default=0.01, help="Passo de integração (s)")
+    parser.add_argument('--integrator', choices=list(integrators.INTEGRATORS), default='rk4')
+    parser.add_argument('--tile-size', type=int, default=4096, help="Membros por bloco")
+    parser.add_argument('--workers', type=int, default=None, help="Processos (padrão: todos os núcleos)")
+    parser.add_argument('-o', '--out', required=True, help="Diretório dos blocos (retoma se já existir)")
+    args = parser.parse_args(argv)
+
+    axes = {}
+    for name, start, stop, count in args.axis or [('theta1', -180, 180, 201), ('theta2', -180, 180, 201)]:
+        if name not in AXIS_NAMES:
+            parser.error(f"Eixo desconhecido: {name}")
+        axes[name] = (float(start), float(stop), int(count))
+    fixed = {name: getattr(args, name) for name in AXIS_NAMES if name not in axes}
+
+    spec = make_spec(axes, fixed, args.t_max, args.dt, args.integrator, args.tile_size)
+    try:
+        run_sweep(spec, args.out, args.workers)
+    except ValueError as error:
+        parser.error(str(error))
+
+    results = assemble(args.out)
+    for field, values in results.items():
+        np.save(os.path.join(args.out, f'{field}.npy'), values)
+    print(f"Mapas gravados em {args.out} (forma {grid_shape(spec)}).", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import os
+import queue
+import threading
+
+import numpy as np
+import pygame
+
+# --- Exportação de Frames Fora da Tela (PNG ou RGB cru) ---
+# Com SIM_EXPORT definido, os scripts rodam sem janela (driver de vídeo "dummy" do SDL,
+# a menos que SDL_VIDEODRIVER já esteja definido), começam a simulação sozinhos e avançam
+# exatamente DT de tempo simulado por frame, sem esperar pelo clock: o vídeo sai com FPS
+# frames por segundo simulado, sem frames perdidos, tão rápido quanto a CPU permitir.
+# A cada frame o conteúdo da tela é copiado uma vez (conversão para RGB) num buffer de um
+# conjunto pré-alocado e entra numa fila limitada; uma thread escritora grava os buffers
+# (sem outra cópia) e os devolve ao conjunto. O laço principal só espera pelo disco quando
+# a fila está cheia. Destino terminado em .rgb/.raw: fluxo RGB cru (largura * altura * 3
+# bytes por frame, linha a linha); outro destino: diretório com frame_000000.png, ...
+# Exemplos:
+#   SIM_EXPORT=frames SIM_EXPORT_FRAMES=1800 python double_pendulum.py
+#   ffmpeg -framerate 60 -i frames/frame_%06d.png -pix_fmt yuv420p duplo.mp4
+#   SIM_EXPORT=duplo.rgb python double_pendulum.py
+#   ffmpeg -f rawvideo -pixel_format rgb24 -video_size 800x600 -framerate 60 -i duplo.rgb duplo.mp4
+#
+# Variáveis de ambiente:
+#   SIM_EXPORT=destino     liga a exportação (diretório de PNGs ou arquivo .rgb/.raw)
+#   SIM_EXPORT_FRAMES=N    frames exportados antes de sair (padrão: 600)
+#   SIM_EXPORT_QUEUE=N     frames na fila da thread escritora (padrão: 8)
+
+EXPORT_PATH = os.environ.get('SIM_EXPORT') or None
+EXPORT_FRAMES = int(os.environ.get('SIM_EXPORT_FRAMES', '600'))
+EXPORT_QUEUE = int(os.environ.get('SIM_EXPORT_QUEUE', '8'))
+RAW_EXTENSIONS = ('.rgb', '.raw')
+
+if EXPORT_PATH:
+    # Sem janela: precisa valer antes de pygame.init() nos scripts
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+
+class FrameExporter:
+    def __init__(self, path, size, queue_frames=EXPORT_QUEUE):
+        self.path = path
+        self.size = width, height = size
+        self.raw = path.lower().endswith(RAW_EXTENSIONS)
+        if self.raw:
+            self._stream = open(path, 'wb')
+        else:
+            os.makedirs(path, exist_ok=True)
+            self._stream = None
+        self.frame_count = 0
+        # Buffers (altura, largura, 3): os da fila, o que está sendo gravado e o que está sendo preenchido
+        self._free = queue.Queue()
+        for _ in range(queue_frames + 2):
+            self._free.put(np.empty((height, width, 3), dtype=np.uint8))
+        self._pending = queue.Queue(maxsize=queue_frames)
+        self._error = None
+        self._writer = threading.Thread(target=self._write_frames, name='frame-export', daemon=True)
+        self._writer.start()
+
+    # --- Copia a superfície para um buffer livre e o entrega à thread escritora ---
+    def submit(self, surface):
+        self._raise_writer_error()
+        buffer = self._free.get()
+        pixels = pygame.surfarray.pixels3d(surface) # Visão (largura, altura, 3) dos pixels, sem cópia
+        np.copyto(buffer, pixels.transpose(1, 0, 2))
+        del pixels # Libera o lock da superfície
+        self._pending.put((self.frame_count, buffer))
+        self.frame_count += 1
+
+    def _write_frames(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            index, buffer = item
+            try:
+                if self._error is None:
+                    if self.raw:
+                        self._stream.write(buffer) # Buffer contíguo: gravado direto, sem bytes intermediários
+                    else:
+                        frame = pygame.image.frombuffer(buffer, self.size, 'RGB')
+                        pygame.image.save(frame, os.path.join(self.path, f'frame_{index:06d}.png'))
+            except Exception as error: # Repassado ao laço principal no próximo submit/close
+                self._error = error
+            self._free.put(buffer)
+
+    def _raise_writer_error(self):
+        if self._error is not None:
+            raise RuntimeError(f"Falha ao exportar frames para {self.path}") from self._error
+
+    # --- Espera a fila esvaziar e fecha o destino ---
+    def close(self):
+        if self._writer.is_alive():
+            self._pending.put(None)
+            self._writer.join()
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        self._raise_writer_error()
@@ -0,0 +1,81 @@
+# --- Passo Fixo com Acumulador (física desacoplada do desenho) ---
+# A cada frame o tempo real decorrido (multiplicado pelo time-warp) entra no acumulador,
+# e a física avança em passos fixos de physics_dt enquanto houver tempo acumulado.
+# Um frame atrasado gera passos de recuperação, limitados para evitar a "espiral da morte".
+
+import time
+
+TIME_WARP_STEPS = (0.25, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+STEP_BATCH = 64 # Passos por lote em batches()
+
+
+class FixedTimestep:
+    def __init__(self, dt, substeps=1, time_warp=1.0, max_frame_time=0.25, max_steps_per_frame=5000,
+                 max_update_time=None):
+        self.dt = dt
+        self.substeps = substeps
+        self.physics_dt = dt / substeps
+        self.time_warp = time_warp
+        # Tempo real máximo considerado por frame (s) e teto de passos por frame
+        self.max_frame_time = max_frame_time
+        self.max_steps_per_frame = max_steps_per_frame
+        # Orçamento de tempo real (s) para a física em cada frame (padrão: meio frame)
+        self.max_update_time = dt / 2 if max_update_time is None else max_update_time
+        self.accumulator = 0.0
+        self.lagging = False # True quando o último frame descartou tempo por causa do teto
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.lagging = False
+
+    # --- Quantos passos de física executar neste frame ---
+    def advance(self, frame_seconds):
+        self.accumulator += min(frame_seconds, self.max_frame_time) * self.time_warp
+        steps = int(self.accumulator / self.physics_dt)
+        self.lagging = steps > self.max_steps_per_frame or frame_seconds > self.max_frame_time
+        if steps > self.max_steps_per_frame:
+            # Espiral da morte: descarta o atraso em vez de tentar recuperá-lo
+            steps = self.max_steps_per_frame
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.physics_dt
+        return steps
+
+    # --- Itera sobre os passos do frame, respeitando o orçamento de tempo real ---
+    def steps(self, frame_seconds):
+        n_steps = self.advance(frame_seconds)
+        deadline = time.perf_counter() + self.max_update_time
+        for step_index in range(n_steps):
+            if step_index and time.perf_counter() > deadline:
+                # A física não acompanha o time-warp: descarta o restante deste frame
+                self.accumulator = 0.0
+                self.lagging = True
+                return
+            yield self.physics_dt
+
+    # --- Como steps(), mas em lotes de até batch passos (para laços step_many) ---
+    # O orçamento de tempo real é conferido entre lotes, não entre passos.
+    def batches(self, frame_seconds, batch=STEP_BATCH):
+        n_steps = self.advance(frame_seconds)
+        deadline = time.perf_counter() + self.max_update_time
+        done = 0
+        while done < n_steps:
+            if done and time.perf_counter() > deadline:
+                self.accumulator = 0.0
+                self.lagging = True
+                return
+            count = min(batch, n_steps - done)
+            yield count
+            done += count
+
+    # --- Fração do próximo passo já acumulada (para interpolar o desenho) ---
+    @property
+    def alpha(self):
+        return self.accumulator / self.physics_dt
+
+    # --- Time-warp em degraus (teclas '+' e '-') ---
+    def faster(self):
+        self.time_warp = next((warp for warp in TIME_WARP_STEPS if warp > self.time_warp), self.time_warp)
+
+    def slower(self):
+        self.time_warp = next((warp for warp in reversed(TIME_WARP_STEPS) if warp < self.time_warp), self.time_warp)
@@ -0,0 +1,269 @@
+import argparse
+import math
+import sys
+
+import numpy as np
+
+import integrators
+import pendulum_analytic
+import projectile_analytic
+import projectile_drag
+from bodies import DoublePendulum, SimplePendulum
+from double_pendulum_ensemble import GRAVITY_REAL, DoublePendulumEnsemble
+from physics import make_double_pendulum_rhs
+
+# --- Modo Headless (sem janela) ---
+# Roda a física das três simulações sem Pygame, sem display e sem clock.tick,
+# com os mesmos parâmetros das caixas de input, e grava a série temporal do estado
+# em CSV ou NPY. Exemplos:
+#   python headless.py simple --length 5 --angle 45 --duration 60 -o simples.csv
+#   python headless.py simple --angle 170 --duration 10000 --every 600 --analytic -o simples_exato.npy
+#   python headless.py double --theta1 90 --theta2 0 --duration 30 -o duplo.npy
+#   python headless.py projectile --velocity 10 --angle 45 --height 0.5 -o projetil.csv
+#   python headless.py projectile --velocity 30 --angle 40 --drag quadratic --cd 0.47 --mass 0.145 --area 0.0043
+
+DEFAULT_DT = 1 / 60
+
+
+# --- Laço de integração genérico ---
+def simulate(rhs, y0, dt, duration, integrator='rk4', record_every=1, observe=None, stop=None, locate=None):
+    # observe(t, y) -> tupla de valores extras por linha; stop(t, y) -> True encerra a simulação;
+    # locate(y_anterior, y, dt) -> fração do último passo em que o evento de parada ocorreu
+    # (a última linha passa a ser o estado interpolado nesse instante, não o fim do passo)
+    stepper = integrators.get_stepper(integrator)
+    n_steps = int(round(duration / dt))
+    n_records = n_steps // record_every + 1
+    y = np.array(y0, dtype=float)
+
+    def row(t, y):
+        extras = observe(t, y) if observe else ()
+        return (t, *y, *extras)
+
+    first_row = row(0.0, y)
+    series = np.empty((n_records, len(first_row)))
+    series[0] = first_row
+    n_recorded = 1
+
+    t = 0.0
+    for step_index in range(1, n_steps + 1):
+        y_previous, t_previous = y, t
+        y = stepper(rhs, t, y, dt)
+        t = step_index * dt
+        stopped = stop is not None and stop(t, y)
+        if stopped and locate is not None:
+            fraction = float(locate(y_previous, y, dt))
+            y = integrators.hermite_interpolate(y_previous, rhs(t_previous, y_previous), y, rhs(t, y), dt, fraction)
+            t = t_previous + fraction * dt
+        if step_index % record_every == 0 or stopped:
+            if n_recorded == len(series):
+                series = np.resize(series, (n_recorded + 1, series.shape[1]))
+            series[n_recorded] = row(t, y)
+            n_recorded += 1
+        if stopped:
+            break
+    return series[:n_recorded]
+
+
+# --- Laço rápido para trajetórias sem evento de parada: step_many de bodies.py ---
+# Mesmas linhas que simulate() (tempo = índice do passo * dt), sem colunas extras.
+def simulate_body(body, dt, duration, record_every=1):
+    n_steps = int(round(duration / dt))
+    n_records = n_steps // record_every + 1
+    series = np.empty((n_records, 1 + len(body.FIELDS)))
+    series[0, 1:] = body.state
+    if record_every == 1:
+        body.step_many(n_steps, dt, series[1:])
+    else:
+        for record_index in range(1, n_records):
+            body.step_many(record_every, dt)
+            series[record_index, 1:] = body.state
+    series[:, 0] = np.arange(n_records) * record_every * dt
+    return series
+
+
+# --- Pêndulo Simples ---
+def run_simple_pendulum(args):
+    if not (args.length > 0 and args.mass > 0 and abs(args.angle) <= 170):
+        raise ValueError("Valores de entrada inválidos para simulação (comprimento > 0, massa > 0, ângulo entre -170 e 170).")
+
+    if args.analytic:
+        # Solução exata (funções elípticas) nos mesmos instantes, sem integração numérica
+        t = np.arange(int(round(args.duration / args.dt)) // args.every + 1) * args.every * args.dt
+        angle, angular_velocity = pendulum_analytic.state_at(t, math.radians(args.angle), 0.0, args.length, args.gravity)
+        series = np.column_stack((t, angle, angular_velocity))
+    else:
+        pendulum = SimplePendulum(args.length, math.radians(args.angle), 0.0, args.gravity, args.integrator)
+        series = simulate_body(pendulum, args.dt, args.duration, args.every)
+
+    # Energias de todas as linhas de uma vez
+    height_from_lowest = args.length * (1 - np.cos(series[:, 1]))
+    potential_energy = args.mass * args.gravity * height_from_lowest
+    kinetic_energy = 0.5 * args.mass * (args.length * series[:, 2]) ** 2
+    series = np.column_stack((series, potential_energy, kinetic_energy, potential_energy + kinetic_energy))
+    columns = ['time', 'angle', 'angular_velocity', 'potential_energy', 'kinetic_energy', 'total_energy']
+    return columns, series
+
+
+# --- Ângulo equivalente em (-pi, pi] ---
+def wrap_angle(angle):
+    return math.pi - (math.pi - angle) % (2 * math.pi)
+
+
+# --- Pêndulo Duplo ---
+def run_double_pendulum(args):
+    if not (args.L1 > 0 and args.L2 > 0 and args.M1 > 0 and args.M2 > 0):
+        raise ValueError("Valores de entrada inválidos para simulação (comprimentos e massas devem ser > 0).")
+
+    def energy(t, y):
+        ensemble = DoublePendulumEnsemble(y[0], y[1], args.L1, args.L2, args.M1, args.M2,
+                                          omega1=y[2], omega2=y[3], g=args.gravity)
+        return (float(ensemble.energy()),)
+
+    # Evento: algum dos braços passa por cima do pivô (|theta| > 180 graus). Os ângulos
+    # iniciais vão para (-180, 180] graus, então o primeiro passo com |theta| > 180 é um
+    # cruzamento para cima entre duas amostras, não um estado inicial já "virado"
+    def flipped(t, y):
+        return abs(y[0]) > math.pi or abs(y[1]) > math.pi
+
+    # Instante do flip dentro do passo: o primeiro braço a cruzar +-180 graus para cima
+    def locate_flip(y_previous, y, dt):
+        fractions = [integrators.locate_crossing(abs(y_previous[arm]), y_previous[arm + 2] * math.copysign(1.0, y_previous[arm]),
+                                                 abs(y[arm]), y[arm + 2] * math.copysign(1.0, y[arm]), dt, math.pi)
+                     for arm in (0, 1) if abs(y_previous[arm]) <= math.pi < abs(y[arm])]
+        return min(fractions)
+
+    y0 = [wrap_angle(math.radians(args.theta1)), wrap_angle(math.radians(args.theta2)), 0.0, 0.0]
+    if args.until_flip:
+        rhs = make_double_pendulum_rhs(args.L1, args.L2, args.M1, args.M2, args.gravity)
+        series = simulate(rhs, y0, args.dt, args.duration, args.integrator, args.every,
+                          observe=energy, stop=flipped, locate=locate_flip)
+    else:
+        pendulum = DoublePendulum(args.L1, args.L2, args.M1, args.M2, *y0, gravity=args.gravity,
+                                  integrator=args.integrator)
+        series = simulate_body(pendulum, args.dt, args.duration, args.every)
+        ensemble = DoublePendulumEnsemble(series[:, 1], series[:, 2], args.L1, args.L2, args.M1, args.M2,
+                                          omega1=series[:, 3], omega2=series[:, 4], g=args.gravity)
+        series = np.column_stack((series, ensemble.energy()))
+    columns = ['time', 'theta1', 'theta2', 'omega1', 'omega2', 'total_energy']
+    return columns, series
+
+
+# --- Projétil (metros, y para cima, origem no ponto de lançamento no chão) ---
+def run_projectile(args):
+    if not (args.velocity > 0 and 0 <= args.angle <= 90):
+        raise ValueError("Valores de entrada inválidos para lançamento (velocidade > 0, ângulo entre 0 e 90).")
+
+    launch_angle_radians = math.radians(args.angle)
+    y0 = [0.0, args.height,
+          args.velocity * math.cos(launch_angle_radians), args.velocity * math.sin(launch_angle_radians)]
+
+    # Evento: impacto com o chão (descendo, abaixo de y = 0), com o instante exato dentro do passo
+    def hit_ground(t, y):
+        return y[1] <= 0 and y[3] < 0
+
+    def locate_impact(y_previous, y, dt):
+        return integrators.locate_crossing(y_previous[1], y_previous[3], y[1], y[3], dt, 0.0, direction=-1.0)
+
+    columns = ['time', 'x', 'y', 'vx', 'vy']
+    if args.analytic and args.drag != 'vacuum':
+        raise ValueError("A solução exata (--analytic) só existe sem arrasto (--drag vacuum).")
+    if args.analytic:
+        # Solução exata amostrada a cada dt, sem integração numérica
+        flight_time = float(projectile_analytic.time_of_flight(args.velocity, args.angle, args.height, args.gravity))
+        end_time = args.duration if args.no_impact_stop else min(args.duration, flight_time)
+        # Pelo menos o instante do lançamento (tempo de voo zero: lançado rente ao chão na horizontal)
+        t = np.arange(0.0, end_time, args.dt * args.every) if end_time > 0 else np.zeros(1)
+        if not args.no_impact_stop and t[-1] < end_time:
+            t = np.append(t, end_time)
+        velocity_x, velocity_y = projectile_analytic.velocity_components(args.velocity, args.angle)
+        series = np.column_stack((t, velocity_x * t, args.height + velocity_y * t - 0.5 * args.gravity * t**2,
+                                  np.full_like(t, velocity_x), velocity_y - args.gravity * t))
+        return columns, series
+
+    rhs = projectile_drag.make_drag_rhs(args.drag, args.cd, args.mass, args.area, args.gravity)
+    series = simulate(rhs, y0, args.dt, args.duration, args.integrator, args.every,
+                      stop=None if args.no_impact_stop else hit_ground,
+                      locate=None if args.no_impact_stop else locate_impact)
+    return columns, series
+
+
+# --- Gravação da série temporal ---
+def write_series(path, columns, series):
+    if isinstance(path, str) and path.endswith('.npy'):
+        # Array estruturado: os nomes das colunas vão junto no arquivo
+        structured = np.empty(len(series), dtype=[(name, np.float64) for name in columns])
+        for index, name in enumerate(columns):
+            structured[name] = series[:, index]
+        np.save(path, structured)
+    else:
+        np.savetxt(path, series, delimiter=',', header=','.join(columns), comments='', fmt='%.10g')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Roda as simulações sem janela e grava a série temporal (CSV/NPY).")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--duration', type=float, default=10.0, help="Tempo simulado (s)")
+    common.add_argument('--dt', type=float, default=DEFAULT_DT, help="Passo de integração (s)")
+    common.add_argument('--integrator', choices=list(integrators.INTEGRATORS), default='rk4')
+    common.add_argument('--every', type=int, default=1, help="Grava uma linha a cada N passos")
+    common.add_argument('--gravity', type=float, default=GRAVITY_REAL, help="Gravidade (m/s^2)")
+    common.add_argument('-o', '--output', default=None, help="Arquivo de saída (.csv ou .npy); padrão: CSV na saída padrão")
+
+    subparsers = parser.add_subparsers(dest='simulation', required=True)
+
+    simple = subparsers.add_parser('simple', parents=[common], help="Pêndulo simples")
+    simple.add_argument('--length', type=float, default=5.0, help="Comprimento (m)")
+    simple.add_argument('--angle', type=float, default=45.0, help="Ângulo inicial (graus)")
+    simple.add_argument('--mass', type=float, default=1.0, help="Massa (kg)")
+    simple.add_argument('--analytic', action='store_true', help="Usa a solução exata em vez de integrar")
+    simple.set_defaults(run=run_simple_pendulum)
+
+    double = subparsers.add_parser('double', parents=[common], help="Pêndulo duplo")
+    double.add_argument('--L1', type=float, default=2.0, help="Comprimento 1 (m)")
+    double.add_argument('--M1', type=float, default=1.0, help="Massa 1 (kg)")
+    double.add_argument('--theta1', type=float, default=90.0, help="Ângulo 1 (graus)")
+    double.add_argument('--L2', type=float, default=2.0, help="Comprimento 2 (m)")
+    double.add_argument('--M2', type=float, default=1.0, help="Massa 2 (kg)")
+    double.add_argument('--theta2', type=float, default=0.0, help="Ângulo 2 (graus)")
+    double.add_argument('--until-flip', action='store_true', help="Para quando algum braço passa por cima do pivô")
+    double.set_defaults(run=run_double_pendulum)
+
+    projectile = subparsers.add_parser('projectile', parents=[common], help="Projétil")
+    projectile.add_argument('--velocity', type=float, default=10.0, help="Velocidade inicial (m/s)")
+    projectile.add_argument('--angle', type=float, default=45.0, help="Ângulo (graus)")
+    projectile.add_argument('--height', type=float, default=0.5, help="Altura inicial (m)")
+    projectile.add_argument('--no-impact-stop', action='store_true', help="Não para no impacto com o chão")
+    projectile.add_argument('--analytic', action='store_true', help="Usa a solução exata em vez de integrar")
+    projectile.add_argument('--drag', choices=projectile_drag.DRAG_MODELS, default='vacuum', help="Resistência do ar")
+    projectile.add_argument('--cd', type=float, default=0.47, help="Coeficiente de arrasto")
+    projectile.add_argument('--mass', type=float, default=0.145, help="Massa (kg)")
+    projectile.add_argument('--area', type=float, default=0.0043, help="Área frontal (m^2)")
+    projectile.set_defaults(run=run_projectile, duration=60.0)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.duration <= 0:
+        parser.error("--duration deve ser > 0.")
+    if args.dt <= 0:
+        parser.error("--dt deve ser > 0.")
+    if args.every < 1:
+        parser.error("--every deve ser >= 1.")
+    try:
+        columns, series = args.run(args)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.output:
+        write_series(args.output, columns, series)
+        print(f"{len(series)} linhas gravadas em {args.output} (t final = {series[-1, 0]:.4f}s)", file=sys.stderr)
+    else:
+        write_series(sys.stdout, columns, series)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
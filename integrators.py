@@ -0,0 +1,184 @@
+import numpy as np
+
+# --- Integradores Numéricos Compartilhados ---
+# Todos os integradores recebem uma função de derivadas f(t, y) -> dy/dt.
+# Convenção do vetor de estado: a primeira metade de y (eixo 0) são as posições
+# (ângulos, coordenadas) e a segunda metade as velocidades correspondentes.
+# O estado pode ter dimensões extras (ensembles), por exemplo y.shape == (4, N).
+
+
+def _split(y):
+    half = y.shape[0] // 2
+    return y[:half], y[half:]
+
+
+# --- Euler semi-implícito (o método original das simulações) ---
+def euler_step(f, t, y, dt):
+    q, v = _split(y)
+    a = _split(f(t, y))[1]
+    v_new = v + a * dt
+    q_new = q + v_new * dt
+    return np.concatenate((q_new, v_new))
+
+
+# --- Runge-Kutta clássico de 4ª ordem (passo fixo) ---
+def rk4_step(f, t, y, dt):
+    k1 = f(t, y)
+    k2 = f(t + dt / 2, y + k1 * (dt / 2))
+    k3 = f(t + dt / 2, y + k2 * (dt / 2))
+    k4 = f(t + dt, y + k3 * dt)
+    return y + (k1 + 2 * k2 + 2 * k3 + k4) * (dt / 6)
+
+
+# --- Velocity Verlet / Leapfrog (simplético) ---
+# É simplético quando a aceleração depende apenas das posições (pêndulo simples,
+# projétil). Para acelerações que dependem da velocidade (pêndulo duplo em ângulos),
+# a aceleração final é avaliada com a velocidade de meio passo.
+def verlet_step(f, t, y, dt):
+    q, v = _split(y)
+    a = _split(f(t, y))[1]
+    v_half = v + a * (dt / 2)
+    q_new = q + v_half * dt
+    a_new = _split(f(t + dt, np.concatenate((q_new, v_half))))[1]
+    v_new = v_half + a_new * (dt / 2)
+    return np.concatenate((q_new, v_new))
+
+
+# --- Dormand-Prince 5(4) (coeficientes do passo adaptativo) ---
+_DP_C = (0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0, 1.0)
+_DP_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+# Diferença entre os pesos de 5ª e 4ª ordem (estimativa do erro local)
+_DP_E = (71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+
+def rk45_step(f, t, y, dt, k1=None):
+    # Retorna (y_novo, erro_estimado, derivada_em_y_novo); a última é reaproveitada
+    # como k1 do passo seguinte (propriedade FSAL do Dormand-Prince).
+    k = [f(t, y) if k1 is None else k1]
+    for stage in range(1, 7):
+        y_stage = y
+        for coefficient, k_j in zip(_DP_A[stage], k):
+            if coefficient != 0.0:
+                y_stage = y_stage + k_j * (coefficient * dt)
+        k.append(f(t + _DP_C[stage] * dt, y_stage))
+        if stage == 6:
+            y_new = y_stage
+    error = sum(k_j * (e * dt) for e, k_j in zip(_DP_E, k) if e != 0.0)
+    return y_new, error, k[6]
+
+
+def integrate_adaptive(f, t, y, t_end, h=None, rtol=1e-6, atol=1e-9, max_steps=100000):
+    # Avança de t até t_end com controle de erro; retorna (y, h sugerido para o próximo trecho).
+    # A norma do erro é o máximo sobre todas as componentes, para que nenhum membro
+    # de um ensemble fique com erro acima da tolerância.
+    if h is None:
+        h = (t_end - t) / 10
+    k1 = None
+    steps = 0
+    while t < t_end:
+        if steps == max_steps:
+            raise RuntimeError("Número máximo de passos atingido no integrador adaptativo.")
+        steps += 1
+        remaining = t_end - t
+        step = min(h, remaining)
+        y_new, error, k_new = rk45_step(f, t, y, step, k1)
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        error_norm = float(np.max(np.abs(error) / scale))
+        if error_norm <= 1.0:
+            t = t_end if step == remaining else t + step
+            y = y_new
+            k1 = k_new
+        # Fator de segurança 0.9, crescimento limitado a 5x e redução a 0.2x
+        factor = 5.0 if error_norm == 0 else min(5.0, max(0.2, 0.9 * error_norm ** -0.2))
+        if step == remaining and error_norm <= 1.0:
+            # Não deixa o último passo (truncado) encolher o passo sugerido
+            h = max(h, step * factor)
+        else:
+            h = step * factor
+    return y, h
+
+
+class AdaptiveStepper:
+    # Adaptador que dá ao RK45 a mesma assinatura dos integradores de passo fixo:
+    # cada chamada avança exatamente dt, com quantos subpassos forem necessários.
+    def __init__(self, rtol=1e-6, atol=1e-9):
+        self.rtol = rtol
+        self.atol = atol
+        self.h = None
+
+    def __call__(self, f, t, y, dt):
+        y, self.h = integrate_adaptive(f, t, y, t + dt, self.h, self.rtol, self.atol)
+        return y
+
+
+INTEGRATORS = {
+    'euler': euler_step,
+    'rk4': rk4_step,
+    'verlet': verlet_step,
+    'rk45': AdaptiveStepper,
+}
+
+
+# --- Seleção do integrador pelo nome ---
+def get_stepper(name):
+    try:
+        integrator = INTEGRATORS[name]
+    except KeyError:
+        raise ValueError(f"Integrador desconhecido: {name!r} (opções: {', '.join(INTEGRATORS)})") from None
+    # O RK45 guarda o tamanho de passo entre chamadas, então cada uso recebe sua instância
+    return integrator() if integrator is AdaptiveStepper else integrator
+
+
+def next_integrator_name(name):
+    names = list(INTEGRATORS)
+    return names[(names.index(name) + 1) % len(names)]
+
+
+# --- Saída densa: interpolante cúbico de Hermite dentro de um passo ---
+# y0, y1: estados no início e no fim do passo; f0, f1: derivadas f(t, y) nesses pontos;
+# s: fração do passo (0 a 1). É exato quando a solução é um polinômio de grau <= 3 no
+# tempo (ex.: projétil sem arrasto). Aceita arrays (vetoriza sobre membros de um ensemble).
+def hermite_interpolate(y0, f0, y1, f1, dt, s):
+    s2 = s * s
+    s3 = s2 * s
+    return (2 * s3 - 3 * s2 + 1) * y0 + (s3 - 2 * s2 + s) * dt * f0 + (3 * s2 - 2 * s3) * y1 + (s3 - s2) * dt * f1
+
+
+def _hermite_slope(y0, f0, y1, f1, dt, s):
+    # Derivada do interpolante em relação a s
+    s2 = s * s
+    return (6 * s2 - 6 * s) * (y0 - y1) + (3 * s2 - 4 * s + 1) * dt * f0 + (3 * s2 - 2 * s) * dt * f1
+
+
+# --- Evento: fração do passo em que uma coordenada p cruza level ---
+# p0, v0 (início) e p1, v1 (fim do passo) são a coordenada e sua derivada. Procura o
+# cruzamento em que (p - level) * direction passa de negativo para >= 0 (ex.: projétil
+# descendo até o chão), por Newton salvaguardado por bisseção. O intervalo [lo, hi]
+# sempre contém a raiz; um passo que começa exatamente no nível (lançamento do chão)
+# encontra o cruzamento seguinte, não o ponto de partida.
+def locate_crossing(p0, v0, p1, v1, dt, level, direction=1.0, iterations=60, tolerance=1e-12):
+    p0, v0, p1, v1 = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (p0, v0, p1, v1)))
+    lo = np.zeros(p0.shape)
+    hi = np.ones(p0.shape)
+    s = np.full(p0.shape, 0.5)
+    for _ in range(iterations):
+        value = (hermite_interpolate(p0, v0, p1, v1, dt, s) - level) * direction
+        before = value < 0
+        lo = np.where(before, s, lo)
+        hi = np.where(before, hi, s)
+        slope = _hermite_slope(p0, v0, p1, v1, dt, s) * direction
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = s - value / slope
+        converged = (value == 0) | (np.abs(newton - s) <= tolerance)
+        if np.all(converged):
+            return np.where(value == 0, s, newton)
+        s = np.where(converged, s, np.where((newton > lo) & (newton < hi), newton, 0.5 * (lo + hi)))
+    return s
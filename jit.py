@@ -0,0 +1,32 @@
+import os
+
+# --- Compilação JIT Opcional (Numba) ---
+# jit(function) compila a função com numba.njit quando o Numba está instalado; sem ele
+# (ou com SIM_JIT=0) devolve a própria função, que roda em Python puro. As funções
+# compiladas só usam escalares, math e arrays NumPy, então os dois caminhos fazem as
+# mesmas operações em ponto flutuante (sem fastmath) e dão resultados iguais bit a bit.
+# A versão em Python de uma função compilada continua em function.py_func.
+#
+# Variável de ambiente:
+#   SIM_JIT=0  força o caminho em Python puro mesmo com o Numba instalado
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+JIT_ENABLED = numba is not None and os.environ.get('SIM_JIT', '1') not in ('', '0')
+BACKEND = 'numba' if JIT_ENABLED else 'python'
+
+
+def jit(function):
+    if not JIT_ENABLED:
+        return function
+    # cache=True guarda o código compilado em __pycache__ (sem recompilar a cada execução);
+    # nogil=True solta o GIL durante a chamada (a física em thread roda junto com o desenho)
+    return numba.njit(cache=True, nogil=True)(function)
+
+
+# --- Versão em Python puro de uma função (compilada ou não) ---
+def python_version(function):
+    return getattr(function, 'py_func', function)
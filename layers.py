@@ -0,0 +1,94 @@
+import os
+
+import pygame
+
+# --- Desenho por Retângulos Sujos com Camadas ---
+# Camada estática: cor de fundo, chão, pivô, rótulos, caixas de input e botões, pintados
+# uma vez por draw_static(surface) e refeitos só quando algo muda (invalidate(); qualquer
+# clique, tecla ou exposição da janela invalida). Camadas persistentes (ex.: rastros) têm
+# .surface com colorkey e take_damage() -> Rect mudado desde a última chamada (ou None);
+# são compostas sobre a estática numa superfície de fundo, só nas áreas mudadas.
+# draw_ui(surface), opcional, desenha a parte estática que fica por cima das camadas
+# persistentes (é repetido, recortado, sobre cada área mudada).
+# A cada frame, as áreas dos desenhos dinâmicos do frame anterior são apagadas copiando
+# o fundo por cima, os desenhos do frame registram suas áreas (add/track) e só esses
+# retângulos vão para a tela com pygame.display.update(rects).
+#
+# Variável de ambiente:
+#   SIM_FULL_REDRAW=1  redesenha e envia a tela inteira a cada frame (para comparação)
+
+FULL_REDRAW = os.environ.get('SIM_FULL_REDRAW', '') not in ('', '0')
+INVALIDATING_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)
+
+
+class LayeredScreen:
+    def __init__(self, screen, draw_static, layers=(), draw_ui=None):
+        self.screen = screen
+        self.draw_static = draw_static
+        self.layers = list(layers)
+        self.draw_ui = draw_ui
+        self.static = pygame.Surface(screen.get_size()).convert()
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.dirty = [] # Áreas desenhadas neste frame
+        self.previous = [] # Áreas desenhadas no frame anterior (a apagar)
+        self.damaged = [] # Áreas mudadas nas camadas persistentes neste frame
+        self.full = True
+
+    def invalidate(self):
+        self.full = True
+
+    def handle_event(self, event):
+        if event.type in INVALIDATING_EVENTS:
+            self.invalidate()
+
+    # --- Apaga o frame anterior (ou refaz tudo) antes dos desenhos dinâmicos ---
+    def begin_frame(self):
+        if self.full or FULL_REDRAW:
+            self.draw_static(self.static)
+            self.background.blit(self.static, (0, 0))
+            for layer in self.layers:
+                layer.take_damage()
+                self.background.blit(layer.surface, (0, 0))
+            if self.draw_ui:
+                self.draw_ui(self.background)
+            self.screen.blit(self.background, (0, 0))
+            self.full = True
+            return
+
+        for layer in self.layers:
+            rect = layer.take_damage()
+            if rect:
+                self.background.blit(self.static, rect, rect)
+                for other in self.layers:
+                    self.background.blit(other.surface, rect, rect)
+                if self.draw_ui:
+                    self.background.set_clip(rect)
+                    self.draw_ui(self.background)
+                    self.background.set_clip(None)
+                self.screen.blit(self.background, rect, rect)
+                self.damaged.append(rect)
+        for rect in self.previous:
+            self.screen.blit(self.background, rect, rect)
+
+    # --- Registra a área de um desenho dinâmico (o Rect devolvido por draw/blit) ---
+    def add(self, rect):
+        if rect:
+            self.dirty.append(rect)
+        return rect
+
+    # --- Versão de uma função de desenho que registra o Rect que ela devolve ---
+    def track(self, draw_function):
+        def tracked(*args, **kwargs):
+            return self.add(draw_function(*args, **kwargs))
+        return tracked
+
+    # --- Envia à tela só o que mudou (tudo, se o fundo foi refeito) ---
+    def end_frame(self):
+        if self.full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.previous + self.damaged + self.dirty)
+        self.previous = self.dirty
+        self.dirty = []
+        self.damaged = []
+        self.full = False
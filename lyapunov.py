@@ -0,0 +1,166 @@
+import argparse
+import math
+import os
+import sys
+
+import numpy as np
+
+import flip_sweep
+import integrators
+from double_pendulum_ensemble import GRAVITY_REAL
+from physics import make_double_pendulum_rhs
+
+# --- Expoentes de Lyapunov do Pêndulo Duplo (método de Benettin) ---
+# As equações variacionais são integradas junto com o estado por passo complexo: o estado
+# z = y + i*h*v (h minúsculo) passa pelo mesmo integrador e pelas mesmas derivadas de
+# physics.py, e Im(z)/h sai exatamente igual à derivada do passo numérico aplicada ao vetor
+# tangente v (sem diferença finita e sem jacobiana escrita à mão). Cada um dos k vetores
+# tangentes usa sua cópia do estado, num eixo extra: z tem forma (4, k, membros). A cada
+# renormalize_every passos os vetores são reortonormalizados (QR; só a norma com k = 1) e
+# os logaritmos da diagonal de R se acumulam: lambda_i = soma_i / tempo medido (em 1/s).
+# Tudo é vetorizado sobre as condições iniciais (membros).
+# Exemplos:
+#   python lyapunov.py --theta1 120 --theta2 -10 --t-max 200 --spectrum 4
+#   python lyapunov.py --axis theta1 -180 180 401 --axis theta2 -180 180 401 --t-max 100 -o mapa_lyapunov
+
+COMPLEX_STEP = 1e-30
+TANGENT_INTEGRATORS = ('euler', 'verlet', 'rk4') # Passo fixo (o RK45 escolhe o passo pela parte real)
+
+
+def lyapunov_exponents(theta1, theta2, L1=2.0, L2=2.0, M1=1.0, M2=1.0, omega1=0.0, omega2=0.0, g=GRAVITY_REAL,
+                       t_max=100.0, dt=0.01, n_exponents=1, renormalize_every=10, t_transient=0.0, integrator='rk4'):
+    # Devolve um array (n_exponents, *forma das condições iniciais), do maior ao menor
+    if integrator not in TANGENT_INTEGRATORS:
+        raise ValueError(f"Integrador sem equações variacionais: {integrator!r} (opções: {', '.join(TANGENT_INTEGRATORS)})")
+    if not 1 <= n_exponents <= 4:
+        raise ValueError("O número de expoentes deve estar entre 1 e 4.")
+    if not (t_max > 0 and dt > 0 and renormalize_every >= 1 and t_transient >= 0):
+        raise ValueError("t_max e dt devem ser > 0, renormalize_every >= 1 e t_transient >= 0.")
+
+    initial = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in
+                                    (theta1, theta2, omega1, omega2, L1, L2, M1, M2)))
+    shape = initial[0].shape
+    theta1, theta2, omega1, omega2, L1, L2, M1, M2 = (value.reshape(-1) for value in initial)
+    n_members = theta1.size
+    rhs = make_double_pendulum_rhs(L1, L2, M1, M2, g)
+    stepper = integrators.get_stepper(integrator)
+
+    # Vetores tangentes iniciais: as primeiras direções da base canônica
+    tangent = np.zeros((4, n_exponents, n_members))
+    tangent[np.arange(n_exponents), np.arange(n_exponents)] = 1.0
+    state = np.stack((theta1, theta2, omega1, omega2))[:, np.newaxis]
+    z = state + 1j * COMPLEX_STEP * tangent
+
+    n_transient = int(round(t_transient / dt))
+    n_steps = n_transient + int(round(t_max / dt))
+    log_growth = np.zeros((n_exponents, n_members))
+    t = 0.0
+    for step_index in range(1, n_steps + 1):
+        z = stepper(rhs, t, z, dt)
+        t = step_index * dt
+        if step_index % renormalize_every and step_index != n_transient and step_index != n_steps:
+            continue
+        tangent = z.imag / COMPLEX_STEP
+        if n_exponents == 1:
+            growth = np.sqrt(np.sum(tangent * tangent, axis=0))
+            tangent = tangent / growth
+        else:
+            # QR de cada membro: colunas de Q são a nova base, |diag(R)| o crescimento de cada direção
+            q, r = np.linalg.qr(tangent.transpose(2, 0, 1))
+            growth = np.abs(np.diagonal(r, axis1=1, axis2=2)).T
+            tangent = q.transpose(1, 2, 0)
+        if step_index > n_transient:
+            log_growth += np.log(growth)
+        # Estado comum a todas as cópias (a parte real não depende da direção tangente)
+        z = z.real[:, :1] + 1j * COMPLEX_STEP * tangent
+
+    return (log_growth / ((n_steps - n_transient) * dt)).reshape((n_exponents, *shape))
+
+
+# --- Mapa de Lyapunov: mesmos blocos, manifesto e pool de processos de flip_sweep.py ---
+def result_fields(spec):
+    return tuple(f'lyapunov_{index + 1}' for index in range(spec['n_exponents']))
+
+
+def make_spec(axes, fixed, t_max, dt, integrator, tile_size, n_exponents, renormalize_every, t_transient,
+              gravity=GRAVITY_REAL):
+    spec = flip_sweep.make_spec(axes, fixed, t_max, dt, integrator, tile_size, gravity)
+    spec.update({'kind': 'lyapunov', 'n_exponents': int(n_exponents), 'renormalize_every': int(renormalize_every),
+                 't_transient': float(t_transient)})
+    return spec
+
+
+def compute_tile(spec, tile_index):
+    parameters = flip_sweep.tile_parameters(spec, tile_index)
+    theta1 = np.radians(parameters.pop('theta1'))
+    theta2 = np.radians(parameters.pop('theta2'))
+    exponents = lyapunov_exponents(theta1, theta2, g=spec['gravity'], t_max=spec['t_max'], dt=spec['dt'],
+                                   n_exponents=spec['n_exponents'], renormalize_every=spec['renormalize_every'],
+                                   t_transient=spec['t_transient'], integrator=spec['integrator'], **parameters)
+    return dict(zip(result_fields(spec), exponents))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Expoentes de Lyapunov do pêndulo duplo (um ponto ou mapa em grade).")
+    parser.add_argument('--axis', nargs=4, action='append', metavar=('NOME', 'INÍCIO', 'FIM', 'PONTOS'),
+                        help=f"Eixo da grade ({', '.join(flip_sweep.AXIS_NAMES)}); ângulos em graus. "
+                             "Repetível; sem eixos calcula um único ponto.")
+    parser.add_argument('--L1', type=float, default=2.0)
+    parser.add_argument('--L2', type=float, default=2.0)
+    parser.add_argument('--M1', type=float, default=1.0)
+    parser.add_argument('--M2', type=float, default=1.0)
+    parser.add_argument('--theta1', type=float, default=90.0)
+    parser.add_argument('--theta2', type=float, default=0.0)
+    parser.add_argument('--t-max', type=float, default=100.0, help="Tempo simulado medido (s)")
+    parser.add_argument('--transient', type=float, default=0.0, help="Tempo inicial descartado (s)")
+    parser.add_argument('--dt', type=float, default=0.01, help="Passo de integração (s)")
+    parser.add_argument('--integrator', choices=TANGENT_INTEGRATORS, default='rk4')
+    parser.add_argument('--spectrum', type=int, default=1, choices=range(1, 5), metavar='K',
+                        help="Quantos expoentes calcular (1 = só o maior, 4 = espectro completo)")
+    parser.add_argument('--renormalize-every', type=int, default=10, help="Passos entre reortonormalizações")
+    parser.add_argument('--tile-size', type=int, default=4096, help="Membros por bloco")
+    parser.add_argument('--workers', type=int, default=None, help="Processos (padrão: todos os núcleos)")
+    parser.add_argument('-o', '--out', help="Diretório dos blocos do mapa (retoma se já existir)")
+    args = parser.parse_args(argv)
+    if args.renormalize_every < 1:
+        parser.error("--renormalize-every deve ser >= 1.")
+
+    if not args.axis:
+        try:
+            exponents = lyapunov_exponents(math.radians(args.theta1), math.radians(args.theta2), args.L1, args.L2,
+                                           args.M1, args.M2, t_max=args.t_max, dt=args.dt, n_exponents=args.spectrum,
+                                           renormalize_every=args.renormalize_every, t_transient=args.transient,
+                                           integrator=args.integrator)
+        except ValueError as error:
+            parser.error(str(error))
+        for index, exponent in enumerate(exponents):
+            print(f"lambda_{index + 1} = {float(exponent):.6f} 1/s")
+        if args.spectrum == 4:
+            print(f"soma = {float(exponents.sum()):.2e} 1/s (tende a 0: o sistema conserva volume no espaço de fase)")
+        return 0
+
+    if not args.out:
+        parser.error("Um mapa (--axis) precisa de -o/--out.")
+    axes = {}
+    for name, start, stop, count in args.axis:
+        if name not in flip_sweep.AXIS_NAMES:
+            parser.error(f"Eixo desconhecido: {name}")
+        axes[name] = (float(start), float(stop), int(count))
+    fixed = {name: getattr(args, name) for name in flip_sweep.AXIS_NAMES if name not in axes}
+
+    spec = make_spec(axes, fixed, args.t_max, args.dt, args.integrator, args.tile_size, args.spectrum,
+                     args.renormalize_every, args.transient)
+    try:
+        flip_sweep.run_sweep(spec, args.out, args.workers, compute=compute_tile)
+    except ValueError as error:
+        parser.error(str(error))
+
+    results = flip_sweep.assemble(args.out, result_fields(spec))
+    for field, values in results.items():
+        np.save(os.path.join(args.out, f'{field}.npy'), values)
+    print(f"Mapas gravados em {args.out} (forma {flip_sweep.grid_shape(spec)}).", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,430 @@
+import pygame
+import sys
+import math
+
+import numpy as np
+
+import integrators
+from bodies import PendulumChain
+from frame_loop import FixedTimestep
+from frame_export import EXPORT_FRAMES, EXPORT_PATH, FrameExporter
+from layers import LayeredScreen
+from physics_thread import PHYSICS_THREAD, PhysicsLoop
+from profiling import BENCH_FRAMES, BENCH_OUTPUT, TRACE_OUTPUT, FrameProfiler
+from text_cache import draw_text, get_font, render_text
+from trail import TrailRenderer
+
+# --- Pêndulo de N Elos (corrente / corda) ---
+# Corrente de N hastes rígidas sem massa com uma massa pontual na ponta de cada uma
+# (bodies.PendulumChain). As acelerações saem de physics.chain_accelerations em O(N) por
+# avaliação (sistema tridiagonal nas trações das hastes), sem montar a matriz de massa
+# N x N. Cada passo se divide em subpassos conforme as trações (bodies._chain_substeps):
+# quando a ponta chicoteia, elos curtos e leves oscilam centenas de vezes mais rápido que
+# a corrente em repouso. Com o Numba e RK4, cadeias de 50 a 200 elos rodam em tempo real.
+# Euler e Verlet ganham energia nesta corrente (as trações dependem das velocidades) e
+# divergem em segundos com 100 a 200 elos; o padrão é o RK4, que fica abaixo de ~3% de
+# deriva. Se o estado deixa de ser finito ou a energia foge mais de CHAIN_DRIFT_LIMIT da
+# inicial, a simulação para, a corrente volta ao estado inicial e o HUD mostra o motivo.
+# A massa total se divide igualmente entre os elos, e a massa da ponta soma ao último.
+
+# --- Configurações Iniciais ---
+WIDTH, HEIGHT = 800, 600
+FPS = 60
+DT = 1 / FPS
+INTEGRATOR = 'rk4' # 'euler', 'rk4', 'verlet' ou 'rk45' (tecla 'I' alterna)
+PHYSICS_SUBSTEPS = 8 # Passos de física por DT (cada um ainda subdividido pelas trações)
+CHAIN_DRIFT_LIMIT = 0.1 # Variação relativa de energia que interrompe a simulação
+TIME_WARP = 1.0 # Tempo simulado por segundo real (teclas '+' e '-')
+MAX_LINKS = 500
+
+# Cores
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0) # Bobs
+GREEN = (0, 255, 0) # Botão INICIAR
+BLUE = (0, 0, 255) # Hastes
+CYAN = (0, 255, 255) # Bob da ponta
+YELLOW = (255, 255, 0) # Pivô
+
+# Cores para InputBox
+LIGHT_GREY = (200, 200, 200)
+ACTIVE_COLOR = (150, 150, 255)
+INACTIVE_COLOR = (100, 100, 100)
+
+# Escala do Mundo Real para Pixels
+PIXELS_PER_METER = 50
+
+# Inicializa o Pygame
+pygame.init()
+pygame.font.init()
+
+# Cria a tela
+screen = pygame.display.set_mode((WIDTH, HEIGHT))
+pygame.display.set_caption("Simulação de Pêndulo de N Elos")
+
+# Clock para controlar o FPS
+clock = pygame.time.Clock()
+
+# Passo fixo da física, desacoplado da taxa de quadros
+timestep = FixedTimestep(DT, PHYSICS_SUBSTEPS, TIME_WARP)
+
+# Gravidade no mundo real (m/s^2)
+GRAVITY_REAL = 9.81 # m/s^2
+
+# Ponto de Pivô da corrente (fixo na tela)
+pivot_point_pixel = (WIDTH // 2, 100)
+
+
+class InputBox:
+    def __init__(self, x, y, w, h, text='', label=''):
+        self.rect = pygame.Rect(x, y, w, h)
+        self.color = INACTIVE_COLOR
+        self.text = text
+        self.label = label
+        self.font = get_font(24)
+        self.active = False
+        self.txt_surface = self.font.render(text, True, LIGHT_GREY)
+        self.label_surface = self.font.render(label, True, WHITE)
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.rect.collidepoint(event.pos):
+                self.active = not self.active
+            else:
+                self.active = False
+            self.color = ACTIVE_COLOR if self.active else INACTIVE_COLOR
+        if event.type == pygame.KEYDOWN:
+            if self.active:
+                if event.key == pygame.K_RETURN:
+                    self.active = False
+                    self.color = INACTIVE_COLOR
+                elif event.key == pygame.K_BACKSPACE:
+                    self.text = self.text[:-1]
+                else:
+                    if event.unicode.isdigit() or \
+                       (event.unicode == '.' and '.' not in self.text) or \
+                       (event.unicode == '-' and not self.text and len(self.text) == 0):
+                        self.text += event.unicode
+                self.txt_surface = self.font.render(self.text, True, LIGHT_GREY)
+
+    def draw(self, screen):
+        screen.blit(self.label_surface, (self.rect.x - self.label_surface.get_width() - 5, self.rect.y + (self.rect.height - self.label_surface.get_height()) // 2))
+        pygame.draw.rect(screen, self.color, self.rect, 2)
+        screen.blit(self.txt_surface, (self.rect.x + 5, self.rect.y + 5))
+
+    def get_value(self):
+        try:
+            return float(self.text)
+        except ValueError:
+            return 0.0
+
+# --- Variáveis da Corrente (globais) ---
+n_links = 0
+total_length_real = 0.0
+total_mass_real = 0.0
+tip_mass_real = 0.0
+
+# Estado mostrado no frame: ângulos absolutos (rad) e energia mecânica (J)
+theta_radians = np.zeros(0)
+energy_joules = 0.0
+initial_energy_joules = 0.0
+
+# Posições das massas (em pixels, escala base), a última é a da ponta
+bob_positions_pixel = []
+
+is_simulating = False
+time_since_launch = 0.0
+
+# Motivo da última interrupção por divergência (mostrado no HUD até o próximo início)
+divergence_note = ''
+
+# --- Integrador numérico e corpo simulado (PendulumChain, avançado com step_many) ---
+integrator_name = INTEGRATOR
+chain = None
+
+# Trajetória da ponta: o caminho inteiro em níveis de detalhe (trail.LodTrail)
+trajectory_tip = TrailRenderer((WIDTH, HEIGHT), WHITE, 1)
+
+# Zoom da vista em torno do pivô (roda do mouse)
+VIEW_ZOOM_MIN = 0.125
+VIEW_ZOOM_MAX = 4.0
+view_zoom = 1.0
+
+# --- Instâncias das Caixas de Input ---
+input_box_links = InputBox(WIDTH - 150, 10, 140, 32, '50', 'Elos:')
+input_box_length = InputBox(WIDTH - 150, 50, 140, 32, '4.0', 'Comp. total (m):')
+input_box_mass = InputBox(WIDTH - 150, 90, 140, 32, '1.0', 'Massa total (kg):')
+input_box_tip_mass = InputBox(WIDTH - 150, 130, 140, 32, '0.5', 'Massa ponta (kg):')
+input_box_theta = InputBox(WIDTH - 150, 170, 140, 32, '60.0', 'Ângulo (gr):')
+
+input_boxes = [input_box_links, input_box_length, input_box_mass, input_box_tip_mass, input_box_theta]
+
+
+# --- Posições (pixels, escala base) das massas para um array de ângulos ---
+def bob_pixel_positions(theta):
+    segment_lengths = total_length_real / n_links * PIXELS_PER_METER
+    x = pivot_point_pixel[0] + np.cumsum(segment_lengths * np.sin(theta))
+    y = pivot_point_pixel[1] + np.cumsum(segment_lengths * np.cos(theta))
+    return list(zip(x.astype(int).tolist(), y.astype(int).tolist()))
+
+
+# --- Função para Resetar a Corrente ---
+def reset_chain(reset_inputs=False):
+    global n_links, total_length_real, total_mass_real, tip_mass_real, theta_radians, energy_joules, \
+           initial_energy_joules, bob_positions_pixel, is_simulating, time_since_launch, chain
+
+    if reset_inputs:
+        input_box_links.text = '50'
+        input_box_length.text = '4.0'
+        input_box_mass.text = '1.0'
+        input_box_tip_mass.text = '0.5'
+        input_box_theta.text = '60.0'
+
+        for box in input_boxes:
+            box.txt_surface = box.font.render(box.text, True, LIGHT_GREY)
+
+    n_links = min(int(round(input_box_links.get_value())), MAX_LINKS)
+    total_length_real = input_box_length.get_value()
+    total_mass_real = input_box_mass.get_value()
+    tip_mass_real = input_box_tip_mass.get_value()
+    initial_theta_degrees = input_box_theta.get_value()
+
+    is_simulating = False
+    time_since_launch = 0.0
+    timestep.reset()
+    trajectory_tip.clear()
+
+    # Recria o corpo: elos iguais, com a massa da ponta somada ao último
+    chain = None
+    theta_radians = np.zeros(0)
+    bob_positions_pixel = []
+    energy_joules = initial_energy_joules = 0.0
+    if n_links > 0 and total_length_real > 0 and total_mass_real > 0 and tip_mass_real >= 0:
+        masses = np.full(n_links, total_mass_real / n_links)
+        masses[-1] += tip_mass_real
+        chain = PendulumChain(np.full(n_links, total_length_real / n_links), masses, math.radians(initial_theta_degrees),
+                              0.0, GRAVITY_REAL, integrator_name)
+        theta_radians = chain.theta.copy()
+        energy_joules = initial_energy_joules = chain.energy()
+        bob_positions_pixel = bob_pixel_positions(theta_radians)
+
+
+# --- Função para Iniciar a Simulação ---
+def start_simulation():
+    global is_simulating, divergence_note
+    reset_chain(reset_inputs=False)
+    divergence_note = ''
+
+    # Validação mínima
+    if chain is not None:
+        is_simulating = True
+    else:
+        print("Valores de entrada inválidos para simulação (elos, comprimento e massa devem ser > 0).")
+        is_simulating = False
+
+
+# --- Posição na tela de um ponto na escala base (zoom da vista em torno do pivô) ---
+def to_view(point):
+    return (int(pivot_point_pixel[0] + (point[0] - pivot_point_pixel[0]) * view_zoom),
+            int(pivot_point_pixel[1] + (point[1] - pivot_point_pixel[1]) * view_zoom))
+
+
+# --- Muda o zoom da vista (o rastro é redesenhado no nível de detalhe do novo zoom) ---
+def set_view_zoom(zoom):
+    global view_zoom
+    view_zoom = min(max(zoom, VIEW_ZOOM_MIN), VIEW_ZOOM_MAX)
+    trajectory_tip.set_view(view_zoom, pivot_point_pixel)
+
+
+# --- Física do intervalo de tempo real dado; devolve (tempo, ângulos, energia) ---
+# Chamada no frame ou pela thread de física (physics_thread.py). Os ângulos são copiados:
+# o corpo os altera no lugar.
+def update_physics(seconds):
+    if is_simulating:
+        for n_steps in timestep.batches(seconds):
+            chain.step_many(n_steps, timestep.physics_dt)
+    if chain is None:
+        return None
+    return chain.time, chain.theta.copy(), chain.energy()
+
+
+# --- A corrente divergiu? (ângulos ou energia não finitos, ou energia longe da inicial) ---
+def chain_diverged(theta, energy):
+    if not (np.all(np.isfinite(theta)) and math.isfinite(energy)):
+        return True
+    return bool(initial_energy_joules) and abs(energy - initial_energy_joules) > CHAIN_DRIFT_LIMIT * abs(initial_energy_joules)
+
+
+# Botão de Iniciar
+start_button_rect = pygame.Rect(WIDTH - 150, 220, 140, 40)
+start_button_text = render_text("INICIAR", 30, BLACK)
+
+
+# --- Parte estática desenhada por cima do rastro: pivô, caixas de input, botão e textos fixos ---
+def draw_ui(surface):
+    pygame.draw.circle(surface, YELLOW, pivot_point_pixel, 5)
+    for box in input_boxes:
+        box.draw(surface)
+    pygame.draw.rect(surface, GREEN, start_button_rect)
+    surface.blit(start_button_text, (start_button_rect.x + (start_button_rect.width - start_button_text.get_width()) // 2,
+                                     start_button_rect.y + (start_button_rect.height - start_button_text.get_height()) // 2))
+    draw_text(surface, "Pressione 'R' para Resetar", 20, WHITE, 10, HEIGHT - 30)
+
+
+# Desenho por retângulos sujos: o rastro é uma camada persistente; só as hastes, os bobs
+# e o HUD são redesenhados a cada frame
+layers = LayeredScreen(screen, lambda surface: surface.fill(BLACK), [trajectory_tip], draw_ui)
+hud_text = layers.track(draw_text)
+
+# Inicializa a corrente com os valores padrão
+reset_chain(reset_inputs=True)
+
+# Exportação de frames (SIM_EXPORT): sem janela, e a física nunca descarta passos por orçamento
+exporter = None
+if EXPORT_PATH:
+    exporter = FrameExporter(EXPORT_PATH, screen.get_size())
+    timestep.max_update_time = math.inf
+
+# Modo benchmark ou exportação: a simulação começa sozinha
+if BENCH_FRAMES or exporter is not None:
+    start_simulation()
+
+# Física no próprio frame ou numa thread (SIM_PHYSICS_THREAD=1; nunca no benchmark e na exportação)
+physics = PhysicsLoop(update_physics, threaded=PHYSICS_THREAD and not BENCH_FRAMES and exporter is None)
+
+# Tempo gasto em cada fase do frame
+profiler = FrameProfiler()
+
+# --- Loop Principal do Jogo ---
+running = True
+frame_seconds = DT # Tempo real do último frame
+while running:
+    profiler.begin_frame()
+
+    # 1. Eventos
+    # Mudanças na simulação (cliques, teclas) esperam o lote de física em andamento na thread
+    events = pygame.event.get()
+    with physics.changes(events):
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
+
+            for box in input_boxes:
+                box.handle_event(event)
+            layers.handle_event(event)
+
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if start_button_rect.collidepoint(event.pos):
+                    start_simulation()
+
+            if event.type == pygame.MOUSEWHEEL and event.y:
+                set_view_zoom(view_zoom * 2 ** (0.25 * event.y))
+
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_r:
+                    reset_chain(reset_inputs=False)
+                elif event.key == pygame.K_i and not any(box.active for box in input_boxes):
+                    integrator_name = integrators.next_integrator_name(integrator_name)
+                    if chain is not None:
+                        chain.set_integrator(integrator_name)
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS) and not any(box.active for box in input_boxes):
+                    timestep.faster()
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS) and not any(box.active for box in input_boxes):
+                    timestep.slower()
+                elif event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
+
+    profiler.mark('events')
+
+    # 2. Atualização
+    if is_simulating:
+        # Avança a corrente (ou, com a física em thread, só lê o último estado)
+        profiler.begin_section('update/physics')
+        time_since_launch, theta_radians, energy_joules = physics.latest(frame_seconds)
+        profiler.end_section()
+
+        if chain_diverged(theta_radians, energy_joules):
+            # Nunca desenha um estado inválido: para e volta ao estado inicial
+            divergence_note = (f"Divergiu em t = {time_since_launch:.2f}s com {integrator_name.upper()}: corrente "
+                               f"reiniciada (use RK4 ou RK45)")
+            with physics.changes():
+                reset_chain(reset_inputs=False)
+        else:
+            bob_positions_pixel = bob_pixel_positions(theta_radians)
+
+            profiler.begin_section('update/trail')
+            trajectory_tip.append(bob_positions_pixel[-1])
+            profiler.end_section()
+
+    profiler.mark('update')
+
+    # 3. Desenho (fundo, rastro, pivô, caixas de input e botão vêm prontos da composição)
+    profiler.begin_section('draw/layers')
+    layers.begin_frame()
+    profiler.end_section()
+
+    if bob_positions_pixel:
+        # Hastes numa só polilinha; bobs com raio proporcional ao elo (um retângulo sujo para todos)
+        points = [pivot_point_pixel] + [to_view(point) for point in bob_positions_pixel]
+        rods = pygame.draw.lines(screen, BLUE, False, points, 2)
+        link_pixels = total_length_real / n_links * PIXELS_PER_METER * view_zoom
+        bob_radius_pixel = int(min(max(link_pixels / 3, 2), 10))
+        for point in points[1:-1]:
+            pygame.draw.circle(screen, RED, point, bob_radius_pixel)
+        layers.add(rods.inflate(2 * bob_radius_pixel + 2, 2 * bob_radius_pixel + 2))
+        layers.add(pygame.draw.circle(screen, CYAN, points[-1], 10))
+
+    # --- Exibir Parâmetros ---
+    profiler.begin_section('draw/hud')
+    hud_text(screen, f"Elos: {n_links}, Comp.: {total_length_real:.2f}m, Massa: {total_mass_real:.2f}kg "
+             f"+ {tip_mass_real:.2f}kg na ponta", 20, WHITE, 10, 10)
+    if len(theta_radians):
+        hud_text(screen, f"Ângulo do 1º elo: {math.degrees(theta_radians[0]):.2f}°, "
+                 f"da ponta: {math.degrees(theta_radians[-1]):.2f}°", 20, WHITE, 10, 30)
+        drift = (energy_joules - initial_energy_joules) / abs(initial_energy_joules) if initial_energy_joules else 0.0
+        hud_text(screen, f"Energia: {energy_joules:.4f} J (deriva {drift:+.2e})", 20, WHITE, 10, 50)
+
+    hud_text(screen, f"Tempo Total: {time_since_launch:.2f}s", 20, WHITE, 10, 80)
+    hud_text(screen, f"Integrador: {integrator_name.upper()} (tecla 'I')", 20, WHITE, 10, 110)
+    hud_text(screen, f"Vel. Simulação: {timestep.time_warp:g}x (teclas '+'/'-')" + (" [atrasado]" if timestep.lagging else "")
+             + (f" [física em thread: {physics.updates_per_second:.0f}/s]" if physics.threaded else ""), 20, WHITE, 10, 130)
+    if divergence_note:
+        hud_text(screen, divergence_note, 20, RED, 10, HEIGHT - 80)
+    hud_text(screen, f"Zoom: {view_zoom:.2f}x (roda do mouse), rastro: {len(trajectory_tip)} pontos", 20, LIGHT_GREY,
+             10, HEIGHT - 55)
+    profiler.end_section()
+
+    # Sobreposição de tempos por fase (tecla F3)
+    profiler.draw_overlay(screen, hud_text, 10, 160, YELLOW)
+
+    profiler.mark('draw')
+
+    layers.end_frame()
+    profiler.mark('flip')
+    if exporter is not None:
+        exporter.submit(screen)
+    profiler.end_frame()
+
+    if BENCH_FRAMES or exporter is not None:
+        # Benchmark/exportação: sem espera pelo FPS, e um DT simulado por frame
+        clock.tick()
+        frame_seconds = DT
+        if BENCH_FRAMES:
+            running = running and profiler.frame_count < BENCH_FRAMES
+        if exporter is not None:
+            running = running and exporter.frame_count < EXPORT_FRAMES
+    else:
+        frame_seconds = clock.tick(FPS) / 1000
+
+
+physics.close()
+if exporter is not None:
+    exporter.close()
+
+if BENCH_FRAMES and BENCH_OUTPUT:
+    profiler.write_json(BENCH_OUTPUT, script='n_pendulum.py')
+if TRACE_OUTPUT:
+    profiler.write_trace(TRACE_OUTPUT, 'n_pendulum.py')
+
+pygame.quit()
+sys.exit()
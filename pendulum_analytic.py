@@ -0,0 +1,171 @@
+import functools
+import math
+
+import numpy as np
+
+from double_pendulum_ensemble import GRAVITY_REAL
+
+# --- Solução Exata do Pêndulo Simples (sem atrito) ---
+# theta'' = -(g / L) sin(theta). Com w0 = sqrt(g / L) e a energia dada pelo módulo
+#   k^2 = sin^2(theta / 2) + (omega / (2 w0))^2,
+# o movimento é uma oscilação (k < 1) com sin(theta / 2) = k sn(w0 t + u0 | k^2), ou uma
+# rotação (k > 1) com theta / 2 = am(k w0 t + u0 | 1 / k^2). As funções elípticas de Jacobi
+# e as integrais elípticas saem da média aritmético-geométrica (AGM), com um número de
+# iterações que não depende de t: avaliar o estado em t = 10^4 s custa o mesmo que em t = 0.
+# Ângulos em radianos; todas as funções aceitam escalares ou arrays (com broadcasting).
+
+EPSILON = np.finfo(float).eps
+MAX_AGM_ITERATIONS = 40
+SEPARATRIX_M = 1 - EPSILON # Em k = 1 exato (separatriz) usa o m logo abaixo de 1
+
+
+# --- Termos da AGM de (1, sqrt(1 - m)): dependem só de m, então podem ser reaproveitados ---
+def agm_terms(m):
+    m = np.asarray(m, dtype=float)
+    a = np.ones_like(m)
+    b = np.sqrt(1 - m)
+    c = np.sqrt(m)
+    terms = []
+    while np.any(c > EPSILON * a) and len(terms) < MAX_AGM_ITERATIONS:
+        a, b, c = (a + b) / 2, np.sqrt(a * b), (a - b) / 2
+        terms.append((a, c / a))
+    return a, terms
+
+
+# --- Amplitude de Jacobi am(u | m), 0 <= m < 1 (descida de Landen pela AGM) ---
+# Com os termos já calculados só a volta (um arcsin por nível) tem a forma de u.
+def jacobi_amplitude(u, m, terms=None):
+    a, terms = agm_terms(m) if terms is None else terms
+    phi = 2.0 ** len(terms) * a * np.asarray(u, dtype=float)
+    for _, ratio in reversed(terms):
+        phi = (phi + np.arcsin(ratio * np.sin(phi))) / 2
+    return phi
+
+
+# --- sn, cn e dn de Jacobi ---
+def jacobi_elliptic(u, m):
+    amplitude = jacobi_amplitude(u, m)
+    sn = np.sin(amplitude)
+    return sn, np.cos(amplitude), np.sqrt(1 - m * sn * sn)
+
+
+# --- Integral elíptica completa de primeira espécie K(m) ---
+def elliptic_k(m):
+    m = np.asarray(m, dtype=float)
+    a = np.ones_like(m)
+    b = np.sqrt(1 - m)
+    for _ in range(MAX_AGM_ITERATIONS):
+        if not np.any(np.abs(a - b) > EPSILON * a):
+            break
+        a, b = (a + b) / 2, np.sqrt(a * b)
+    return math.pi / (2 * a)
+
+
+# --- Integral elíptica incompleta F(phi | m), inversa de am (contínua para qualquer phi) ---
+def elliptic_f(phi, m):
+    phi, m = np.broadcast_arrays(np.asarray(phi, dtype=float), np.asarray(m, dtype=float))
+    a = np.ones_like(m)
+    b = np.sqrt(1 - m)
+    scale = 1.0
+    for _ in range(MAX_AGM_ITERATIONS):
+        if not np.any(np.abs(a - b) > EPSILON * a):
+            break
+        # Landen: tan(phi_n+1 - phi_n) = (b / a) tan(phi_n), no ramo contínuo (phi_n+1 ~ 2 phi_n)
+        sin_phi, cos_phi = np.sin(phi), np.cos(phi)
+        phi = 2 * phi - np.arctan2((a - b) * sin_phi * cos_phi, a * cos_phi * cos_phi + b * sin_phi * sin_phi)
+        a, b = (a + b) / 2, np.sqrt(a * b)
+        scale *= 2
+    return phi / (scale * a)
+
+
+def natural_frequency(length, gravity=GRAVITY_REAL):
+    return np.sqrt(gravity / np.asarray(length, dtype=float))
+
+
+# --- Módulo k da órbita que passa por (ângulo, velocidade angular) ---
+def orbit_modulus(angle, angular_velocity=0.0, length=1.0, gravity=GRAVITY_REAL):
+    w0 = natural_frequency(length, gravity)
+    return np.sqrt(np.sin(np.asarray(angle, dtype=float) / 2) ** 2 + (np.asarray(angular_velocity) / (2 * w0)) ** 2)
+
+
+# --- Período exato: oscilação a partir do repouso na amplitude dada ---
+def period(amplitude, length=1.0, gravity=GRAVITY_REAL):
+    k = np.sin(np.abs(np.asarray(amplitude, dtype=float)) / 2)
+    return 4 * elliptic_k(np.minimum(k * k, SEPARATRIX_M)) / natural_frequency(length, gravity)
+
+
+# --- Órbita que passa por (angle, angular_velocity) em t = 0 ---
+# As constantes (módulo, fase inicial, termos da AGM) são calculadas uma vez, na forma das
+# condições iniciais; state_at(t) só faz a volta da AGM e algumas funções elementares.
+class PendulumOrbit:
+    def __init__(self, angle, angular_velocity=0.0, length=1.0, gravity=GRAVITY_REAL):
+        angle, angular_velocity, length = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in
+                                                               (angle, angular_velocity, length)))
+        self.frequency = natural_frequency(length, gravity)
+        k = orbit_modulus(angle, angular_velocity, length, gravity)
+        self.modulus = k
+        self.rotating = k > 1
+        self.direction = np.where(angular_velocity < 0, -1.0, 1.0)
+
+        # Oscilação: ângulo reduzido a [-pi, pi] (sin(theta / 2) tem período 4 pi) e fase inicial
+        # u0 com sn(u0) = sin(theta / 2) / k, no ramo de cn com o sinal da velocidade angular
+        self.turns = 2 * math.pi * np.round(angle / (2 * math.pi))
+        m_oscillation = np.minimum(k * k, SEPARATRIX_M)
+        sine_ratio = np.divide(np.sin((angle - self.turns) / 2), k, out=np.zeros_like(k), where=k > 0)
+        u0 = elliptic_f(np.arcsin(np.clip(sine_ratio, -1.0, 1.0)), m_oscillation)
+        u0 = np.where(self.direction < 0, 2 * elliptic_k(m_oscillation) - u0, u0)
+
+        # Rotação: theta / 2 = am(v), com v andando a k w0 no sentido do movimento
+        self.safe_modulus = np.where(self.rotating, k, 1.0)
+        m_rotation = 1 / (self.safe_modulus * self.safe_modulus)
+        v0 = elliptic_f(angle / 2, m_rotation)
+
+        self.m = np.where(self.rotating, m_rotation, m_oscillation)
+        self.phase = np.where(self.rotating, v0, u0)
+        self.rate = np.where(self.rotating, self.direction * self.safe_modulus * self.frequency, self.frequency)
+        self.terms = agm_terms(self.m)
+        self.period = np.where(self.rotating, 2 * math.pi / (2 * self.terms[0]) / (self.safe_modulus * self.frequency),
+                               4 * math.pi / (2 * self.terms[0]) / self.frequency)
+
+    # --- Estado (ângulo, velocidade angular) no instante t ---
+    def state_at(self, t):
+        amplitude = jacobi_amplitude(self.phase + self.rate * np.asarray(t, dtype=float), self.m, self.terms)
+        sn = np.sin(amplitude)
+        k = self.modulus
+        if not np.any(self.rotating):
+            return 2 * np.arcsin(np.clip(k * sn, -1.0, 1.0)) + self.turns, 2 * k * self.frequency * np.cos(amplitude)
+        dn = np.sqrt(1 - self.m * sn * sn)
+        angle = np.where(self.rotating, 2 * amplitude, 2 * np.arcsin(np.clip(k * sn, -1.0, 1.0)) + self.turns)
+        angular_velocity = np.where(self.rotating, 2 * self.direction * self.safe_modulus * self.frequency * dn,
+                                    2 * k * self.frequency * np.cos(amplitude))
+        return angle, angular_velocity
+
+
+# --- Estado no instante t, partindo de (angle, angular_velocity) em t = 0 ---
+def state_at(t, angle, angular_velocity=0.0, length=1.0, gravity=GRAVITY_REAL):
+    return PendulumOrbit(angle, angular_velocity, length, gravity).state_at(t)
+
+
+# --- Tabela pré-calculada do período (razão T / T0, com T0 = 2 pi sqrt(L / g)) por amplitude ---
+class PeriodTable:
+    def __init__(self, amplitudes_degrees):
+        self.amplitudes_degrees = np.asarray(amplitudes_degrees, dtype=float)
+        self.period_ratio = period(np.radians(self.amplitudes_degrees), 1.0, 1.0) / (2 * math.pi)
+
+    # --- Interpolação linear vetorizada; fora da tabela usa a fórmula exata ---
+    def lookup(self, amplitude_degrees, length=1.0, gravity=GRAVITY_REAL):
+        amplitude_degrees = np.abs(np.asarray(amplitude_degrees, dtype=float))
+        small_angle_period = 2 * math.pi / natural_frequency(length, gravity)
+        inside = amplitude_degrees <= self.amplitudes_degrees[-1]
+        ratio = np.interp(amplitude_degrees, self.amplitudes_degrees, self.period_ratio)
+        if not np.all(inside):
+            exact = period(np.radians(amplitude_degrees), 1.0, 1.0) / (2 * math.pi)
+            ratio = np.where(inside, ratio, exact)
+        return ratio * small_angle_period
+
+
+# --- Tabela padrão (0 a 175 graus, passo de 0,01 grau), calculada uma vez por processo ---
+@functools.lru_cache(maxsize=4)
+def period_table(max_amplitude_degrees=175.0, step_degrees=0.01):
+    n_points = int(round(max_amplitude_degrees / step_degrees)) + 1
+    return PeriodTable(np.linspace(0.0, max_amplitude_degrees, n_points))
@@ -0,0 +1,187 @@
+import math
+
+import numpy as np
+import pygame
+
+import integrators
+from double_pendulum_ensemble import GRAVITY_REAL
+from pendulum_analytic import PendulumOrbit, period
+from physics import make_simple_pendulum_rhs
+
+# --- Onda de Pêndulos (struct-of-arrays) ---
+# Centenas a milhares de pêndulos simples independentes, com ângulos e velocidades
+# angulares num único array (2, n) ([ângulos, velocidades] no eixo 0, a convenção de
+# integrators.py). Um passo atualiza todos de uma vez: Euler e Verlet no lugar, com
+# operações NumPy sobre o array inteiro (sem arrays novos por passo); RK4 e RK45 pelos
+# integradores genéricos, com o estado em lote. No modo exato o estado sai da solução
+# elíptica (pendulum_analytic.PendulumOrbit), também vetorizada.
+# Comprimentos da demonstração clássica: em wave_time segundos o pêndulo mais longo faz
+# base oscilações e o mais curto base + extra, com os do meio igualmente espaçados
+# (L proporcional a 1 / oscilações^2). Depois de j * wave_time a fileira mostra j * extra
+# ondas inteiras; todos voltam a se alinhar quando as oscilações de todos os pêndulos são
+# inteiras, em cycle = wave_time * (n - 1) / mdc(extra, n - 1) (com a progressão clássica,
+# um pêndulo a mais por oscilação extra, cycle = wave_time). Com a mesma amplitude o período
+# é proporcional a sqrt(L) em qualquer amplitude, então os tempos saem do período exato
+# do mais longo (integral elíptica, pendulum_analytic.period) e valem fora das pequenas
+# amplitudes.
+# Energias por pêndulo em arrays; o desenho usa blits em lote de sprites pré-renderizados
+# (Surface.blits) e escreve os fios direto nos pixels (surfarray).
+
+WAVE_BASE_OSCILLATIONS = 15 # Oscilações do pêndulo mais longo por ciclo
+WAVE_EXTRA_OSCILLATIONS = 10 # Oscilações a mais do mais curto no mesmo ciclo
+WAVE_PALETTE_SIZE = 64 # Cores (sprites) distintas no gradiente
+
+
+# --- Comprimentos da progressão clássica, wave_time e ciclo de realinhamento (s) ---
+def wave_lengths(count, longest, amplitude=0.0, base=WAVE_BASE_OSCILLATIONS, extra=WAVE_EXTRA_OSCILLATIONS,
+                 gravity=GRAVITY_REAL):
+    oscillations = base + extra * np.arange(count) / max(count - 1, 1)
+    wave_time = base * float(period(amplitude, longest, gravity))
+    cycle = wave_time * ((count - 1) // math.gcd(extra, count - 1)) if count > 1 else wave_time
+    return longest * (base / oscillations) ** 2, wave_time, cycle
+
+
+class PendulumWave:
+    def __init__(self, lengths, angle, mass=1.0, gravity=GRAVITY_REAL, integrator='verlet', wave_time=None, extra=None,
+                 cycle=None):
+        self.lengths = np.asarray(lengths, dtype=float)
+        if len(self.lengths) == 0 or not np.all(self.lengths > 0):
+            raise ValueError("Os comprimentos devem ser > 0 (pelo menos um pêndulo).")
+        self.mass = float(mass)
+        self.gravity = float(gravity)
+        self.gravity_over_length = self.gravity / self.lengths
+        self.wave_time = wave_time
+        self.extra = extra
+        self.cycle = cycle
+        self.state = np.zeros((2, len(self.lengths)))
+        self.state[0] = angle
+        self.time = 0.0
+        self._sine = np.empty(len(self.lengths)) # Rascunho dos passos no lugar
+        self.set_integrator(integrator)
+        self.orbit = None
+        self.orbit_start_time = 0.0
+        self.initial_energy = self.total_energies()
+
+    @classmethod
+    def classic(cls, count, longest, angle, mass=1.0, gravity=GRAVITY_REAL, integrator='verlet',
+                base=WAVE_BASE_OSCILLATIONS, extra=WAVE_EXTRA_OSCILLATIONS):
+        lengths, wave_time, cycle = wave_lengths(count, longest, angle, base, extra, gravity)
+        return cls(lengths, angle, mass, gravity, integrator, wave_time, extra, cycle)
+
+    # --- Ondas inteiras ao longo da fileira no instante t (progressão clássica) ---
+    def waves_at(self, t):
+        return self.extra * (t % self.cycle) / self.wave_time
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def set_integrator(self, name):
+        self._stepper = integrators.get_stepper(name) # Valida o nome (e dá ao RK45 sua instância)
+        self.integrator = name
+        self._rhs = make_simple_pendulum_rhs(self.lengths, self.gravity)
+
+    # --- Avança n passos de dt, todos os pêndulos de uma vez ---
+    def step_many(self, n, dt):
+        angle, angular_velocity = self.state
+        sine = self._sine
+        acceleration = self.gravity_over_length
+        if self.integrator == 'verlet':
+            half = dt / 2
+            for _ in range(n):
+                np.sin(angle, out=sine)
+                sine *= acceleration
+                angular_velocity -= sine * half
+                angle += angular_velocity * dt
+                np.sin(angle, out=sine)
+                sine *= acceleration
+                angular_velocity -= sine * half
+        elif self.integrator == 'euler':
+            for _ in range(n):
+                np.sin(angle, out=sine)
+                sine *= acceleration
+                angular_velocity -= sine * dt
+                angle += angular_velocity * dt
+        else:
+            state = self.state
+            for step_index in range(n):
+                state = self._stepper(self._rhs, self.time + step_index * dt, state, dt)
+            self.state[:] = state
+        self.time += n * dt
+        return n
+
+    # --- Modo exato: órbitas a partir do estado atual; advance_exact avança por elas ---
+    def start_orbit(self):
+        self.orbit = PendulumOrbit(self.state[0], self.state[1], self.lengths, self.gravity)
+        self.orbit_start_time = self.time
+
+    def advance_exact(self, seconds):
+        if self.orbit is None:
+            self.start_orbit()
+        self.time += seconds
+        self.state[0], self.state[1] = self.orbit.state_at(self.time - self.orbit_start_time)
+
+    # --- Energias por pêndulo (J): potencial (zero no ponto mais baixo) e cinética ---
+    def energies(self, state=None):
+        angle, angular_velocity = self.state if state is None else state
+        potential = self.mass * self.gravity * self.lengths * (1 - np.cos(angle))
+        linear_velocity = self.lengths * angular_velocity
+        return potential, 0.5 * self.mass * linear_velocity * linear_velocity
+
+    def total_energies(self, state=None):
+        potential, kinetic = self.energies(state)
+        return potential + kinetic
+
+    # --- Maior variação relativa de energia entre os pêndulos, desde o início ---
+    def energy_drift(self, state=None):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drift = np.abs(self.total_energies(state) - self.initial_energy) / self.initial_energy
+        return float(np.nanmax(np.where(self.initial_energy > 0, drift, 0.0)))
+
+    # --- Cópia do estado para o desenho (physics_thread.py) ---
+    def snapshot(self):
+        return self.time, self.state.copy()
+
+
+# --- Sprites de bob num gradiente de cores (do primeiro ao último pêndulo) ---
+def make_bob_sprites(radius, first_color, last_color, palette_size=WAVE_PALETTE_SIZE):
+    sprites = []
+    for index in range(palette_size):
+        fraction = index / max(palette_size - 1, 1)
+        color = tuple(int(round(a + (b - a) * fraction)) for a, b in zip(first_color, last_color))
+        sprite = pygame.Surface((2 * radius + 1, 2 * radius + 1))
+        sprite.set_colorkey((0, 0, 0))
+        pygame.draw.circle(sprite, color, (radius, radius), radius)
+        sprites.append(sprite)
+    return sprites
+
+
+# --- Desenho em lote, visto de cima: pivôs numa barra horizontal, bobs deslocados em y ---
+# x dos pêndulos igualmente espaçados de left a right; o deslocamento horizontal do bob
+# (L sin(ângulo)) vira y em torno de center_y, com scale pixels por metro. Fios escritos
+# direto nos pixels (no máximo um a cada string_spacing pixels, para a fileira densa não
+# virar um bloco); bobs num único Surface.blits. Devolve o retângulo desenhado.
+def draw_wave(surface, lengths, angles, left, right, center_y, scale, sprites, string_color, string_spacing=4):
+    count = len(lengths)
+    x = np.linspace(left, right, count).astype(np.intp)
+    offset = np.rint(lengths * np.sin(angles) * scale).astype(np.intp)
+    width, height = surface.get_size()
+    offset = np.clip(offset, -center_y, height - 1 - center_y)
+
+    # Fios: cada coluna escolhida recebe os pixels de center_y até o bob
+    stride = max(1, int(count * string_spacing / max(right - left, 1)))
+    string_x, string_offset = x[::stride], offset[::stride]
+    longest = int(np.abs(string_offset).max()) + 1
+    steps = np.arange(longest)
+    rows = center_y + np.sign(string_offset)[:, None] * np.minimum(steps[None, :], np.abs(string_offset)[:, None])
+    pixels = pygame.surfarray.pixels2d(surface)
+    pixels[np.repeat(string_x, longest), rows.ravel()] = surface.map_rgb(string_color)
+    del pixels # Libera o lock da superfície
+
+    radius = sprites[0].get_width() // 2
+    palette = (np.arange(count) * len(sprites)) // count
+    y = center_y + offset
+    surface.blits([(sprites[index], (bob_x - radius, bob_y - radius))
+                   for index, bob_x, bob_y in zip(palette.tolist(), x.tolist(), y.tolist())], doreturn=False)
+    top = int(min(y.min(), center_y)) - radius
+    bottom = int(max(y.max(), center_y)) + radius + 1
+    return pygame.Rect(int(x[0]) - radius, top, int(x[-1] - x[0]) + 2 * radius + 1, bottom - top).clip(surface.get_rect())
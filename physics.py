@@ -0,0 +1,123 @@
+import math
+
+import numpy as np
+
+from double_pendulum_ensemble import GRAVITY_REAL, angular_accelerations
+from jit import jit
+
+# --- Funções de Derivadas das Simulações ---
+# Cada fábrica devolve f(t, y) -> dy/dt no formato esperado por integrators.py:
+# posições na primeira metade do estado, velocidades na segunda.
+
+
+# --- Pêndulo Simples: y = [ângulo, velocidade angular] ---
+def make_simple_pendulum_rhs(length_real, gravity=GRAVITY_REAL):
+    gravity_over_length = gravity / length_real
+
+    def rhs(t, y):
+        angle, angular_velocity = y[0], y[1]
+        angular_acceleration = -gravity_over_length * np.sin(angle)
+        return np.stack((angular_velocity, angular_acceleration))
+
+    return rhs
+
+
+# --- Pêndulo Duplo: y = [theta1, theta2, omega1, omega2] ---
+def make_double_pendulum_rhs(L1_real, L2_real, M1_real, M2_real, gravity=GRAVITY_REAL):
+
+    def rhs(t, y):
+        theta1, theta2, omega1, omega2 = y[0], y[1], y[2], y[3]
+        alpha1, alpha2 = angular_accelerations(theta1, omega1, theta2, omega2,
+                                               L1_real, L2_real, M1_real, M2_real, gravity)
+        return np.stack((omega1, omega2, alpha1, alpha2))
+
+    return rhs
+
+
+# --- Projétil: y = [x, y, vx, vy] (qualquer unidade; y para baixo na tela) ---
+# Resistência do ar opcional: a = g - (linear_drag + quadratic_drag * |v|) * v, com
+# linear_drag em 1/s e quadratic_drag em 1/(unidade de comprimento); sem arrasto o
+# caminho é o original (aceleração constante).
+def make_projectile_rhs(gravity, linear_drag=0.0, quadratic_drag=0.0):
+
+    def rhs(t, y):
+        velocity_x, velocity_y = y[2], y[3]
+        return np.stack((velocity_x, velocity_y, np.zeros_like(velocity_x), np.full_like(velocity_y, gravity)))
+
+    def drag_rhs(t, y):
+        velocity_x, velocity_y = y[2], y[3]
+        damping = linear_drag + quadratic_drag * np.hypot(velocity_x, velocity_y) if quadratic_drag else linear_drag
+        return np.stack((velocity_x, velocity_y, -damping * velocity_x, gravity - damping * velocity_y))
+
+    return drag_rhs if linear_drag or quadratic_drag else rhs
+
+
+# --- Acelerações angulares de uma corrente de N elos (pêndulo de N elos), em O(N) ---
+# Massas pontuais inverse_masses[i] ** -1 na ponta de hastes rígidas sem massa de
+# comprimento lengths[i]; theta[i] é o ângulo absoluto do elo i a partir da vertical.
+# Em vez de montar e resolver a matriz de massa cheia N x N (O(N^3)), escreve a 2ª lei de
+# Newton de cada massa com as trações T das hastes vizinhas e impõe o comprimento de cada
+# haste na aceleração: isso dá um sistema tridiagonal nas trações,
+#   T[i-1] cos(theta[i-1] - theta[i]) / m[i-1] - T[i] (1 / m[i] + 1 / m[i-1])
+#     + T[i+1] cos(theta[i] - theta[i+1]) / m[i] = -L[i] omega[i]^2   (- g cos(theta[0]) em i = 0),
+# com 1 / m[-1] = 0 (pivô fixo), resolvido pelo algoritmo de Thomas (diagonal dominante,
+# sem pivotamento). A componente tangencial da mesma equação dá alpha[i]. Escreve em alpha;
+# work é um array (4, N) de rascunho. Para N = 2 coincide com a fórmula do pêndulo duplo.
+@jit
+def chain_accelerations(theta, omega, lengths, inverse_masses, gravity, alpha, work):
+    n = len(theta)
+    cos_next = work[0] # cos(theta[i] - theta[i+1])
+    sin_next = work[1] # sin(theta[i+1] - theta[i])
+    sweep = work[2] # Coeficientes c' da eliminação
+    tension = work[3] # d' na ida, trações na volta
+    for i in range(n - 1):
+        difference = theta[i + 1] - theta[i]
+        cos_next[i] = math.cos(difference)
+        sin_next[i] = math.sin(difference)
+
+    # Eliminação (ida)
+    previous_inverse_mass = 0.0
+    for i in range(n):
+        inverse_mass = inverse_masses[i]
+        diagonal = -(inverse_mass + previous_inverse_mass)
+        right = -lengths[i] * omega[i] * omega[i]
+        if i == 0:
+            right -= gravity * math.cos(theta[0])
+        else:
+            lower = cos_next[i - 1] * previous_inverse_mass
+            diagonal -= lower * sweep[i - 1]
+            right -= lower * tension[i - 1]
+        sweep[i] = cos_next[i] * inverse_mass / diagonal if i < n - 1 else 0.0
+        tension[i] = right / diagonal
+        previous_inverse_mass = inverse_mass
+
+    # Substituição (volta)
+    for i in range(n - 2, -1, -1):
+        tension[i] -= sweep[i] * tension[i + 1]
+
+    # Acelerações angulares
+    for i in range(n):
+        torque = 0.0
+        if i < n - 1:
+            torque += tension[i + 1] * sin_next[i] * inverse_masses[i]
+        if i == 0:
+            torque -= gravity * math.sin(theta[0])
+        else:
+            torque -= tension[i - 1] * sin_next[i - 1] * inverse_masses[i - 1]
+        alpha[i] = torque / lengths[i]
+
+
+# --- Pêndulo de N elos: y = [theta_0..theta_N-1, omega_0..omega_N-1] (um estado, sem ensemble) ---
+def make_chain_pendulum_rhs(lengths_real, masses_real, gravity=GRAVITY_REAL):
+    lengths = np.asarray(lengths_real, dtype=float)
+    inverse_masses = 1 / np.asarray(masses_real, dtype=float)
+    links = len(lengths)
+    work = np.empty((4, links))
+
+    def rhs(t, y):
+        derivative = np.empty(2 * links)
+        derivative[:links] = y[links:]
+        chain_accelerations(y[:links], y[links:], lengths, inverse_masses, gravity, derivative[links:], work)
+        return derivative
+
+    return rhs
@@ -0,0 +1,103 @@
+import contextlib
+import os
+import threading
+import time
+
+# --- Física numa Thread Própria (estado publicado em buffer duplo) ---
+# Cada script define update(segundos) -> snapshot: avança a física pelo tempo real dado
+# (FixedTimestep.batches, em lotes de step_many) e devolve uma tupla nova com o que o
+# desenho precisa (tempo, ângulos, posições...). PhysicsLoop chama update de um jeito ou
+# de outro:
+#   - sem thread (padrão): latest(frame_seconds) roda update no próprio frame, como antes;
+#   - com SIM_PHYSICS_THREAD=1: uma thread chama update com o tempo real decorrido desde
+#     a chamada anterior, a cada tick, e publica o snapshot num SnapshotBuffer; latest()
+#     só lê o último snapshot publicado, sem esperar pela física. Taxa de física e taxa de
+#     quadros ficam independentes: um rastro lento de desenhar não atrasa a física, e um
+#     lote pesado de física não congela os eventos e o desenho.
+# Os laços compilados pelo Numba soltam o GIL (jit.py, nogil), então os lotes de step_many
+# rodam de fato em paralelo com o desenho; no caminho em Python puro as duas threads se
+# alternam no GIL, mas o desenho continua sem esperar o fim da física do frame.
+# O laço principal só muda a simulação (teclas, cliques, reset) dentro de changes(), que
+# espera o lote em andamento e publica o estado novo ao sair.
+#
+# Variável de ambiente:
+#   SIM_PHYSICS_THREAD=1  roda a física numa thread separada (ignorado no benchmark e na exportação)
+
+PHYSICS_THREAD = os.environ.get('SIM_PHYSICS_THREAD', '') not in ('', '0')
+PHYSICS_TICK = 0.001 # Espera da thread entre chamadas de update (s)
+
+
+# --- Buffer duplo de snapshots: o escritor preenche o slot de trás e troca ---
+# O leitor sempre recebe um snapshot inteiro (o da frente). Snapshots não são alterados
+# depois de publicados (cada update devolve tuplas e arrays novos).
+class SnapshotBuffer:
+    def __init__(self, initial=None):
+        self._slots = [initial, initial]
+        self._front = 0
+        self._swap_lock = threading.Lock()
+        self.version = 0 # Quantos snapshots já foram publicados
+
+    def publish(self, snapshot):
+        back = 1 - self._front
+        self._slots[back] = snapshot
+        with self._swap_lock:
+            self._front = back
+            self.version += 1
+
+    def read(self):
+        with self._swap_lock:
+            return self._slots[self._front]
+
+
+class PhysicsLoop:
+    def __init__(self, update, threaded=PHYSICS_THREAD, tick=PHYSICS_TICK):
+        self.update = update
+        self.threaded = threaded
+        self.tick = tick
+        self.lock = threading.RLock() # Com a thread: preso durante cada update
+        self.snapshots = SnapshotBuffer()
+        self.updates_per_second = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        if threaded:
+            self.snapshots.publish(update(0.0))
+            self._thread = threading.Thread(target=self._run, name='physics', daemon=True)
+            self._thread.start()
+
+    # --- Snapshot para o desenho deste frame ---
+    def latest(self, frame_seconds):
+        if not self.threaded:
+            return self.update(frame_seconds)
+        return self.snapshots.read()
+
+    # --- Bloco em que o laço principal muda a simulação ---
+    # Com a thread: espera o lote em andamento e, ao sair, publica o estado novo (update(0)
+    # não avança nada). Sem mudanças (needed falso) ou sem thread, não faz nada.
+    @contextlib.contextmanager
+    def changes(self, needed=True):
+        if not (self.threaded and needed):
+            yield
+            return
+        with self.lock:
+            yield
+            self.snapshots.publish(self.update(0.0))
+
+    def _run(self):
+        last = time.perf_counter()
+        rate_start, rate_updates = last, 0
+        while not self._stop.wait(self.tick):
+            with self.lock:
+                now = time.perf_counter()
+                self.snapshots.publish(self.update(now - last))
+            last = now
+            rate_updates += 1
+            if now - rate_start >= 1.0:
+                self.updates_per_second = rate_updates / (now - rate_start)
+                rate_start, rate_updates = now, 0
+
+    # --- Para a thread (antes de fechar gravações e sair) ---
+    def close(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
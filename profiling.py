@@ -0,0 +1,124 @@
+import json
+import os
+import time
+from collections import deque
+
+# --- Medição de Tempo por Fase do Frame ---
+# O laço principal marca o fim de cada fase ("events", "update", "draw", "flip") com
+# profiler.mark(nome); o tempo de cada fase é o intervalo desde a marca anterior.
+# Subfases (rastro, HUD, ...) ficam entre begin_section(nome) e end_section(), com nomes
+# no formato "fase/subfase" (ex.: "draw/trail"); subfases aninhadas juntam os nomes.
+#
+# Sobreposição na tela: tecla F3 mostra min/média/p99 das últimas ROLLING_FRAMES.
+#
+# Variáveis de ambiente:
+#   SIM_BENCH_FRAMES=N    (benchmark) inicia a simulação sozinho, roda N frames sem clock.tick e sai
+#   SIM_BENCH_OUTPUT=arq  (benchmark) grava o resumo das fases em JSON ao sair
+#   SIM_TRACE_OUTPUT=arq  grava a linha do tempo no formato Chrome trace (chrome://tracing, Perfetto)
+
+BENCH_FRAMES = int(os.environ.get('SIM_BENCH_FRAMES', '0'))
+BENCH_OUTPUT = os.environ.get('SIM_BENCH_OUTPUT')
+TRACE_OUTPUT = os.environ.get('SIM_TRACE_OUTPUT')
+
+ROLLING_FRAMES = 240 # Janela da sobreposição (~4 s a 60 FPS)
+MAX_TRACE_EVENTS = 2_000_000 # Limite de eventos guardados para o trace
+OVERLAY_REFRESH_FRAMES = 15 # A sobreposição recalcula as estatísticas a cada N frames
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(samples_ms):
+    ordered = sorted(samples_ms)
+    return {
+        'min_ms': ordered[0] if ordered else 0.0,
+        'avg_ms': sum(ordered) / len(ordered) if ordered else 0.0,
+        'p50_ms': percentile(ordered, 0.50),
+        'p99_ms': percentile(ordered, 0.99),
+        'max_ms': ordered[-1] if ordered else 0.0,
+    }
+
+
+class FrameProfiler:
+    def __init__(self, keep_history=bool(BENCH_FRAMES), trace=bool(TRACE_OUTPUT)):
+        self.samples = {} # fase -> durações recentes (ms), janela móvel
+        self.history = {} if keep_history else None # fase -> todas as durações (benchmark)
+        self.trace_events = [] if trace else None
+        self.frame_count = 0
+        self.overlay_visible = False
+        self._origin = time.perf_counter()
+        self._frame_start = None
+        self._last_mark = None
+        self._sections = [] # pilha de (nome, início)
+        self._overlay_rows = []
+
+    # --- Registro de uma duração (janela móvel, histórico e trace) ---
+    def _record(self, name, start, end):
+        duration_ms = (end - start) * 1000
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=ROLLING_FRAMES)
+        samples.append(duration_ms)
+        if self.history is not None:
+            self.history.setdefault(name, []).append(duration_ms)
+        if self.trace_events is not None and len(self.trace_events) < MAX_TRACE_EVENTS:
+            self.trace_events.append({'name': name, 'ph': 'X', 'pid': 0, 'tid': 0,
+                                      'ts': (start - self._origin) * 1e6, 'dur': (end - start) * 1e6})
+
+    def begin_frame(self):
+        self._frame_start = self._last_mark = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self._record(phase, self._last_mark, now)
+        self._last_mark = now
+
+    # --- Subfases, aninhadas dentro da fase corrente ---
+    def begin_section(self, name):
+        self._sections.append((name, time.perf_counter()))
+
+    def end_section(self):
+        name, start = self._sections.pop()
+        parents = [section_name for section_name, _ in self._sections]
+        self._record('/'.join(parents + [name]), start, time.perf_counter())
+
+    def end_frame(self):
+        self._record('frame', self._frame_start, time.perf_counter())
+        self.frame_count += 1
+
+    def summary(self):
+        source = self.history if self.history is not None else self.samples
+        return {phase: summarize(values) for phase, values in source.items()}
+
+    def write_json(self, path, **metadata):
+        with open(path, 'w') as output_file:
+            json.dump({'frames': self.frame_count, **metadata, 'phases': self.summary()}, output_file, indent=2)
+
+    # --- Linha do tempo no formato Chrome trace (JSON) ---
+    def write_trace(self, path, process_name='simulação'):
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': 0, 'tid': 0, 'args': {'name': process_name}}]
+        events.extend(self.trace_events or [])
+        with open(path, 'w') as output_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, output_file)
+
+    # --- Sobreposição na tela (min / média / p99 da janela móvel) ---
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+
+    def draw_overlay(self, surface, draw_text, x, y, color, font_size=18):
+        if not self.overlay_visible:
+            return
+        if self.frame_count % OVERLAY_REFRESH_FRAMES == 0 or not self._overlay_rows:
+            self._overlay_rows = [('fase (ms)', 'min', 'méd', 'p99')]
+            for phase, values in self.samples.items():
+                stats = summarize(values)
+                self._overlay_rows.append((phase, f"{stats['min_ms']:.2f}", f"{stats['avg_ms']:.2f}", f"{stats['p99_ms']:.2f}"))
+        # Uma coluna por valor, para alinhar mesmo com fonte proporcional
+        column_offsets = (0, 130, 180, 230)
+        for row_index, row in enumerate(self._overlay_rows):
+            for offset, text in zip(column_offsets, row):
+                draw_text(surface, text, font_size, color, x + offset, y + row_index * (font_size - 4))
@@ -0,0 +1,123 @@
+import numpy as np
+
+from double_pendulum_ensemble import GRAVITY_REAL
+
+# --- Solução Analítica do Projétil (sem resistência do ar) ---
+# Tudo em metros e segundos, com y para cima e o chão em y = 0.
+# Todas as funções aceitam escalares ou arrays (com broadcasting) de velocidade
+# inicial (m/s), ângulo (graus) e altura inicial (m), sem nenhum passo de tempo.
+
+
+def velocity_components(velocity, angle_degrees):
+    velocity = np.asarray(velocity, dtype=float)
+    angle_radians = np.radians(angle_degrees)
+    return velocity * np.cos(angle_radians), velocity * np.sin(angle_radians)
+
+
+# --- Tempo de voo até o impacto com o chão ---
+def time_of_flight(velocity, angle_degrees, height=0.0, gravity=GRAVITY_REAL):
+    _, velocity_y = velocity_components(velocity, angle_degrees)
+    height = np.asarray(height, dtype=float)
+    return (velocity_y + np.sqrt(velocity_y**2 + 2 * gravity * height)) / gravity
+
+
+# --- Alcance horizontal ---
+def horizontal_range(velocity, angle_degrees, height=0.0, gravity=GRAVITY_REAL):
+    velocity_x, _ = velocity_components(velocity, angle_degrees)
+    return velocity_x * time_of_flight(velocity, angle_degrees, height, gravity)
+
+
+# --- Altura máxima (a própria altura inicial se o lançamento não sobe) ---
+def max_height(velocity, angle_degrees, height=0.0, gravity=GRAVITY_REAL):
+    _, velocity_y = velocity_components(velocity, angle_degrees)
+    return np.asarray(height, dtype=float) + np.maximum(velocity_y, 0.0)**2 / (2 * gravity)
+
+
+def time_to_apex(velocity, angle_degrees, gravity=GRAVITY_REAL):
+    _, velocity_y = velocity_components(velocity, angle_degrees)
+    return np.maximum(velocity_y, 0.0) / gravity
+
+
+# --- Ângulo de alcance máximo a partir da altura h (forma fechada) ---
+def optimal_launch_angle(velocity, height=0.0, gravity=GRAVITY_REAL):
+    velocity = np.asarray(velocity, dtype=float)
+    height = np.asarray(height, dtype=float)
+    return np.degrees(np.arctan2(velocity, np.sqrt(velocity**2 + 2 * gravity * height)))
+
+
+def max_range(velocity, height=0.0, gravity=GRAVITY_REAL):
+    velocity = np.asarray(velocity, dtype=float)
+    height = np.asarray(height, dtype=float)
+    return velocity / gravity * np.sqrt(velocity**2 + 2 * gravity * height)
+
+
+# --- Trajetória completa amostrada nos instantes t (parada no chão após o impacto) ---
+def trajectory(velocity, angle_degrees, height=0.0, t=None, n_points=200, gravity=GRAVITY_REAL):
+    # Retorna (t, x, y, vx, vy); t tem uma dimensão extra no fim para vetorizar sobre lançamentos
+    velocity_x, velocity_y = velocity_components(velocity, angle_degrees)
+    flight_time = time_of_flight(velocity, angle_degrees, height, gravity)
+    if t is None:
+        t = np.linspace(0.0, 1.0, n_points) * np.expand_dims(flight_time, -1)
+    velocity_x = np.expand_dims(velocity_x, -1)
+    velocity_y = np.expand_dims(velocity_y, -1)
+    t = np.minimum(t, np.expand_dims(flight_time, -1))
+    x = velocity_x * t
+    y = np.expand_dims(np.asarray(height, dtype=float), -1) + velocity_y * t - 0.5 * gravity * t**2
+    vy = velocity_y - gravity * t
+    return t, x, y, np.broadcast_to(velocity_x, x.shape), vy
+
+
+# --- Interpolação multilinear vetorizada numa grade regular (eixos crescentes) ---
+# Fora da grade o valor é o da borda (sem extrapolação).
+def interpolate_grid(axes, table, queries):
+    queries = np.broadcast_arrays(*(np.asarray(q, dtype=float) for q in queries))
+
+    lower_indices, weights = [], []
+    for axis, query in zip(axes, queries):
+        index = np.clip(np.searchsorted(axis, query) - 1, 0, len(axis) - 2)
+        lower_indices.append(index)
+        weights.append(np.clip((query - axis[index]) / (axis[index + 1] - axis[index]), 0.0, 1.0))
+
+    result = 0.0
+    n_axes = len(axes)
+    for corner in range(2 ** n_axes):
+        offsets = [(corner >> (n_axes - 1 - axis_index)) & 1 for axis_index in range(n_axes)]
+        corner_weight = 1.0
+        for weight, offset in zip(weights, offsets):
+            corner_weight = corner_weight * (weight if offset else 1 - weight)
+        result = result + corner_weight * table[tuple(index + offset for index, offset in zip(lower_indices, offsets))]
+    return result
+
+
+# --- Tabela pré-calculada de voo sobre uma grade (velocidade x ângulo x altura) ---
+class FlightTable:
+    def __init__(self, velocities, angles_degrees, heights, gravity=GRAVITY_REAL):
+        self.velocities = np.asarray(velocities, dtype=float)
+        self.angles_degrees = np.asarray(angles_degrees, dtype=float)
+        self.heights = np.asarray(heights, dtype=float)
+        self.gravity = gravity
+
+        v, a, h = np.meshgrid(self.velocities, self.angles_degrees, self.heights, indexing='ij')
+        self.time_of_flight = time_of_flight(v, a, h, gravity)
+        self.range = horizontal_range(v, a, h, gravity)
+        self.max_height = max_height(v, a, h, gravity)
+
+    # --- Interpolação trilinear vetorizada numa das grandezas da tabela ---
+    def lookup(self, velocity, angle_degrees, height, quantity='range'):
+        return interpolate_grid((self.velocities, self.angles_degrees, self.heights), getattr(self, quantity),
+                                (velocity, angle_degrees, height))
+
+    # --- Ângulo de alcance máximo para cada (velocidade, altura) da grade ---
+    def best_angles(self):
+        # Máximo na grade de ângulos, refinado por uma parábola pelos três pontos vizinhos
+        best = np.argmax(self.range, axis=1)
+        inner = np.clip(best, 1, len(self.angles_degrees) - 2)
+        v_index, h_index = np.meshgrid(np.arange(len(self.velocities)), np.arange(len(self.heights)), indexing='ij')
+        r_left = self.range[v_index, inner - 1, h_index]
+        r_mid = self.range[v_index, inner, h_index]
+        r_right = self.range[v_index, inner + 1, h_index]
+        curvature = r_left - 2 * r_mid + r_right
+        shift = np.where(curvature < 0, 0.5 * (r_left - r_right) / np.where(curvature < 0, curvature, 1.0), 0.0)
+        step = self.angles_degrees[1] - self.angles_degrees[0]
+        refined = self.angles_degrees[inner] + np.clip(shift, -1, 1) * step
+        return np.where(best == inner, refined, self.angles_degrees[best])
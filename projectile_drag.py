@@ -0,0 +1,351 @@
+import argparse
+import functools
+import math
+import sys
+import time
+
+import numpy as np
+
+import integrators
+from double_pendulum_ensemble import GRAVITY_REAL
+from physics import make_projectile_rhs
+from projectile_analytic import interpolate_grid, max_range, velocity_components
+
+# --- Projétil com Resistência do Ar e Mira Inversa ---
+# Tudo em metros e segundos, com y para cima e o chão em y = 0 (como projectile_analytic).
+# Modelos de arrasto:
+#   vacuum    - sem resistência do ar
+#   linear    - lei de Stokes, F = 3 pi mu D v (D: diâmetro da área frontal; Cd não entra)
+#   quadratic - F = 1/2 rho Cd A |v| v (bolas, projéteis comuns)
+# fly() integra um lote inteiro de lançamentos de uma vez (RK4 vetorizado; quem termina
+# sai do lote) e localiza os eventos dentro do passo: impacto, ápice e a altura ao passar
+# por distâncias dadas. AimTable pré-calcula a altura na grade velocidade x ângulo x
+# distância e resolve a mira inversa (ângulos para uma velocidade, ou velocidade mínima)
+# para muitos alvos de uma vez, por bisseção vetorizada na tabela; solve_angles corrige
+# os ângulos da bisseção com trajetórias exatas (refine(), secante sobre fly()).
+# Exemplo:
+#   python projectile_drag.py --drag quadratic --x 40 --y 3 --speed 30
+#   python projectile_drag.py --drag quadratic --targets alvos.csv -o mira.csv
+
+AIR_DENSITY = 1.225 # kg/m^3 (nível do mar, 15 °C)
+AIR_VISCOSITY = 1.81e-5 # Pa.s
+DRAG_MODELS = ('vacuum', 'linear', 'quadratic')
+DEFAULT_DT = 0.05
+MAX_FLIGHT_TIME = 120.0
+LOWEST_HEIGHT = -50.0 # Abaixo disso o lançamento deixa o lote (distâncias restantes ficam NaN)
+
+
+# --- Coeficientes do arrasto por unidade de massa: (linear em 1/s, quadrático em 1/m) ---
+def drag_coefficients(model, drag_coefficient, mass, area):
+    if model == 'vacuum':
+        return 0.0, 0.0
+    if not (mass > 0 and area > 0 and drag_coefficient >= 0):
+        raise ValueError("Valores inválidos para o arrasto (massa > 0, área > 0, Cd >= 0).")
+    if model == 'linear':
+        diameter = 2 * math.sqrt(area / math.pi)
+        return 3 * math.pi * AIR_VISCOSITY * diameter / mass, 0.0
+    if model == 'quadratic':
+        return 0.0, 0.5 * AIR_DENSITY * drag_coefficient * area / mass
+    raise ValueError(f"Modelo de arrasto desconhecido: {model!r} (opções: {', '.join(DRAG_MODELS)})")
+
+
+def make_drag_rhs(model, drag_coefficient, mass, area, gravity=GRAVITY_REAL):
+    return make_projectile_rhs(-gravity, *drag_coefficients(model, drag_coefficient, mass, area))
+
+
+def next_drag_model(model):
+    return DRAG_MODELS[(DRAG_MODELS.index(model) + 1) % len(DRAG_MODELS)]
+
+
+# --- Voo em lote com eventos localizados dentro do passo ---
+# speeds, angles_degrees e height com broadcasting; distances: (K,) distâncias comuns a
+# todos, ou shape + (K,) por lançamento, crescentes. Devolve um dict de arrays no shape
+# do lote: flight_time, range, impact_vx, impact_vy, max_height e heights (shape + (K,),
+# a altura ao passar por cada distância; abaixo do chão se já caiu, NaN se não alcança).
+def fly(rhs, speeds, angles_degrees, height=0.0, distances=None, dt=DEFAULT_DT, max_time=MAX_FLIGHT_TIME,
+        integrator='rk4', lowest_height=LOWEST_HEIGHT):
+    velocity_x, velocity_y = velocity_components(speeds, angles_degrees)
+    velocity_x, velocity_y, height = np.broadcast_arrays(velocity_x, velocity_y, np.asarray(height, dtype=float))
+    shape = velocity_x.shape
+    n = velocity_x.size
+    state = np.stack((np.zeros(n), height.ravel(), velocity_x.ravel(), velocity_y.ravel()))
+    stepper = integrators.get_stepper(integrator)
+
+    if distances is None:
+        levels = np.empty((n, 0))
+    else:
+        distances = np.asarray(distances, dtype=float)
+        levels = np.broadcast_to(distances, shape + distances.shape[-1:]).reshape(n, -1)
+    n_levels = levels.shape[1]
+
+    flight_time = np.full(n, np.nan)
+    impact = np.full((4, n), np.nan)
+    max_height = state[1].copy()
+    heights = np.full((n, n_levels), np.nan)
+    landed = np.zeros(n, dtype=bool)
+    next_level = np.zeros(n, dtype=np.intp)
+    members = np.arange(n)
+
+    t = 0.0
+    while len(members) and t < max_time:
+        previous = state
+        state = stepper(rhs, t, previous, dt)
+        x0, y0, velocity_x0, velocity_y0 = previous
+        x1, y1, velocity_x1, velocity_y1 = state
+
+        # Ápice: vy passa de positivo para <= 0 neste passo
+        apex = np.flatnonzero((velocity_y0 > 0) & (velocity_y1 <= 0))
+        if len(apex):
+            acceleration0 = rhs(t, previous[:, apex])[3]
+            acceleration1 = rhs(t + dt, state[:, apex])[3]
+            s = integrators.locate_crossing(velocity_y0[apex], acceleration0, velocity_y1[apex], acceleration1,
+                                            dt, 0.0, direction=-1.0)
+            max_height[members[apex]] = integrators.hermite_interpolate(y0[apex], velocity_y0[apex], y1[apex],
+                                                                        velocity_y1[apex], dt, s)
+
+        # Impacto: primeira passagem pelo chão descendo
+        hit = np.flatnonzero(~landed[members] & (y1 <= 0) & (velocity_y1 < 0))
+        if len(hit):
+            s = integrators.locate_crossing(y0[hit], velocity_y0[hit], y1[hit], velocity_y1[hit], dt, 0.0,
+                                            direction=-1.0)
+            impact[:, members[hit]] = integrators.hermite_interpolate(previous[:, hit], rhs(t, previous[:, hit]),
+                                                                      state[:, hit], rhs(t + dt, state[:, hit]), dt, s)
+            flight_time[members[hit]] = t + s * dt
+            landed[members[hit]] = True
+
+        # Distâncias: um passo pode atravessar várias
+        for _ in range(n_levels):
+            pending = np.flatnonzero(next_level[members] < n_levels)
+            level_x = levels[members[pending], next_level[members[pending]]]
+            crossing = x1[pending] >= level_x
+            if not crossing.any():
+                break
+            crossed = pending[crossing]
+            index = members[crossed]
+            s = integrators.locate_crossing(x0[crossed], velocity_x0[crossed], x1[crossed], velocity_x1[crossed],
+                                            dt, level_x[crossing])
+            heights[index, next_level[index]] = integrators.hermite_interpolate(
+                y0[crossed], velocity_y0[crossed], y1[crossed], velocity_y1[crossed], dt, s)
+            next_level[index] += 1
+
+        # Sai do lote quem já caiu e passou por todas as distâncias, ou caiu demais
+        done = (landed[members] & (next_level[members] == n_levels)) | (y1 < lowest_height)
+        if done.any():
+            state = state[:, ~done]
+            members = members[~done]
+        t += dt
+
+    return {
+        'flight_time': flight_time.reshape(shape),
+        'range': impact[0].reshape(shape),
+        'impact_vx': impact[2].reshape(shape),
+        'impact_vy': impact[3].reshape(shape),
+        'max_height': max_height.reshape(shape),
+        'heights': heights.reshape(shape + (n_levels,)),
+    }
+
+
+# --- Tabela pré-calculada para a mira inversa (velocidade x ângulo x distância) ---
+class AimTable:
+    def __init__(self, rhs, height=0.0, speeds=None, angles_degrees=None, distances=None, dt=DEFAULT_DT,
+                 gravity=GRAVITY_REAL):
+        self.rhs = rhs
+        self.height = height
+        self.dt = dt
+        self.speeds = np.linspace(1.0, 60.0, 60) if speeds is None else np.asarray(speeds, dtype=float)
+        self.angles_degrees = (np.linspace(-45.0, 89.0, 135) if angles_degrees is None
+                               else np.asarray(angles_degrees, dtype=float))
+        if distances is None:
+            # Até o alcance máximo sem arrasto na maior velocidade (com arrasto é sempre menor),
+            # mais densa perto do lançador, onde a altura muda mais rápido com a distância
+            distances = float(max_range(self.speeds[-1], height, gravity)) * np.linspace(0.0, 1.0, 241)**1.5
+        self.distances = np.asarray(distances, dtype=float)
+
+        v, a = np.meshgrid(self.speeds, self.angles_degrees, indexing='ij')
+        flights = fly(rhs, v, a, height, self.distances, dt)
+        self.range = flights['range']
+        self.max_height = flights['max_height']
+        # Distâncias não alcançadas (o lançamento caiu abaixo de LOWEST_HEIGHT antes) ficam
+        # NaN: interpolar até um piso fictício deslocaria as raízes do arco alto. Na bisseção
+        # NaN conta como "abaixo do alvo"
+        self.heights = flights['heights']
+        # Envelope: maior altura alcançável em cada (velocidade, distância)
+        self.envelope = np.nan_to_num(self.heights, nan=LOWEST_HEIGHT).max(axis=1)
+
+    def height_at(self, speed, angle_degrees, distance):
+        return interpolate_grid((self.speeds, self.angles_degrees, self.distances), self.heights,
+                                (speed, angle_degrees, distance))
+
+    # --- Ângulo que dá a maior altura na distância x (máximo na grade + parábola) ---
+    def _peak_angles(self, speed, x):
+        angles = self.angles_degrees
+        profile = self.height_at(speed[..., None], angles, x[..., None])
+        profile = np.where(np.isnan(profile), -np.inf, profile)
+        best = np.argmax(profile, axis=-1)
+        inner = np.clip(best, 1, len(angles) - 2)[..., None]
+        left, mid, right = (np.take_along_axis(profile, inner + offset, axis=-1)[..., 0] for offset in (-1, 0, 1))
+        with np.errstate(invalid='ignore'):
+            curvature = left - 2 * mid + right
+            usable = np.isfinite(curvature) & (curvature < 0) # Vizinho não alcançado: fica o ponto da grade
+            shift = np.where(usable, 0.5 * (left - right) / np.where(usable, curvature, 1.0), 0.0)
+        refined = angles[inner[..., 0]] + np.clip(shift, -1, 1) * (angles[1] - angles[0])
+        return np.where(best == inner[..., 0], refined, angles[best])
+
+    # --- Ângulos (baixo, alto) que acertam (x, y) com a velocidade dada; NaN se não alcança ---
+    # A bisseção na tabela erra até metros no arco alto (a altura muda rápido com o ângulo);
+    # com refine (padrão) os dois arcos saem corrigidos por trajetórias exatas.
+    def solve_angles(self, speed, x, y, iterations=40, refine=True):
+        speed, x, y = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (speed, x, y)))
+        peak = self._peak_angles(speed, x)
+        reachable = self.height_at(speed, peak, x) >= y
+
+        # A altura em x cresce com o ângulo até o pico e decresce depois: uma raiz em cada lado
+        solutions = []
+        for lo, hi, rising in ((self.angles_degrees[0], peak, True), (peak, self.angles_degrees[-1], False)):
+            lo = np.broadcast_to(lo, speed.shape).copy()
+            hi = np.broadcast_to(hi, speed.shape).copy()
+            for _ in range(iterations):
+                mid = 0.5 * (lo + hi)
+                below = ~(self.height_at(speed, mid, x) >= y) == rising
+                lo = np.where(below, mid, lo)
+                hi = np.where(below, hi, mid)
+            angle = 0.5 * (lo + hi)
+            # Sem troca de sinal no ramo, a raiz está fora da grade de ângulos
+            end = self.angles_degrees[0] if rising else self.angles_degrees[-1]
+            inside = ~(self.height_at(speed, end, x) > y)
+            solutions.append(np.where(reachable & inside, angle, np.nan))
+        if refine:
+            solutions = [self.refine(speed, angle, x, y) for angle in solutions]
+        return tuple(solutions)
+
+    # --- Menor velocidade que alcança (x, y) e o ângulo correspondente; NaN fora da grade ---
+    def minimum_speed(self, x, y, iterations=40):
+        x, y = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (x, y)))
+        lo = np.full(x.shape, self.speeds[0])
+        hi = np.full(x.shape, self.speeds[-1])
+        for _ in range(iterations):
+            mid = 0.5 * (lo + hi)
+            below = interpolate_grid((self.speeds, self.distances), self.envelope, (mid, x)) < y
+            lo = np.where(below, mid, lo)
+            hi = np.where(below, hi, mid)
+        speed = np.where(interpolate_grid((self.speeds, self.distances), self.envelope, (self.speeds[-1], x)) >= y,
+                         hi, np.nan)
+        valid = ~np.isnan(speed)
+        angle = np.full(x.shape, np.nan)
+        angle[valid] = self._peak_angles(speed[valid], x[valid])
+        return speed, angle
+
+    # --- Correção dos ângulos da tabela com trajetórias exatas (secante em lote) ---
+    # Devolve, por alvo, o ângulo com o menor erro entre os tentados; NaN onde esse erro passa
+    # de tolerance metros (a raiz está fora da grade de ângulos, por exemplo quase na vertical).
+    def refine(self, speed, angle_degrees, x, y, iterations=12, step=0.05, tolerance=1e-3):
+        speed, angle_degrees, x, y = np.broadcast_arrays(
+            *(np.asarray(value, dtype=float) for value in (speed, angle_degrees, x, y)))
+        refined = angle_degrees.copy()
+        valid = np.flatnonzero(~np.isnan(angle_degrees))
+        if len(valid) == 0:
+            return refined
+        speed, x, y = speed.ravel()[valid], x.ravel()[valid], y.ravel()[valid]
+        # Piso do voo abaixo do alvo mais baixo: alvos perto de LOWEST_HEIGHT também são medidos
+        lowest_height = min(LOWEST_HEIGHT, float(y.min())) + LOWEST_HEIGHT
+
+        def miss(angle):
+            heights = fly(self.rhs, speed, angle, self.height, x[:, None], self.dt,
+                          lowest_height=lowest_height)['heights'][:, 0]
+            return np.nan_to_num(heights, nan=lowest_height) - y
+
+        previous_angle = angle_degrees.ravel()[valid]
+        previous_miss = miss(previous_angle)
+        best_angle, best_miss = previous_angle, np.abs(previous_miss)
+        angle = previous_angle + step
+        for _ in range(iterations):
+            current_miss = miss(angle)
+            better = np.abs(current_miss) < best_miss
+            best_angle = np.where(better, angle, best_angle)
+            best_miss = np.where(better, np.abs(current_miss), best_miss)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                secant = angle - current_miss * (angle - previous_angle) / (current_miss - previous_miss)
+            # Mantém o melhor dos dois onde a secante não é utilizável
+            secant = np.where(np.isfinite(secant), secant, angle)
+            previous_angle, previous_miss = angle, current_miss
+            angle = np.clip(secant, self.angles_degrees[0], self.angles_degrees[-1])
+        current_miss = miss(angle)
+        better = np.abs(current_miss) < best_miss
+        best_angle = np.where(better, angle, best_angle)
+        best_miss = np.where(better, np.abs(current_miss), best_miss)
+        refined.ravel()[valid] = np.where(best_miss <= tolerance, best_angle, np.nan)
+        return refined
+
+
+# --- Tabela em cache por parâmetros (calculá-la leva uma fração de segundo) ---
+@functools.lru_cache(maxsize=8)
+def aim_table(model='quadratic', drag_coefficient=0.47, mass=0.145, area=0.0043, height=0.0, gravity=GRAVITY_REAL):
+    return AimTable(make_drag_rhs(model, drag_coefficient, mass, area, gravity), height, gravity=gravity)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Mira inversa de projéteis com resistência do ar.")
+    parser.add_argument('--drag', choices=DRAG_MODELS, default='quadratic', help="Modelo de arrasto")
+    parser.add_argument('--cd', type=float, default=0.47, help="Coeficiente de arrasto (esfera: 0.47)")
+    parser.add_argument('--mass', type=float, default=0.145, help="Massa (kg)")
+    parser.add_argument('--area', type=float, default=0.0043, help="Área frontal (m^2)")
+    parser.add_argument('--height', type=float, default=0.0, help="Altura de lançamento (m)")
+    parser.add_argument('--gravity', type=float, default=GRAVITY_REAL, help="Gravidade (m/s^2)")
+    parser.add_argument('--x', type=float, help="Distância horizontal do alvo (m)")
+    parser.add_argument('--y', type=float, default=0.0, help="Altura do alvo (m)")
+    parser.add_argument('--speed', type=float, help="Velocidade de lançamento (m/s); sem ela, calcula a mínima")
+    parser.add_argument('--targets', help="CSV com colunas x,y[,speed] (um alvo por linha, com cabeçalho)")
+    parser.add_argument('--table-only', action='store_true',
+                        help="Ângulos só da tabela, sem a correção por trajetórias exatas (com --speed)")
+    parser.add_argument('-o', '--output', help="Arquivo de saída das soluções em lote (.csv ou .npy)")
+    return parser
+
+
+def main(argv=None):
+    from headless import write_series
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if (args.x is None) == (args.targets is None):
+        parser.error("Informe um alvo (--x/--y) ou um arquivo de alvos (--targets).")
+
+    try:
+        start = time.perf_counter()
+        table = aim_table(args.drag, args.cd, args.mass, args.area, args.height, args.gravity)
+        build_seconds = time.perf_counter() - start
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.targets:
+        targets = np.atleast_2d(np.loadtxt(args.targets, delimiter=',', skiprows=1))
+        x, y = targets[:, 0], targets[:, 1]
+        speed = targets[:, 2] if targets.shape[1] > 2 else None
+    else:
+        x, y = np.array([args.x]), np.array([args.y])
+        speed = None if args.speed is None else np.array([args.speed])
+
+    start = time.perf_counter()
+    if speed is None:
+        # Na velocidade mínima os dois arcos coincidem
+        speed, low = table.minimum_speed(x, y)
+        high = low.copy()
+    else:
+        low, high = table.solve_angles(speed, x, y, refine=not args.table_only)
+    solve_seconds = time.perf_counter() - start
+
+    columns = ['x', 'y', 'speed', 'low_angle', 'high_angle']
+    solutions = np.column_stack((x, y, speed, low, high))
+    if args.output:
+        write_series(args.output, columns, solutions)
+    elif not args.targets:
+        print(f"Velocidade: {speed[0]:.3f} m/s")
+        print(f"Ângulo baixo: {low[0]:.3f}°  Ângulo alto: {high[0]:.3f}°")
+    else:
+        write_series(sys.stdout, columns, solutions)
+    print(f"Tabela: {build_seconds:.3f}s; {len(x)} alvos em {solve_seconds:.4f}s "
+          f"({len(x) / max(solve_seconds, 1e-9):.0f} alvos/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
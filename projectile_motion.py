@@ -2,16 +2,37 @@ import pygame
 import sys
 import math
 
+import numpy as np
+
+import integrators
+import projectile_analytic
+import projectile_drag
+from bodies import Projectile
+from frame_export import EXPORT_FRAMES, EXPORT_PATH, FrameExporter
+from frame_loop import FixedTimestep
+from layers import LayeredScreen
+from physics import make_projectile_rhs
+from physics_thread import PHYSICS_THREAD, PhysicsLoop
+from profiling import BENCH_FRAMES, BENCH_OUTPUT, TRACE_OUTPUT, FrameProfiler
+from projectile_swarm import ProjectileSwarm
+from text_cache import draw_text, get_font, render_text
+from trail import TrailRenderer
+
 # --- Configurações Iniciais ---
 WIDTH, HEIGHT = 800, 600
 FPS = 60 # Frames por segundo
 DT = 1 / FPS # Delta de tempo em segundos por frame
+INTEGRATOR = 'verlet' # 'euler', 'rk4', 'verlet' ou 'rk45' (tecla 'I' alterna)
+PHYSICS_SUBSTEPS = 1 # Passos de física por DT
+TIME_WARP = 1.0 # Tempo simulado por segundo real (teclas '+' e '-')
+DRAG_MODEL = 'vacuum' # 'vacuum', 'linear' ou 'quadratic' (tecla 'D' alterna; o enxame é sempre sem arrasto)
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0) # Projétil e seta Vx
 GREEN = (0, 255, 0) # Chão e botão LANÇAR
 BLUE = (0, 0, 255) # Trajetória
 YELLOW = (255, 255, 0) # Seta Vy (NOVA COR)
+ORANGE = (255, 165, 0) # Enxame de projéteis
 LIGHT_GREY = (200, 200, 200) # Cor para texto input
 ACTIVE_COLOR = (150, 150, 255) # Cor quando a caixa de input está ativa
 INACTIVE_COLOR = (100, 100, 100) # Cor quando a caixa de input está inativa
@@ -30,10 +51,19 @@ pygame.display.set_caption("Simulação de Projétil com Vetores de Velocidade")
 # Clock para controlar o FPS
 clock = pygame.time.Clock()
 
+# Passo fixo da física, desacoplado da taxa de quadros
+timestep = FixedTimestep(DT, PHYSICS_SUBSTEPS, TIME_WARP)
+
 # --- Gravidade no mundo real (m/s^2) ---
 GRAVITY_REAL = 9.81 # m/s^2
 GRAVITY_PIXEL_PER_SEC2 = GRAVITY_REAL * PIXELS_PER_METER
 
+# --- Integrador numérico e corpo simulado (Projectile em pixels, y para baixo; criado no reset) ---
+integrator_name = INTEGRATOR
+projectile = None
+drag_model = DRAG_MODEL
+DRAG_MODEL_NAMES = {'vacuum': 'NENHUM', 'linear': 'LINEAR (Stokes)', 'quadratic': 'QUADRÁTICO'}
+
 # --- Posição do chão em pixels ---
 ground_y_pixel = HEIGHT - 40
 
@@ -44,7 +74,7 @@ class InputBox:
         self.color = INACTIVE_COLOR
         self.text = text
         self.label = label 
-        self.font = pygame.font.Font(None, 32) 
+        self.font = get_font(32) 
         self.active = False
         self.txt_surface = self.font.render(text, True, LIGHT_GREY) 
         self.label_surface = self.font.render(label, True, WHITE) 
@@ -87,7 +117,15 @@ velocity_x_pixel_per_sec = 0
 velocity_y_pixel_per_sec = 0
 is_launched = False 
 
-trajectory_points = []
+# Rastro da trajetória (caminho inteiro em níveis de detalhe + superfície persistente)
+trajectory = TrailRenderer((WIDTH, HEIGHT), BLUE, 2)
+
+# Enxame de projéteis (tecla 'S'): leque de lançamentos em volta dos valores das caixas
+SWARM_CAPACITY = 100000
+SPRAY_COUNT = 10000 # Projéteis por lançamento em leque
+SPRAY_ANGLE_SPREAD = 20 # Variação do ângulo (graus, para cada lado)
+SPRAY_VELOCITY_SPREAD = 0.5 # Variação relativa da velocidade (para cada lado)
+swarm = ProjectileSwarm(SWARM_CAPACITY, GRAVITY_PIXEL_PER_SEC2, ground_y_pixel)
 
 # --- Variáveis para cálculo de parâmetros ---
 max_height_reached_pixel = 0 
@@ -96,29 +134,42 @@ initial_launch_y_pixel = 0
 
 time_in_air = 0.0
 
+# Valores previstos pela solução analítica (sem passos de tempo)
+predicted_range_real = 0.0
+predicted_max_height_real = 0.0
+predicted_flight_time = 0.0
+
 # --- Instâncias das Caixas de Input ---
 input_box_vel = InputBox(WIDTH - 150, 10, 140, 32, '10.0', 'Vel. Inicial (m/s):')
 input_box_angle = InputBox(WIDTH - 150, 50, 140, 32, '45.0', 'Ângulo (graus):')
 input_box_height = InputBox(WIDTH - 150, 90, 140, 32, '0.5', 'Altura Inicial (m):')
+# Resistência do ar (bola de beisebol por padrão)
+input_box_drag_coefficient = InputBox(WIDTH - 150, 130, 140, 32, '0.47', 'Cd:')
+input_box_mass = InputBox(WIDTH - 150, 170, 140, 32, '0.145', 'Massa (kg):')
+input_box_area = InputBox(WIDTH - 150, 210, 140, 32, '0.0043', 'Área (m²):')
 
-input_boxes = [input_box_vel, input_box_angle, input_box_height]
+input_boxes = [input_box_vel, input_box_angle, input_box_height,
+               input_box_drag_coefficient, input_box_mass, input_box_area]
 
 
 # --- Função para Resetar o Projétil ao estado pré-lançamento ---
 def reset_projectile(reset_inputs=False):
     global projectile_x_pixel, projectile_y_pixel, velocity_x_pixel_per_sec, \
-           velocity_y_pixel_per_sec, is_launched, trajectory_points, \
-           max_height_reached_pixel, initial_launch_x_pixel, initial_launch_y_pixel, time_in_air
+           velocity_y_pixel_per_sec, is_launched, \
+           max_height_reached_pixel, initial_launch_x_pixel, initial_launch_y_pixel, time_in_air, \
+           projectile, predicted_range_real, predicted_max_height_real, predicted_flight_time
 
     if reset_inputs:
         input_box_vel.text = '10.0'
         input_box_angle.text = '45.0'
         input_box_height.text = '0.5'
+        input_box_drag_coefficient.text = '0.47'
+        input_box_mass.text = '0.145'
+        input_box_area.text = '0.0043'
         
         # Atualiza a superfície de texto das caixas para exibir os novos valores
-        input_box_vel.txt_surface = input_box_vel.font.render(input_box_vel.text, True, LIGHT_GREY)
-        input_box_angle.txt_surface = input_box_angle.font.render(input_box_angle.text, True, LIGHT_GREY)
-        input_box_height.txt_surface = input_box_height.font.render(input_box_height.text, True, LIGHT_GREY)
+        for box in input_boxes:
+            box.txt_surface = box.font.render(box.text, True, LIGHT_GREY)
 
 
     # Pega os valores dos inputs
@@ -145,11 +196,37 @@ def reset_projectile(reset_inputs=False):
     projectile_y_pixel = initial_launch_y_pixel
 
     is_launched = False 
-    trajectory_points.clear() 
+    trajectory.clear() 
 
     max_height_reached_pixel = initial_launch_y_pixel
 
     time_in_air = 0.0
+    timestep.reset()
+
+    # Resistência do ar: coeficientes em metros convertidos para pixels (o linear é em 1/s)
+    drag_parameters = (input_box_drag_coefficient.get_value(), input_box_mass.get_value(), input_box_area.get_value())
+    try:
+        linear_drag, quadratic_drag = projectile_drag.drag_coefficients(drag_model, *drag_parameters)
+    except ValueError as error:
+        print(f"{error} Simulando sem arrasto.")
+        linear_drag, quadratic_drag = 0.0, 0.0
+    # O corpo para sozinho no chão, no instante exato do impacto (recriado: o RK45 guarda o tamanho de passo)
+    projectile = Projectile(projectile_x_pixel, projectile_y_pixel, velocity_x_pixel_per_sec, velocity_y_pixel_per_sec,
+                            GRAVITY_PIXEL_PER_SEC2, ground_y_pixel, linear_drag, quadratic_drag / PIXELS_PER_METER,
+                            integrator_name)
+
+    if initial_height_real >= 0 and (linear_drag or quadratic_drag):
+        # Com arrasto não há forma fechada: um voo integrado com os eventos localizados no passo
+        flight = projectile_drag.fly(make_projectile_rhs(-GRAVITY_REAL, linear_drag, quadratic_drag),
+                                     initial_vel_real, launch_angle_degrees, initial_height_real)
+        predicted_range_real = float(flight['range'])
+        predicted_max_height_real = float(flight['max_height'])
+        predicted_flight_time = float(flight['flight_time'])
+    # Alcance, altura máxima e tempo de voo em forma fechada
+    elif initial_height_real >= 0:
+        predicted_range_real = float(projectile_analytic.horizontal_range(initial_vel_real, launch_angle_degrees, initial_height_real, GRAVITY_REAL))
+        predicted_max_height_real = float(projectile_analytic.max_height(initial_vel_real, launch_angle_degrees, initial_height_real, GRAVITY_REAL))
+        predicted_flight_time = float(projectile_analytic.time_of_flight(initial_vel_real, launch_angle_degrees, initial_height_real, GRAVITY_REAL))
 
 # --- Função para Iniciar o Lançamento ---
 def start_launch():
@@ -162,112 +239,190 @@ def start_launch():
 
     if initial_vel_real > 0 and launch_angle_degrees >= 0 and launch_angle_degrees <= 90:
         is_launched = True
-        trajectory_points.append((int(projectile_x_pixel), int(projectile_y_pixel)))
+        trajectory.append((int(projectile_x_pixel), int(projectile_y_pixel)))
     else:
         print("Valores de entrada inválidos para lançamento (velocidade > 0, ângulo entre 0 e 90).")
         is_launched = False 
 
 
+# --- Lança o leque de projéteis do enxame (grade de ângulos x velocidades) ---
+def spray():
+    initial_vel_real = input_box_vel.get_value()
+    launch_angle_degrees = input_box_angle.get_value()
+    initial_height_real = input_box_height.get_value()
+    if not (initial_vel_real > 0 and 0 <= launch_angle_degrees <= 90):
+        print("Valores de entrada inválidos para lançamento (velocidade > 0, ângulo entre 0 e 90).")
+        return
+
+    n_side = int(math.sqrt(SPRAY_COUNT))
+    angles_degrees = np.clip(np.linspace(launch_angle_degrees - SPRAY_ANGLE_SPREAD, launch_angle_degrees + SPRAY_ANGLE_SPREAD, n_side), 0, 90)
+    velocities_pixel = initial_vel_real * PIXELS_PER_METER * np.linspace(1 - SPRAY_VELOCITY_SPREAD, 1 + SPRAY_VELOCITY_SPREAD, n_side)
+    velocity_grid, angle_grid = np.meshgrid(velocities_pixel, np.radians(angles_degrees))
+    swarm.launch(50, ground_y_pixel - initial_height_real * PIXELS_PER_METER,
+                 velocity_grid * np.cos(angle_grid), -velocity_grid * np.sin(angle_grid))
+
+
+# --- Física do intervalo de tempo real dado ---
+# Devolve (tempo de voo, x, y, vx, vy, pico, pontos do enxame); chamada no frame ou pela
+# thread de física (physics_thread.py).
+def update_physics(seconds):
+    global is_launched
+    if is_launched or len(swarm):
+        # Passos fixos de física até consumir o tempo real dado
+        swarm_seconds = 0.0
+        for n_steps in timestep.batches(seconds):
+            swarm_seconds += n_steps * timestep.physics_dt
+            if not is_launched:
+                continue
+
+            # Atualiza posição e velocidade (em pixels) com o integrador selecionado. O lote
+            # termina antes se o projétil desceu até a linha do chão (também quando foi lançado
+            # do chão): o instante exato é a raiz do interpolante do passo, e a posição e a
+            # velocidade de impacto são interpoladas nele (independe do DT).
+            projectile.step_many(n_steps, timestep.physics_dt)
+            is_launched = not projectile.landed
+
+        # Enxame: um único passo (exato) com todo o tempo simulado
+        swarm.step(swarm_seconds)
+    return (projectile.time, projectile.x, projectile.y, projectile.velocity_x, projectile.velocity_y,
+            projectile.peak, swarm.snapshot())
+
+
 # Botão de Lançamento
-launch_button_rect = pygame.Rect(WIDTH - 150, 130, 140, 40)
-launch_button_text = pygame.font.Font(None, 30).render("LANÇAR", True, BLACK)
+launch_button_rect = pygame.Rect(WIDTH - 150, 250, 140, 40)
+launch_button_text = render_text("LANÇAR", 30, BLACK)
+
+
+# --- Parte estática desenhada por cima do rastro: chão, caixas de input, botão e textos fixos ---
+def draw_ui(surface):
+    pygame.draw.line(surface, GREEN, (0, ground_y_pixel), (WIDTH, ground_y_pixel), 5)
+    for box in input_boxes:
+        box.draw(surface)
+    pygame.draw.rect(surface, GREEN, launch_button_rect)
+    surface.blit(launch_button_text, (launch_button_rect.x + (launch_button_rect.width - launch_button_text.get_width()) // 2,
+                                      launch_button_rect.y + (launch_button_rect.height - launch_button_text.get_height()) // 2))
+    draw_text(surface, "Pressione 'R' para Resetar", 20, WHITE, 10, HEIGHT - 30)
+
+
+# Desenho por retângulos sujos: o rastro é uma camada persistente; só o projétil, as
+# setas, o enxame e o HUD são redesenhados a cada frame
+layers = LayeredScreen(screen, lambda surface: surface.fill(BLACK), [trajectory], draw_ui)
+hud_text = layers.track(draw_text)
 
-# --- Função para renderizar texto na tela ---
-def draw_text(surface, text, font_size, color, x, y):
-    font = pygame.font.Font(None, font_size)
-    text_surface = font.render(text, True, color)
-    surface.blit(text_surface, (x, y))
 
 # --- DESENHAR SETAS ---
 def draw_arrow(surface, color, start_point, end_point, width, arrow_head_size):
     
-    pygame.draw.line(surface, color, start_point, end_point, width)
+    shaft = pygame.draw.line(surface, color, start_point, end_point, width)
     angle = math.atan2(start_point[1] - end_point[1], start_point[0] - end_point[0])
     end_point_x, end_point_y = end_point
 
-    pygame.draw.polygon(surface, color, [
+    return shaft.union(pygame.draw.polygon(surface, color, [
         end_point,
         (end_point_x + arrow_head_size * math.cos(angle + math.pi / 6),
          end_point_y + arrow_head_size * math.sin(angle + math.pi / 6)),
         (end_point_x + arrow_head_size * math.cos(angle - math.pi / 6),
          end_point_y + arrow_head_size * math.sin(angle - math.pi / 6))
-    ])
+    ]))
 
 
 # --- Inicializa o projétil no reset  ---
 reset_projectile(reset_inputs=True)
 
+# Exportação de frames (SIM_EXPORT): sem janela, e a física nunca descarta passos por orçamento
+exporter = None
+if EXPORT_PATH:
+    exporter = FrameExporter(EXPORT_PATH, screen.get_size())
+    timestep.max_update_time = math.inf
+
+# Modo benchmark ou exportação: a simulação começa sozinha
+if BENCH_FRAMES or exporter is not None:
+    start_launch()
+
+# Física no próprio frame ou numa thread (SIM_PHYSICS_THREAD=1; nunca no benchmark e na exportação)
+physics = PhysicsLoop(update_physics, threaded=PHYSICS_THREAD and not BENCH_FRAMES and exporter is None)
+
+# Tempo gasto em cada fase do frame
+profiler = FrameProfiler()
+
 # --- Loop Principal do Jogo ---
 running = True
+frame_seconds = DT # Tempo real do último frame
 while running:
+    profiler.begin_frame()
+
     # 1. Eventos
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+    # Mudanças na simulação (cliques, teclas) esperam o lote de física em andamento na thread
+    events = pygame.event.get()
+    with physics.changes(events):
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
         
-        # Passa o evento para cada caixa de input
-        for box in input_boxes:
-            box.handle_event(event)
+            # Passa o evento para cada caixa de input
+            for box in input_boxes:
+                box.handle_event(event)
+            layers.handle_event(event)
+
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                # Se clicou no botão de lançamento
+                if launch_button_rect.collidepoint(event.pos):
+                    start_launch()
+
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_r: # Se a tecla 'R' for pressionada
+                    reset_projectile(reset_inputs=False) 
+                    swarm.clear()
+                elif event.key == pygame.K_i and not any(box.active for box in input_boxes):
+                    integrator_name = integrators.next_integrator_name(integrator_name)
+                    projectile.set_integrator(integrator_name)
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS) and not any(box.active for box in input_boxes):
+                    timestep.faster()
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS) and not any(box.active for box in input_boxes):
+                    timestep.slower()
+                elif event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
+                elif event.key == pygame.K_s and not any(box.active for box in input_boxes):
+                    spray()
+                elif event.key == pygame.K_d and not any(box.active for box in input_boxes):
+                    drag_model = projectile_drag.next_drag_model(drag_model)
+                    reset_projectile(reset_inputs=False)
+
+
+
+    profiler.mark('events')
 
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            # Se clicou no botão de lançamento
-            if launch_button_rect.collidepoint(event.pos):
-                start_launch()
-
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_r: # Se a tecla 'R' for pressionada
-                reset_projectile(reset_inputs=False) 
+    # 2. Atualização (Lógica da Física)
+    if BENCH_FRAMES and not is_launched:
+        # Modo benchmark: relança ao tocar o chão, para medir sempre o voo
+        start_launch()
 
+    # Projétil e enxame (ou, com a física em thread, só o último estado publicado)
+    profiler.begin_section('update/physics')
+    previous_time_in_air = time_in_air
+    (time_in_air, projectile_x_pixel, projectile_y_pixel, velocity_x_pixel_per_sec, velocity_y_pixel_per_sec,
+     max_height_reached_pixel, swarm_points) = physics.latest(frame_seconds)
+    profiler.end_section()
 
+    # Adiciona o ponto atual à trajetória (um por frame em que o projétil andou; no impacto, o ponto no chão)
+    if time_in_air > previous_time_in_air:
+        profiler.begin_section('update/trail')
+        trajectory.append((int(projectile_x_pixel), int(projectile_y_pixel)))
+        profiler.end_section()
 
-    # 2. Atualização (Lógica da Física)
-    if is_launched:
-        velocity_y_pixel_per_sec += GRAVITY_PIXEL_PER_SEC2 * DT
 
-        # Atualiza a posição (em pixels)
-        projectile_x_pixel += velocity_x_pixel_per_sec * DT
-        projectile_y_pixel += velocity_y_pixel_per_sec * DT
+    profiler.mark('update')
 
-        # Adiciona o ponto atual à trajetória
-        trajectory_points.append((int(projectile_x_pixel), int(projectile_y_pixel)))
-        if len(trajectory_points) > 1000: 
-            trajectory_points.pop(0)
-
-        if projectile_y_pixel < max_height_reached_pixel:
-             max_height_reached_pixel = projectile_y_pixel
-        
-        # Atualiza o tempo de voo
-        time_in_air += DT
-
-        if projectile_y_pixel >= ground_y_pixel and initial_launch_y_pixel < ground_y_pixel:
-            projectile_y_pixel = ground_y_pixel 
-            velocity_x_pixel_per_sec = 0   
-            velocity_y_pixel_per_sec = 0     
-            is_launched = False 
-   
-            if len(trajectory_points) > 0:
-                trajectory_points[-1] = (int(projectile_x_pixel), int(projectile_y_pixel))
-        elif projectile_y_pixel >= ground_y_pixel and is_launched and initial_launch_y_pixel == ground_y_pixel and time_in_air > 0.1: # Pequeno tempo para garantir que subiu e desceu
-            projectile_y_pixel = ground_y_pixel 
-            velocity_x_pixel_per_sec = 0     
-            velocity_y_pixel_per_sec = 0     
-            is_launched = False 
-            if len(trajectory_points) > 0:
-                trajectory_points[-1] = (int(projectile_x_pixel), int(projectile_y_pixel))
-
-
-    # 3. Desenho
-    screen.fill(BLACK) 
-
-    # Desenha o rastro da trajetória
-    if len(trajectory_points) > 1:
-        pygame.draw.lines(screen, BLUE, False, trajectory_points, 2)
+    # 3. Desenho (fundo, rastro, chão, caixas de input e botão vêm prontos da composição)
+    profiler.begin_section('draw/layers')
+    layers.begin_frame()
+    profiler.end_section()
 
     # Desenha o projétil (um círculo vermelho)
     if not is_launched:
-        pygame.draw.circle(screen, RED, (int(initial_launch_x_pixel), int(initial_launch_y_pixel)), 10)
+        layers.add(pygame.draw.circle(screen, RED, (int(initial_launch_x_pixel), int(initial_launch_y_pixel)), 10))
     else:
-        pygame.draw.circle(screen, RED, (int(projectile_x_pixel), int(projectile_y_pixel)), 10)
+        layers.add(pygame.draw.circle(screen, RED, (int(projectile_x_pixel), int(projectile_y_pixel)), 10))
         
         velocity_scale = 0.2 
         arrow_head_size = 7
@@ -277,38 +432,31 @@ while running:
         start_vx = (int(projectile_x_pixel), int(projectile_y_pixel))
         end_vx = (int(projectile_x_pixel + vx_component), int(projectile_y_pixel))
         if abs(vx_component) > 1:
-            draw_arrow(screen, RED, start_vx, end_vx, 2, arrow_head_size)
+            layers.add(draw_arrow(screen, RED, start_vx, end_vx, 2, arrow_head_size))
 
         # Velocidade vertical (eixo Y)
         vy_component = velocity_y_pixel_per_sec * velocity_scale
         start_vy = (int(projectile_x_pixel), int(projectile_y_pixel))
         end_vy = (int(projectile_x_pixel), int(projectile_y_pixel + vy_component))
         if abs(vy_component) > 1: 
-            draw_arrow(screen, YELLOW, start_vy, end_vy, 2, arrow_head_size)
-
+            layers.add(draw_arrow(screen, YELLOW, start_vy, end_vy, 2, arrow_head_size))
 
-    # Desenha o chão 
-    pygame.draw.line(screen, GREEN, (0, ground_y_pixel), (WIDTH, ground_y_pixel), 5)
-
-    # Desenha as caixas de input
-    for box in input_boxes:
-        box.draw(screen)
-    
-    # Desenha o botão de Lançamento
-    pygame.draw.rect(screen, GREEN, launch_button_rect)
-    screen.blit(launch_button_text, (launch_button_rect.x + (launch_button_rect.width - launch_button_text.get_width()) // 2,
-                                     launch_button_rect.y + (launch_button_rect.height - launch_button_text.get_height()) // 2))
+    # Desenha o enxame e os pontos de impacto (em lote, direto nos pixels)
+    profiler.begin_section('draw/swarm')
+    layers.add(swarm.draw(screen, ORANGE, LIGHT_GREY, points=swarm_points))
+    profiler.end_section()
 
 
     # --- Exibir Parâmetros ---
+    profiler.begin_section('draw/hud')
     # Converte de pixels para metros para exibição
     current_x_real = projectile_x_pixel / PIXELS_PER_METER
     current_y_real = (ground_y_pixel - projectile_y_pixel) / PIXELS_PER_METER # Inverte Y
 
     # Calcula o alcance horizontal quando o projétil para
     horizontal_range_real = 0
-    if not is_launched and len(trajectory_points) > 0: 
-        impact_x = trajectory_points[-1][0]
+    if not is_launched and len(trajectory) > 0: 
+        impact_x = projectile_x_pixel
         horizontal_range_real = (impact_x - initial_launch_x_pixel) / PIXELS_PER_METER
         if horizontal_range_real < 0: horizontal_range_real = 0 # Garante que não é negativo
 
@@ -320,20 +468,53 @@ while running:
         max_height_real = initial_real_height_for_display
 
 
-    draw_text(screen, f"Pos (X, Y): ({current_x_real:.2f}m, {current_y_real:.2f}m)", 20, WHITE, 10, 10)
-    draw_text(screen, f"Vel (Vx, Vy): ({velocity_x_pixel_per_sec/PIXELS_PER_METER:.2f}m/s, {-velocity_y_pixel_per_sec/PIXELS_PER_METER:.2f}m/s)", 20, WHITE, 10, 30)
-    draw_text(screen, f"Tempo de Voo: {time_in_air:.2f}s", 20, WHITE, 10, 50)
-    draw_text(screen, f"Alcance Horizontal: {horizontal_range_real:.2f}m", 20, WHITE, 10, 70)
-    draw_text(screen, f"Altura Máxima: {max_height_real:.2f}m", 20, WHITE, 10, 90)
-    draw_text(screen, "Pressione 'R' para Resetar", 20, WHITE, 10, HEIGHT - 30)
+    hud_text(screen, f"Pos (X, Y): ({current_x_real:.2f}m, {current_y_real:.2f}m)", 20, WHITE, 10, 10)
+    hud_text(screen, f"Vel (Vx, Vy): ({velocity_x_pixel_per_sec/PIXELS_PER_METER:.2f}m/s, {-velocity_y_pixel_per_sec/PIXELS_PER_METER:.2f}m/s)", 20, WHITE, 10, 30)
+    hud_text(screen, f"Tempo de Voo: {time_in_air:.2f}s", 20, WHITE, 10, 50)
+    hud_text(screen, f"Alcance Horizontal: {horizontal_range_real:.2f}m", 20, WHITE, 10, 70)
+    hud_text(screen, f"Altura Máxima: {max_height_real:.2f}m", 20, WHITE, 10, 90)
+    hud_text(screen, f"Previsto: alcance {predicted_range_real:.2f}m, altura {predicted_max_height_real:.2f}m, voo {predicted_flight_time:.2f}s", 20, LIGHT_GREY, 10, 110)
+    hud_text(screen, f"Integrador: {integrator_name.upper()} (tecla 'I')", 20, WHITE, 10, 130)
+    hud_text(screen, f"Vel. Simulação: {timestep.time_warp:g}x (teclas '+'/'-')" + (" [atrasado]" if timestep.lagging else "")
+             + (f" [física em thread: {physics.updates_per_second:.0f}/s]" if physics.threaded else ""), 20, WHITE, 10, 150)
+    hud_text(screen, f"Enxame: {len(swarm_points[0])} no ar, {swarm.landed_total} no chão (tecla 'S': +{SPRAY_COUNT})", 20, ORANGE, 10, 170)
+    hud_text(screen, f"Arrasto: {DRAG_MODEL_NAMES[drag_model]} (tecla 'D')", 20, WHITE, 10, 190)
+    profiler.end_section()
+
+    # Sobreposição de tempos por fase (tecla F3)
+    profiler.draw_overlay(screen, hud_text, 10, 220, YELLOW)
+
 
+    profiler.mark('draw')
 
     # Atualiza a tela
-    pygame.display.flip()
+    layers.end_frame()
+    profiler.mark('flip')
+    if exporter is not None:
+        exporter.submit(screen)
+    profiler.end_frame()
+
+    if BENCH_FRAMES or exporter is not None:
+        # Benchmark/exportação: sem espera pelo FPS, e um DT simulado por frame
+        clock.tick()
+        frame_seconds = DT
+        if BENCH_FRAMES:
+            running = running and profiler.frame_count < BENCH_FRAMES
+        if exporter is not None:
+            running = running and exporter.frame_count < EXPORT_FRAMES
+    else:
+        # Controla o FPS
+        frame_seconds = clock.tick(FPS) / 1000
+
 
-    # Controla o FPS
-    clock.tick(FPS)
+physics.close()
+if exporter is not None:
+    exporter.close()
 
+if BENCH_FRAMES and BENCH_OUTPUT:
+    profiler.write_json(BENCH_OUTPUT, script='projectile_motion.py')
+if TRACE_OUTPUT:
+    profiler.write_trace(TRACE_OUTPUT, 'projectile_motion.py')
 
 pygame.quit()
 sys.exit()
\ No newline at end of file
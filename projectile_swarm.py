@@ -0,0 +1,116 @@
+import numpy as np
+import pygame
+
+from integrators import locate_crossing
+from trail import TrailBuffer
+
+# --- Enxame de Projéteis (struct-of-arrays) ---
+# Posições e velocidades de todos os corpos num único array (4, capacidade), na mesma
+# convenção dos integradores ([x, y, vx, vy] no eixo 0). Os corpos no ar ficam sempre
+# compactados em [0, count): um passo atualiza todos de uma vez, e os que tocam o chão
+# saem por compactação vetorizada, sem laço em Python. Os pontos de impacto ficam num
+# buffer circular. O desenho escreve os pixels direto na superfície (surfarray).
+#
+# Com gravidade constante e sem resistência do ar, o passo balístico abaixo é exato para
+# qualquer dt (é o que o Verlet de velocidade calcula nesse caso), então o enxame avança
+# o tempo simulado do frame inteiro num único passo. O ponto de impacto de quem toca o
+# chão vem da raiz exata dentro do passo (integrators.locate_crossing), não do fim do passo.
+
+
+class ProjectileSwarm:
+    def __init__(self, capacity, gravity, ground_y, impact_capacity=20000):
+        # gravity: aceleração em y (positiva = y cresce, como na tela do Pygame)
+        self.capacity = capacity
+        self.gravity = gravity
+        self.ground_y = ground_y
+        self.state = np.empty((4, capacity))
+        self.time_in_air = np.empty(capacity)
+        self.count = 0
+        self.impacts = TrailBuffer(impact_capacity)
+        self.landed_total = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+        self.impacts.clear()
+        self.landed_total = 0
+
+    # --- Lança vários corpos de uma vez (arrays ou escalares com broadcasting) ---
+    def launch(self, x, y, velocity_x, velocity_y):
+        x, y, velocity_x, velocity_y = np.broadcast_arrays(x, y, velocity_x, velocity_y)
+        n = min(x.size, self.capacity - self.count)
+        new = slice(self.count, self.count + n)
+        for row, values in enumerate((x, y, velocity_x, velocity_y)):
+            self.state[row, new] = values.ravel()[:n]
+        self.time_in_air[new] = 0.0
+        self.count += n
+        return n
+
+    # --- Avança todos os corpos no ar por dt; devolve quantos tocaram o chão ---
+    def step(self, dt):
+        n = self.count
+        if n == 0:
+            return 0
+        x, y, velocity_x, velocity_y = self.state[:, :n]
+        y_new = y + velocity_y * dt + 0.5 * self.gravity * dt * dt
+        velocity_y_new = velocity_y + self.gravity * dt
+
+        # Tocou o chão: passou da linha do chão indo no sentido da gravidade
+        down = np.sign(self.gravity)
+        landed = ((y_new - self.ground_y) * down >= 0) & (velocity_y_new * down > 0)
+        n_landed = int(np.count_nonzero(landed))
+        if n_landed:
+            fraction = locate_crossing(y[landed], velocity_y[landed], y_new[landed], velocity_y_new[landed],
+                                       dt, self.ground_y, down)
+            impact_x = x[landed] + velocity_x[landed] * fraction * dt
+            self.impacts.extend(np.column_stack((impact_x, np.full(n_landed, self.ground_y))))
+
+        x += velocity_x * dt
+        y[:] = y_new
+        velocity_y[:] = velocity_y_new
+        self.time_in_air[:n] += dt
+
+        if n_landed:
+            keep = ~landed
+            self.state[:, :n - n_landed] = self.state[:, :n][:, keep]
+            self.time_in_air[:n - n_landed] = self.time_in_air[:n][keep]
+            self.count = n - n_landed
+            self.landed_total += n_landed
+        return n_landed
+
+    # --- Posições dos corpos no ar (visão, sem cópia) ---
+    def positions(self):
+        return self.state[:2, :self.count]
+
+    # --- Cópia dos pontos a desenhar: (posições no ar (n, 2), impactos (m, 2)) ---
+    # Para desenhar numa thread enquanto outra avança o enxame (physics_thread.py).
+    def snapshot(self):
+        return self.positions().T.copy(), self.impacts.ordered()
+
+    # --- Desenho em lote: cada corpo vira um quadrado de size x size pixels ---
+    # Devolve o retângulo que cobre tudo o que foi desenhado (None se nada), para o
+    # desenho por retângulos sujos. points: um snapshot() (padrão: o estado atual).
+    def draw(self, surface, color, impact_color=None, size=2, points=None):
+        airborne, impacts = (self.positions().T, self.impacts.ordered()) if points is None else points
+        width, height = surface.get_size()
+        pixels = pygame.surfarray.pixels2d(surface)
+        drawn = None
+        for points, point_color in ((airborne, color), (impacts, impact_color)):
+            if point_color is None or len(points) == 0:
+                continue
+            x = points[:, 0].astype(np.intp)
+            y = points[:, 1].astype(np.intp)
+            visible = (x >= 0) & (x <= width - size) & (y >= 0) & (y <= height - size)
+            x, y = x[visible], y[visible]
+            if len(x) == 0:
+                continue
+            bounds = pygame.Rect(int(x.min()), int(y.min()), int(x.max() - x.min()) + size, int(y.max() - y.min()) + size)
+            drawn = bounds if drawn is None else drawn.union(bounds)
+            mapped_color = surface.map_rgb(point_color)
+            for offset_x in range(size):
+                for offset_y in range(size):
+                    pixels[x + offset_x, y + offset_y] = mapped_color
+        del pixels # Libera o lock da superfície
+        return drawn
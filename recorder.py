@@ -0,0 +1,225 @@
+import argparse
+import bisect
+import json
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+# --- Gravação do Histórico de Estado em Disco (np.memmap) ---
+# Formato .simrec: cabeçalho fixo de HEADER_SIZE bytes (assinatura, número de registros,
+# número de campos e um JSON com os nomes dos campos e os parâmetros da simulação),
+# seguido dos registros float64 em linhas (tempo, estado...). O arquivo cresce em blocos
+# de CHUNK_RECORDS linhas; nada do histórico fica na RAM além das páginas em uso.
+# Leitura com StateRecording (memmap só leitura) e navegação por tempo com ReplayCursor.
+# A gravação é opcional: sem SIM_RECORD_DIR nada vai para o disco (cada execução gravaria
+# um arquivo sem limite de tamanho).
+#
+# Variáveis de ambiente:
+#   SIM_RECORD_DIR=dir  grava cada execução em dir (padrão: vazio, sem gravação)
+#   SIM_REPLAY=arquivo  abre uma gravação .simrec já existente no replay (tecla 'V')
+# Exemplos:
+#   SIM_RECORD_DIR=recordings python double_pendulum.py
+#   SIM_REPLAY=recordings/double_pendulum_20240101_120000.simrec python double_pendulum.py
+#   python recorder.py recordings/double_pendulum_20240101_120000.simrec -o serie.csv
+
+MAGIC = b'SIMREC01'
+HEADER_FORMAT = '<8sQII' # assinatura, registros, campos, tamanho do JSON
+HEADER_SIZE = 4096
+CHUNK_RECORDS = 65536
+RECORD_DIR = os.environ.get('SIM_RECORD_DIR', '')
+REPLAY_PATH = os.environ.get('SIM_REPLAY') or None
+
+
+# --- Caminho para uma nova gravação (None se a gravação estiver desligada) ---
+def recording_path(prefix, directory=RECORD_DIR):
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.join(directory, f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}")
+    path = stem + '.simrec'
+    suffix = 1
+    while os.path.exists(path):
+        suffix += 1
+        path = f'{stem}_{suffix}.simrec'
+    return path
+
+
+def read_header(path):
+    with open(path, 'rb') as record_file:
+        magic, count, n_fields, json_length = struct.unpack(HEADER_FORMAT, record_file.read(struct.calcsize(HEADER_FORMAT)))
+        if magic != MAGIC:
+            raise ValueError(f"{path} não é uma gravação .simrec.")
+        header = json.loads(record_file.read(json_length))
+    return count, n_fields, header
+
+
+class StateRecorder:
+    def __init__(self, path, fields, metadata=None, chunk_records=CHUNK_RECORDS):
+        self.path = path
+        self.fields = tuple(fields) # O primeiro campo é sempre o tempo
+        self.metadata = metadata or {}
+        self.chunk_records = chunk_records
+        self.count = 0
+        self.capacity = 0
+        self._memmap = self._data = None
+
+        header_json = json.dumps({'fields': list(self.fields), 'metadata': self.metadata}).encode()
+        if struct.calcsize(HEADER_FORMAT) + len(header_json) > HEADER_SIZE:
+            raise ValueError("Cabeçalho da gravação grande demais.")
+        with open(path, 'wb') as record_file:
+            record_file.write(struct.pack(HEADER_FORMAT, MAGIC, 0, len(self.fields), len(header_json)))
+            record_file.write(header_json)
+            record_file.truncate(HEADER_SIZE)
+        self._grow()
+
+    def __len__(self):
+        return self.count
+
+    # --- Aumenta o arquivo em um bloco e remapeia (sem copiar os dados) ---
+    def _grow(self):
+        if self._data is not None:
+            self.flush()
+        self.capacity += self.chunk_records
+        self._memmap = np.memmap(self.path, dtype=np.float64, mode='r+', offset=HEADER_SIZE,
+                                 shape=(self.capacity, len(self.fields)))
+        # Visão ndarray comum do mesmo mapeamento: indexar um np.memmap por linha é bem mais lento
+        self._data = self._memmap.view(np.ndarray)
+
+    def append(self, t, state):
+        if self.count == self.capacity:
+            self._grow()
+        row = self._data[self.count]
+        row[0] = t
+        row[1:] = state
+        self.count += 1
+
+    # --- Grava um bloco de linhas (tempo, estado...) já montado, ex.: o trace de step_many ---
+    def extend(self, rows):
+        start = 0
+        while start < len(rows):
+            if self.count == self.capacity:
+                self._grow()
+            taken = min(len(rows) - start, self.capacity - self.count)
+            self._data[self.count:self.count + taken] = rows[start:start + taken]
+            self.count += taken
+            start += taken
+
+    # --- Registros gravados até agora (visão do memmap, sem cópia) ---
+    @property
+    def records(self):
+        return self._data[:self.count]
+
+    # --- Grava as páginas pendentes e o número de registros no cabeçalho ---
+    def flush(self):
+        self._memmap.flush()
+        with open(self.path, 'r+b') as record_file:
+            record_file.seek(8)
+            record_file.write(struct.pack('<Q', self.count))
+
+    # --- Fecha e corta o espaço reservado e não usado do último bloco ---
+    def close(self):
+        if self._data is None:
+            return
+        self.flush()
+        self._memmap = self._data = None
+        with open(self.path, 'r+b') as record_file:
+            record_file.truncate(HEADER_SIZE + self.count * len(self.fields) * 8)
+
+
+class StateRecording:
+    def __init__(self, path):
+        count, n_fields, header = read_header(path)
+        self.path = path
+        self.fields = tuple(header['fields'])
+        self.metadata = header['metadata']
+        if count:
+            self.records = np.memmap(path, dtype=np.float64, mode='r', offset=HEADER_SIZE, shape=(count, n_fields))
+        else:
+            self.records = np.empty((0, n_fields))
+
+    def __len__(self):
+        return len(self.records)
+
+    def column(self, name):
+        return self.records[:, self.fields.index(name)]
+
+
+# --- Abre uma gravação para o replay de um script (campos iguais aos que o script grava) ---
+def open_recording(path, fields):
+    recording = StateRecording(path)
+    if recording.fields != tuple(fields):
+        raise ValueError(f"{path} tem os campos {', '.join(recording.fields)}; o replay espera {', '.join(fields)}.")
+    if len(recording) == 0:
+        raise ValueError(f"{path} não tem registros.")
+    return recording
+
+
+# --- Cursor de replay: tempo contínuo sobre os registros, com busca binária no memmap ---
+class ReplayCursor:
+    def __init__(self, records):
+        self.records = records
+        self.times = records[:, 0]
+        self.playing = False
+        self.index = len(records) - 1
+        self.time = float(self.times[self.index])
+
+    @property
+    def start_time(self):
+        return float(self.times[0])
+
+    @property
+    def end_time(self):
+        return float(self.times[-1])
+
+    # --- Último registro com tempo <= t (O(log n) leituras do arquivo) ---
+    def seek(self, t):
+        self.time = min(max(t, self.start_time), self.end_time)
+        self.index = max(bisect.bisect_right(self.times, self.time) - 1, 0)
+
+    def seek_relative(self, seconds):
+        self.seek(self.time + seconds)
+
+    def toggle_playing(self):
+        if not self.playing and self.time >= self.end_time:
+            self.seek(self.start_time)
+        self.playing = not self.playing
+
+    # --- Avança o replay pelo tempo simulado do frame (pausa no fim) ---
+    def advance(self, seconds):
+        if self.playing:
+            self.seek(self.time + seconds)
+            if self.time >= self.end_time:
+                self.playing = False
+
+    def current(self):
+        return self.records[self.index].tolist()
+
+    # --- Registros nos índices dados (ex.: pontos do rastro) ---
+    def rows(self, indices):
+        return self.records[indices]
+
+
+def main(argv=None):
+    from headless import write_series
+
+    parser = argparse.ArgumentParser(description="Mostra e exporta uma gravação .simrec.")
+    parser.add_argument('recording', help="Arquivo .simrec")
+    parser.add_argument('-o', '--output', help="Exporta os registros (.csv ou .npy)")
+    args = parser.parse_args(argv)
+
+    recording = StateRecording(args.recording)
+    print(f"Campos: {', '.join(recording.fields)}")
+    print(f"Registros: {len(recording)}")
+    if len(recording):
+        print(f"Tempo: {recording.records[0, 0]:.4f}s a {recording.records[-1, 0]:.4f}s")
+    print(f"Parâmetros: {recording.metadata}")
+    if args.output:
+        write_series(args.output, list(recording.fields), recording.records)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
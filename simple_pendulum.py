@@ -1,11 +1,29 @@
 import pygame
+import os
 import sys
 import math
 
+import numpy as np
+
+import integrators
+import pendulum_analytic
+from bodies import SimplePendulum
+from pendulum_wave import PendulumWave, draw_wave, make_bob_sprites
+from frame_loop import STEP_BATCH, FixedTimestep
+from frame_export import EXPORT_FRAMES, EXPORT_PATH, FrameExporter
+from layers import LayeredScreen
+from physics_thread import PHYSICS_THREAD, PhysicsLoop
+from profiling import BENCH_FRAMES, BENCH_OUTPUT, TRACE_OUTPUT, FrameProfiler
+from recorder import REPLAY_PATH, ReplayCursor, StateRecorder, open_recording, recording_path
+from text_cache import draw_text, get_font, render_text
+
 # --- Configurações Iniciais ---
 WIDTH, HEIGHT = 800, 600
 FPS = 60 # Frames por segundo
 DT = 1 / FPS # Delta de tempo em segundos por frame
+INTEGRATOR = 'verlet' # 'euler', 'rk4', 'verlet' ou 'rk45' (tecla 'I' alterna)
+PHYSICS_SUBSTEPS = 1 # Passos de física por DT
+TIME_WARP = 1.0 # Tempo simulado por segundo real (teclas '+' e '-')
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0) # Bob do Pêndulo
@@ -16,6 +34,12 @@ LIGHT_GREY = (200, 200, 200) # Cor para texto input
 ACTIVE_COLOR = (150, 150, 255) # Cor quando a caixa de input está ativa
 INACTIVE_COLOR = (100, 100, 100) # Cor quando a caixa de input está inativa
 
+# --- Onda de pêndulos (tecla 'W'): quantidades alternadas e área do desenho (vista de cima) ---
+WAVE_COUNTS = (101, 1001) # n - 1 múltiplo das oscilações extras: realinha em 10 e 100 ondas
+WAVE_LEFT, WAVE_RIGHT = 40, WIDTH - 40
+WAVE_CENTER_Y = 420
+WAVE_HALF_HEIGHT = 130 # Maior deslocamento do bob na tela (pixels)
+
 # --- Escala do Mundo Real para Pixels ---
 PIXELS_PER_METER = 50 # 1 metro = 50 pixels (ajuste conforme necessário)
 
@@ -30,6 +54,9 @@ pygame.display.set_caption("Simulação de Pêndulo Simples com Energia")
 
 clock = pygame.time.Clock()
 
+# Passo fixo da física, desacoplado da taxa de quadros
+timestep = FixedTimestep(DT, PHYSICS_SUBSTEPS, TIME_WARP)
+
 # --- Gravidade no mundo real (m/s^2) ---
 GRAVITY_REAL = 9.81 # m/s^2
 
@@ -43,7 +70,7 @@ class InputBox:
         self.color = INACTIVE_COLOR
         self.text = text
         self.label = label 
-        self.font = pygame.font.Font(None, 24) 
+        self.font = get_font(24) 
         self.active = False
         self.txt_surface = self.font.render(text, True, LIGHT_GREY) 
         self.label_surface = self.font.render(label, True, WHITE) 
@@ -97,10 +124,32 @@ bob_radius_pixel = 15
 
 is_simulating = False #
 
+# --- Integrador numérico e corpo simulado (SimplePendulum, avançado com step_many) ---
+integrator_name = INTEGRATOR
+pendulum = None
+
+# --- Modo analítico (tecla 'A'): estado pela solução exata, sem integrar ---
+analytic_mode = False
+analytic_orbit = None # PendulumOrbit a partir do estado do corpo em analytic_start_time
+analytic_start_time = 0.0
+
+# --- Onda de pêndulos (tecla 'W'): PendulumWave no lugar do pêndulo único ---
+wave_count = 0 # 0: pêndulo único
+wave = None
+wave_state = None # Ângulos e velocidades (2, n) mostrados no frame
+wave_sprites = None # Sprites dos bobs (criados depois da tela)
+
 # --- Variáveis para cálculo de parâmetros ---
 max_angle_reached_radians = 0.0 #
 time_since_launch = 0.0
 
+# --- Gravação do histórico de estado em disco (com SIM_RECORD_DIR, uma por execução) e replay (tecla 'V') ---
+RECORD_FIELDS = ('time', 'angle', 'angular_velocity')
+recorder = None
+trace_buffer = np.empty((STEP_BATCH, len(RECORD_FIELDS))) # Estados de um lote, gravados de uma vez
+replay = None # ReplayCursor enquanto o replay está ativo
+replay_recording = None # Gravação aberta com SIM_REPLAY (replay sem execução gravada nesta sessão)
+
 # --- Instâncias das Caixas de Input ---
 # Posição x, y, largura, altura, texto inicial, rótulo
 input_box_length = InputBox(WIDTH - 150, 10, 140, 32, '5.0', 'Comprimento (m):')
@@ -115,7 +164,8 @@ def reset_pendulum(reset_inputs=False):
 
     global pendulum_length_real, pendulum_mass_real, initial_angle_degrees, \
            current_angle_radians, angular_velocity_radians_per_sec, \
-           bob_pos_pixel, is_simulating, max_angle_reached_radians, time_since_launch
+           bob_pos_pixel, is_simulating, max_angle_reached_radians, time_since_launch, \
+           pendulum, replay, wave, wave_state
 
     if reset_inputs:
         input_box_length.text = '5.0'
@@ -140,6 +190,26 @@ def reset_pendulum(reset_inputs=False):
     is_simulating = False # Simulação não está rodando após o reset
     max_angle_reached_radians = abs(current_angle_radians) # A amplitude máxima inicial é o ângulo de lançamento
     time_since_launch = 0.0
+    timestep.reset()
+    replay = None
+    if recorder is not None:
+        recorder.flush()
+
+    # Recria o corpo (o RK45 guarda o tamanho de passo)
+    pendulum = None
+    if pendulum_length_real > 0:
+        pendulum = SimplePendulum(pendulum_length_real, current_angle_radians, angular_velocity_radians_per_sec,
+                                  GRAVITY_REAL, integrator_name)
+        start_analytic_orbit()
+
+    # Onda de pêndulos: o comprimento da caixa é o do mais longo, todos com o mesmo ângulo inicial
+    wave = None
+    wave_state = None
+    if wave_count and pendulum_length_real > 0:
+        wave = PendulumWave.classic(wave_count, pendulum_length_real, current_angle_radians, pendulum_mass_real,
+                                    GRAVITY_REAL, integrator_name)
+        wave.start_orbit()
+        wave_state = wave.state.copy()
 
     # Calcula a posição inicial do bob (para desenhar no estado de repouso)
     bob_x_pixel = pivot_point_pixel[0] + pendulum_length_real * PIXELS_PER_METER * math.sin(current_angle_radians)
@@ -155,127 +225,393 @@ def start_simulation():
     # Verifica se os valores são válidos para iniciar a simulação
     if pendulum_length_real > 0 and pendulum_mass_real > 0 and abs(initial_angle_degrees) <= 170: 
         is_simulating = True
+        if wave is None:
+            start_recording()
     else:
         print("Valores de entrada inválidos para simulação (comprimento > 0, massa > 0, ângulo entre -170 e 170).")
         is_simulating = False 
 
 
 
+# --- Órbita exata que passa pelo estado atual do corpo (usada no modo analítico) ---
+def start_analytic_orbit():
+    global analytic_orbit, analytic_start_time
+    analytic_orbit = pendulum_analytic.PendulumOrbit(pendulum.angle, pendulum.angular_velocity,
+                                                     pendulum.length, pendulum.gravity)
+    analytic_start_time = pendulum.time
+
+
+# --- Abre a gravação da nova execução (a anterior fica completa em disco) ---
+def start_recording():
+    global recorder
+    if recorder is not None:
+        recorder.close()
+        recorder = None
+    path = recording_path('simple_pendulum')
+    if path is not None:
+        recorder = StateRecorder(path, RECORD_FIELDS, {'length': pendulum_length_real, 'mass': pendulum_mass_real,
+                                                       'gravity': GRAVITY_REAL, 'integrator': integrator_name})
+        recorder.append(0.0, (current_angle_radians, angular_velocity_radians_per_sec))
+
+
+# --- Mostra o estado gravado na posição do cursor de replay ---
+def show_replay_frame():
+    global current_angle_radians, angular_velocity_radians_per_sec, time_since_launch, bob_pos_pixel
+    time_since_launch, current_angle_radians, angular_velocity_radians_per_sec = replay.current()
+    bob_x_pixel = pivot_point_pixel[0] + pendulum_length_real * PIXELS_PER_METER * math.sin(current_angle_radians)
+    bob_y_pixel = pivot_point_pixel[1] + pendulum_length_real * PIXELS_PER_METER * math.cos(current_angle_radians)
+    bob_pos_pixel = (int(bob_x_pixel), int(bob_y_pixel))
+
+
+# --- Entra/sai do replay da última gravação (a desta sessão ou, sem ela, a de SIM_REPLAY) ---
+def toggle_replay():
+    global replay, pendulum_length_real, pendulum_mass_real
+    if replay is None:
+        source = recorder if recorder is not None and len(recorder) > 0 else replay_recording
+        if source is None:
+            return
+        if source is replay_recording:
+            # Outra execução: a atual (sem gravação) não continua depois do replay
+            reset_pendulum(reset_inputs=False)
+        replay = ReplayCursor(source.records)
+        pendulum_length_real, pendulum_mass_real = source.metadata['length'], source.metadata['mass']
+        show_replay_frame()
+    elif is_simulating:
+        # Volta ao vivo a partir do último estado gravado (o estado em que a simulação parou)
+        replay.seek(replay.end_time)
+        show_replay_frame()
+        pendulum.time, pendulum.angle, pendulum.angular_velocity = time_since_launch, current_angle_radians, angular_velocity_radians_per_sec
+        start_analytic_orbit()
+        replay = None
+        timestep.reset()
+    else:
+        reset_pendulum(reset_inputs=False)
+
+
+# --- Teclas do replay: espaço (play/pausa), setas (±1 s; Shift: ±10 s), PgUp/PgDn (±10%), Home/End ---
+REPLAY_KEYS = (pygame.K_SPACE, pygame.K_LEFT, pygame.K_RIGHT, pygame.K_PAGEUP, pygame.K_PAGEDOWN, pygame.K_HOME, pygame.K_END)
+
+def handle_replay_key(event):
+    seek_seconds = 10.0 if event.mod & pygame.KMOD_SHIFT else 1.0
+    page_seconds = 0.1 * (replay.end_time - replay.start_time)
+    if event.key == pygame.K_SPACE:
+        replay.toggle_playing()
+    elif event.key == pygame.K_LEFT:
+        replay.seek_relative(-seek_seconds)
+    elif event.key == pygame.K_RIGHT:
+        replay.seek_relative(seek_seconds)
+    elif event.key == pygame.K_PAGEUP:
+        replay.seek_relative(-page_seconds)
+    elif event.key == pygame.K_PAGEDOWN:
+        replay.seek_relative(page_seconds)
+    elif event.key == pygame.K_HOME:
+        replay.seek(replay.start_time)
+    elif event.key == pygame.K_END:
+        replay.seek(replay.end_time)
+    show_replay_frame()
+
+
 # Botão de Lançamento
 start_button_rect = pygame.Rect(WIDTH - 150, 130, 140, 40)
-start_button_text = pygame.font.Font(None, 30).render("INICIAR", True, BLACK)
+start_button_text = render_text("INICIAR", 30, BLACK)
+
+
+# --- Física do intervalo de tempo real dado; devolve (tempo, ângulo, velocidade angular) ---
+# Chamada no frame ou pela thread de física (physics_thread.py).
+def update_physics(seconds):
+    if wave is not None:
+        return update_wave(seconds)
+    if is_simulating and replay is None:
+        # Avança ângulo e velocidade angular com o integrador selecionado, em lotes de
+        # passos fixos (step_many) até consumir o tempo real dado
+        if analytic_mode:
+            # Solução exata nos instantes dos passos do frame (só o último, se não há gravação):
+            # o custo não depende do tempo simulado nem acumula erro
+            n_steps = timestep.advance(seconds)
+            if n_steps:
+                first_step = 1 if recorder is not None else n_steps
+                times = pendulum.time + np.arange(first_step, n_steps + 1) * timestep.physics_dt
+                angles, angular_velocities = analytic_orbit.state_at(times - analytic_start_time)
+                if recorder is not None:
+                    recorder.extend(np.column_stack((times, angles, angular_velocities)))
+                pendulum.time, pendulum.angle, pendulum.angular_velocity = float(times[-1]), float(angles[-1]), float(angular_velocities[-1])
+        else:
+            for n_steps in timestep.batches(seconds):
+                if recorder is not None:
+                    pendulum.step_many(n_steps, timestep.physics_dt, trace_buffer[:n_steps])
+                    recorder.extend(trace_buffer[:n_steps])
+                else:
+                    pendulum.step_many(n_steps, timestep.physics_dt)
+    if pendulum is None:
+        return None
+    return pendulum.time, pendulum.angle, pendulum.angular_velocity
 
-# --- Função para renderizar texto na tela ---
-def draw_text(surface, text, font_size, color, x, y):
-    font = pygame.font.Font(None, font_size)
-    text_surface = font.render(text, True, color)
-    surface.blit(text_surface, (x, y))
 
+# --- Física da onda de pêndulos; devolve (tempo, estado (2, n)) ---
+# Todos os pêndulos avançam juntos (um passo vetorizado); no modo exato, só a solução
+# elíptica no fim do frame, qualquer que seja o time-warp.
+def update_wave(seconds):
+    if is_simulating:
+        if analytic_mode:
+            n_steps = timestep.advance(seconds)
+            if n_steps:
+                wave.advance_exact(n_steps * timestep.physics_dt)
+        else:
+            for n_steps in timestep.batches(seconds):
+                wave.step_many(n_steps, timestep.physics_dt)
+    return wave.snapshot()
+
+
+# --- Camada estática: fundo, pivô, caixas de input, botão e textos fixos ---
+def draw_static(surface):
+    surface.fill(BLACK)
+    pygame.draw.circle(surface, YELLOW, pivot_point_pixel, 5)
+    for box in input_boxes:
+        box.draw(surface)
+    pygame.draw.rect(surface, GREEN, start_button_rect)
+    surface.blit(start_button_text, (start_button_rect.x + (start_button_rect.width - start_button_text.get_width()) // 2,
+                                     start_button_rect.y + (start_button_rect.height - start_button_text.get_height()) // 2))
+    draw_text(surface, "Pressione 'R' para Resetar", 20, WHITE, 10, HEIGHT - 30)
+
+
+# Desenho por retângulos sujos: só o pêndulo e o HUD são redesenhados a cada frame
+layers = LayeredScreen(screen, draw_static)
+hud_text = layers.track(draw_text)
+wave_sprites = make_bob_sprites(3, RED, YELLOW)
 
 # --- Inicializa o pêndulo (para o estado inicial ao abrir o programa) ---
 reset_pendulum(reset_inputs=True)
 
-running = True
-while running:
-    # 1. Eventos
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        
+# Exportação de frames (SIM_EXPORT): sem janela, e a física nunca descarta passos por orçamento
+exporter = None
+if EXPORT_PATH:
+    exporter = FrameExporter(EXPORT_PATH, screen.get_size())
+    timestep.max_update_time = math.inf
 
-        for box in input_boxes:
-            box.handle_event(event)
+# Gravação de outra execução (SIM_REPLAY): abre direto no replay
+if REPLAY_PATH:
+    try:
+        replay_recording = open_recording(REPLAY_PATH, RECORD_FIELDS)
+    except (OSError, ValueError) as error:
+        sys.exit(f"Não foi possível abrir a gravação: {error}")
 
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            if start_button_rect.collidepoint(event.pos):
-                start_simulation()
-
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_r: 
-                reset_pendulum(reset_inputs=False) 
+# Modo benchmark ou exportação: a simulação começa sozinha
+if BENCH_FRAMES or exporter is not None:
+    start_simulation()
+elif replay_recording is not None:
+    toggle_replay()
 
+# Física no próprio frame ou numa thread (SIM_PHYSICS_THREAD=1; nunca no benchmark e na exportação)
+physics = PhysicsLoop(update_physics, threaded=PHYSICS_THREAD and not BENCH_FRAMES and exporter is None)
 
+# Tempo gasto em cada fase do frame
+profiler = FrameProfiler()
 
-    # 2. Atualização (Lógica da Física do Pêndulo)
-    if is_simulating:
-        # Aceleração angular em radianos/segundo^2
-        angular_acceleration = -(GRAVITY_REAL / pendulum_length_real) * math.sin(current_angle_radians)
+running = True
+frame_seconds = DT # Tempo real do último frame
+while running:
+    profiler.begin_frame()
 
-        # Atualiza a velocidade angular (Euler simples)
-        angular_velocity_radians_per_sec += angular_acceleration * DT
+    # 1. Eventos
+    # Mudanças na simulação (cliques, teclas) esperam o lote de física em andamento na thread
+    events = pygame.event.get()
+    with physics.changes(events):
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
+        
 
-        # Atualiza o ângulo (Euler simples)
-        current_angle_radians += angular_velocity_radians_per_sec * DT
+            for box in input_boxes:
+                box.handle_event(event)
+            layers.handle_event(event)
+
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if start_button_rect.collidepoint(event.pos):
+                    start_simulation()
+
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_r: 
+                    reset_pendulum(reset_inputs=False) 
+                elif event.key == pygame.K_i and not any(box.active for box in input_boxes):
+                    integrator_name = integrators.next_integrator_name(integrator_name)
+                    if pendulum is not None:
+                        pendulum.set_integrator(integrator_name)
+                    if wave is not None:
+                        wave.set_integrator(integrator_name)
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS) and not any(box.active for box in input_boxes):
+                    timestep.faster()
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS) and not any(box.active for box in input_boxes):
+                    timestep.slower()
+                elif event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
+                elif event.key == pygame.K_a and not any(box.active for box in input_boxes):
+                    analytic_mode = not analytic_mode
+                    if pendulum is not None:
+                        # Os dois modos continuam do estado atual do corpo
+                        start_analytic_orbit()
+                    if wave is not None:
+                        wave.start_orbit()
+                elif event.key == pygame.K_w and not any(box.active for box in input_boxes):
+                    # Alterna: pêndulo único -> ondas de WAVE_COUNTS -> pêndulo único
+                    counts = (0,) + WAVE_COUNTS
+                    wave_count = counts[(counts.index(wave_count) + 1) % len(counts)]
+                    reset_pendulum(reset_inputs=False)
+                elif event.key == pygame.K_v and wave is None and not any(box.active for box in input_boxes):
+                    toggle_replay()
+                elif replay is not None and event.key in REPLAY_KEYS and not any(box.active for box in input_boxes):
+                    handle_replay_key(event)
+
+
+
+    profiler.mark('events')
 
-        # Atualiza o tempo de simulação
-        time_since_launch += DT
+    # 2. Atualização (Lógica da Física do Pêndulo)
+    if replay is not None:
+        # Replay: o cursor anda pelo tempo simulado do frame, sem integrar nada
+        replay.advance(frame_seconds * timestep.time_warp)
+        show_replay_frame()
+    elif wave is not None:
+        # Onda: todos os ângulos num passo vetorizado (ou, com a física em thread, o último estado)
+        profiler.begin_section('update/physics')
+        time_since_launch, wave_state = physics.latest(frame_seconds)
+        profiler.end_section()
+    elif is_simulating:
+        # Avança ângulo e velocidade angular (ou, com a física em thread, só lê o último estado)
+        profiler.begin_section('update/physics')
+        time_since_launch, current_angle_radians, angular_velocity_radians_per_sec = physics.latest(frame_seconds)
+        profiler.end_section()
 
         # Atualiza a posição do bob
         bob_x_pixel = pivot_point_pixel[0] + pendulum_length_real * PIXELS_PER_METER * math.sin(current_angle_radians)
         bob_y_pixel = pivot_point_pixel[1] + pendulum_length_real * PIXELS_PER_METER * math.cos(current_angle_radians)
         bob_pos_pixel = (int(bob_x_pixel), int(bob_y_pixel))
 
-    # 3. Desenho
-    screen.fill(BLACK) 
-
-    # Desenha o ponto de pivô
-    pygame.draw.circle(screen, YELLOW, pivot_point_pixel, 5)
-
-    # Desenha o fio do pêndulo (do pivô ao bob)
-    pygame.draw.line(screen, BLUE, pivot_point_pixel, bob_pos_pixel, 2)
-
-    # Desenha o bob do pêndulo
-    pygame.draw.circle(screen, RED, bob_pos_pixel, bob_radius_pixel)
-
+    profiler.mark('update')
+
+    # 3. Desenho (a camada estática, com pivô, caixas de input e botão, vem pronta)
+    profiler.begin_section('draw/layers')
+    layers.begin_frame()
+    profiler.end_section()
+
+    if wave is not None:
+        # Onda vista de cima: barra dos pivôs, fios e bobs (blits em lote), o mais longo à esquerda
+        profiler.begin_section('draw/wave')
+        layers.add(pygame.draw.line(screen, YELLOW, (WAVE_LEFT, WAVE_CENTER_Y), (WAVE_RIGHT, WAVE_CENTER_Y), 1))
+        reach = pendulum_length_real * abs(math.sin(current_angle_radians))
+        wave_scale = min(WAVE_HALF_HEIGHT / reach, 4 * PIXELS_PER_METER) if reach > 0 else PIXELS_PER_METER
+        layers.add(draw_wave(screen, wave.lengths, wave_state[0], WAVE_LEFT, WAVE_RIGHT, WAVE_CENTER_Y, wave_scale,
+                             wave_sprites, BLUE))
+        profiler.end_section()
+    else:
+        # Desenha o fio do pêndulo (do pivô ao bob)
+        layers.add(pygame.draw.line(screen, BLUE, pivot_point_pixel, bob_pos_pixel, 2))
 
-    # Desenha as caixas de input
-    for box in input_boxes:
-        box.draw(screen)
-    
-    # Desenha o botão de Iniciar
-    pygame.draw.rect(screen, GREEN, start_button_rect)
-    screen.blit(start_button_text, (start_button_rect.x + (start_button_rect.width - start_button_text.get_width()) // 2,
-                                     start_button_rect.y + (start_button_rect.height - start_button_text.get_height()) // 2))
+        # Desenha o bob do pêndulo
+        layers.add(pygame.draw.circle(screen, RED, bob_pos_pixel, bob_radius_pixel))
 
 
     # --- Exibir Parâmetros e Energias ---
+    profiler.begin_section('draw/hud')
     # Converte radianos para graus para exibição
     current_angle_degrees_display = math.degrees(current_angle_radians)
     angular_velocity_degrees_per_sec_display = math.degrees(angular_velocity_radians_per_sec)
 
     # --- CÁLCULO DAS ENERGIAS ---
-    # Energia Potencial (PE)
-    lowest_bob_y_pixel = pivot_point_pixel[1] + pendulum_length_real * PIXELS_PER_METER
-    height_from_lowest_pixel = lowest_bob_y_pixel - bob_pos_pixel[1] # Diferença positiva para cima
-    height_from_lowest_real = height_from_lowest_pixel / PIXELS_PER_METER
-    potential_energy = pendulum_mass_real * GRAVITY_REAL * height_from_lowest_real
+    if wave is not None:
+        # Onda: energias de todos os pêndulos em arrays, somadas para o HUD
+        wave_potential, wave_kinetic = wave.energies(wave_state)
+        potential_energy = float(wave_potential.sum())
+        kinetic_energy = float(wave_kinetic.sum())
+    else:
+        # Energia Potencial (PE)
+        lowest_bob_y_pixel = pivot_point_pixel[1] + pendulum_length_real * PIXELS_PER_METER
+        height_from_lowest_pixel = lowest_bob_y_pixel - bob_pos_pixel[1] # Diferença positiva para cima
+        height_from_lowest_real = height_from_lowest_pixel / PIXELS_PER_METER
+        potential_energy = pendulum_mass_real * GRAVITY_REAL * height_from_lowest_real
 
-    # Energia Cinética (KE)
-    # Velocidade linear 
-    linear_velocity_real = pendulum_length_real * angular_velocity_radians_per_sec
-    kinetic_energy = 0.5 * pendulum_mass_real * (linear_velocity_real ** 2)
+        # Energia Cinética (KE)
+        # Velocidade linear 
+        linear_velocity_real = pendulum_length_real * angular_velocity_radians_per_sec
+        kinetic_energy = 0.5 * pendulum_mass_real * (linear_velocity_real ** 2)
 
     # Energia Total (TE)
     total_energy = potential_energy + kinetic_energy
 
 
-    draw_text(screen, f"Comprimento: {pendulum_length_real:.2f}m", 20, WHITE, 10, 10)
-    draw_text(screen, f"Massa: {pendulum_mass_real:.2f}kg", 20, WHITE, 10, 30) # Nova linha
-    draw_text(screen, f"Ângulo Atual: {current_angle_degrees_display:.2f}°", 20, WHITE, 10, 50)
-    draw_text(screen, f"Vel. Angular: {angular_velocity_degrees_per_sec_display:.2f}°/s", 20, WHITE, 10, 70)
-    draw_text(screen, f"Tempo Total: {time_since_launch:.2f}s", 20, WHITE, 10, 90)
+    hud_text(screen, f"Comprimento: {pendulum_length_real:.2f}m", 20, WHITE, 10, 10)
+    hud_text(screen, f"Massa: {pendulum_mass_real:.2f}kg", 20, WHITE, 10, 30) # Nova linha
+    if wave is not None:
+        hud_text(screen, f"Onda: {len(wave)} pêndulos, de {wave.lengths[-1]:.2f}m a {wave.lengths[0]:.2f}m", 20, WHITE, 10, 50)
+        hud_text(screen, f"Ondas na fileira: {wave.waves_at(time_since_launch):.2f} (realinha a cada {wave.cycle:.1f}s)",
+                 20, WHITE, 10, 70)
+    else:
+        hud_text(screen, f"Ângulo Atual: {current_angle_degrees_display:.2f}°", 20, WHITE, 10, 50)
+        hud_text(screen, f"Vel. Angular: {angular_velocity_degrees_per_sec_display:.2f}°/s", 20, WHITE, 10, 70)
+    if pendulum_length_real > 0:
+        # Período exato da amplitude inicial (tabela pré-calculada, integral elíptica K)
+        period_seconds = float(pendulum_analytic.period_table().lookup(initial_angle_degrees, pendulum_length_real, GRAVITY_REAL))
+        hud_text(screen, f"Tempo Total: {time_since_launch:.2f}s (Período: {period_seconds:.3f}s)", 20, WHITE, 10, 90)
+    else:
+        hud_text(screen, f"Tempo Total: {time_since_launch:.2f}s", 20, WHITE, 10, 90)
 
     # Exibição das Energias
-    draw_text(screen, f"Energia Potencial: {potential_energy:.2f} J", 20, WHITE, 10, 120)
-    draw_text(screen, f"Energia Cinética: {kinetic_energy:.2f} J", 20, WHITE, 10, 140)
-    draw_text(screen, f"Energia Total: {total_energy:.2f} J", 20, WHITE, 10, 160)
-
-    draw_text(screen, "Pressione 'R' para Resetar", 20, WHITE, 10, HEIGHT - 30)
+    hud_text(screen, f"Energia Potencial: {potential_energy:.2f} J", 20, WHITE, 10, 120)
+    hud_text(screen, f"Energia Cinética: {kinetic_energy:.2f} J", 20, WHITE, 10, 140)
+    if wave is not None:
+        hud_text(screen, f"Energia Total: {total_energy:.2f} J (deriva máx. por pêndulo: {wave.energy_drift(wave_state):.1e})",
+                 20, WHITE, 10, 160)
+    else:
+        hud_text(screen, f"Energia Total: {total_energy:.2f} J", 20, WHITE, 10, 160)
+    integrator_label = "EXATO (funções elípticas)" if analytic_mode else integrator_name.upper()
+    hud_text(screen, f"Integrador: {integrator_label} (teclas 'I'/'A')", 20, WHITE, 10, 190)
+    hud_text(screen, f"Vel. Simulação: {timestep.time_warp:g}x (teclas '+'/'-')" + (" [atrasado]" if timestep.lagging else "")
+             + (f" [física em thread: {physics.updates_per_second:.0f}/s]" if physics.threaded else ""), 20, WHITE, 10, 210)
+
+    if replay is not None:
+        hud_text(screen, f"Replay: {replay.time:.2f}s / {replay.end_time:.2f}s" + ("" if replay.playing else " [pausado]"), 20, YELLOW, 10, 230)
+        hud_text(screen, "Espaço: play/pausa, Setas: ±1s (Shift ±10s), PgUp/PgDn, Home/End, 'V': sair", 20, YELLOW, 10, 250)
+    elif wave is not None:
+        hud_text(screen, "Tecla 'W': onda de pêndulos / pêndulo único", 20, LIGHT_GREY, 10, 230)
+    elif recorder is not None:
+        hud_text(screen, "Gravando (tecla 'V' para replay)", 20, LIGHT_GREY, 10, 230)
+    elif replay_recording is not None:
+        hud_text(screen, f"Tecla 'V': replay de {os.path.basename(replay_recording.path)}", 20, LIGHT_GREY, 10, 230)
+    profiler.end_section()
+
+    # Sobreposição de tempos por fase (tecla F3)
+    profiler.draw_overlay(screen, hud_text, 10, 280, YELLOW)
+
+
+    profiler.mark('draw')
+
+    layers.end_frame()
+    profiler.mark('flip')
+    if exporter is not None:
+        exporter.submit(screen)
+    profiler.end_frame()
+
+    if BENCH_FRAMES or exporter is not None:
+        # Benchmark/exportação: sem espera pelo FPS, e um DT simulado por frame
+        clock.tick()
+        frame_seconds = DT
+        if BENCH_FRAMES:
+            running = running and profiler.frame_count < BENCH_FRAMES
+        if exporter is not None:
+            running = running and exporter.frame_count < EXPORT_FRAMES
+    else:
+        frame_seconds = clock.tick(FPS) / 1000
 
+physics.close()
+if exporter is not None:
+    exporter.close()
 
-    pygame.display.flip()
+if BENCH_FRAMES and BENCH_OUTPUT:
+    profiler.write_json(BENCH_OUTPUT, script='simple_pendulum.py')
+if TRACE_OUTPUT:
+    profiler.write_trace(TRACE_OUTPUT, 'simple_pendulum.py')
 
-    clock.tick(FPS)
+if recorder is not None:
+    recorder.close()
 
 pygame.quit()
 sys.exit()
\ No newline at end of file
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+import headless
+
+# --- Modo headless: casos de borda dos argumentos ---
+# Rodar: python -m pytest -q test_headless.py
+
+
+def run(*argv):
+    args = headless.build_parser().parse_args(argv)
+    return args.run(args)
+
+
+def test_analytic_projectile_with_zero_flight_time():
+    columns, series = run('projectile', '--height', '0', '--angle', '0', '--analytic')
+    assert columns == ['time', 'x', 'y', 'vx', 'vy']
+    assert np.array_equal(series, [[0.0, 0.0, 0.0, 10.0, 0.0]])
+
+
+def test_flip_from_start_angle_beyond_180_degrees():
+    _, beyond = run('double', '--theta1', '200', '--until-flip', '--duration', '30')
+    _, wrapped = run('double', '--theta1', '-160', '--until-flip', '--duration', '30')
+    assert beyond[-1, 0] > 1.0 # Não é o flip "instantâneo" do estado inicial
+    assert np.array_equal(beyond, wrapped)
+
+
+@pytest.mark.parametrize('option, value', [('--dt', '0'), ('--every', '0'), ('--duration', '-1')])
+def test_invalid_step_arguments_are_rejected(option, value, capsys):
+    with pytest.raises(SystemExit):
+        headless.main(['simple', option, value])
+    assert option in capsys.readouterr().err
@@ -0,0 +1,80 @@
+import math
+
+import numpy as np
+import pytest
+
+import integrators
+from bodies import (_EULER, _RK4, _VERLET, DoublePendulum, PendulumChain, SimplePendulum, _chain_kernel,
+                    _double_pendulum_kernel, _simple_pendulum_kernel)
+from jit import JIT_ENABLED, python_version
+
+# --- Laços de step_many: Numba x Python e RK4 x integrators.rk4_step ---
+# Os dois backends fazem as mesmas operações em ponto flutuante (jit.py), então os estados
+# e traces têm que ser iguais bit a bit, não só próximos. Sem o Numba a metade compilada
+# é pulada (a função "compilada" é a própria versão em Python).
+# Rodar: python -m pytest -q test_kernels.py
+
+METHODS = [('euler', _EULER), ('verlet', _VERLET), ('rk4', _RK4)]
+STEPS = 500
+DT = 1 / 240
+
+
+def run_simple(kernel, method):
+    trace = np.empty((STEPS, 3))
+    state = kernel(method, STEPS, DT, 9.81 / 5.0, math.radians(120), 0.3, 0.0, trace, True)
+    return np.array(state), trace
+
+
+def run_double(kernel, method):
+    trace = np.empty((STEPS, 5))
+    state = kernel(method, STEPS, DT, 2.0, 1.5, 1.0, 0.7, 9.81, math.radians(120), math.radians(-10), 0.5, -1.0, 0.0,
+                   trace, True)
+    return np.array(state), trace
+
+
+def run_chain(kernel, method):
+    links = 20
+    lengths = np.linspace(0.1, 0.3, links)
+    inverse_masses = 1 / np.linspace(0.5, 0.05, links)
+    theta = np.linspace(0.2, 1.2, links)
+    omega = np.linspace(-0.5, 0.5, links)
+    trace = np.empty((STEPS, 1 + 2 * links))
+    t = kernel(method, STEPS, DT, lengths, inverse_masses, 9.81, theta, omega, 0.0, trace, True)
+    return np.concatenate(([t], theta, omega)), trace
+
+
+KERNELS = [(run_simple, _simple_pendulum_kernel), (run_double, _double_pendulum_kernel), (run_chain, _chain_kernel)]
+
+
+@pytest.mark.skipif(not JIT_ENABLED, reason="Numba não instalado (ou SIM_JIT=0)")
+@pytest.mark.parametrize('name, method', METHODS)
+@pytest.mark.parametrize('run, kernel', KERNELS, ids=['simple', 'double', 'chain'])
+def test_numba_matches_python(run, kernel, name, method):
+    compiled_state, compiled_trace = run(kernel, method)
+    python_state, python_trace = run(python_version(kernel), method)
+    assert np.all(np.isfinite(compiled_state))
+    assert np.array_equal(compiled_state, python_state)
+    assert np.array_equal(compiled_trace, python_trace)
+
+
+BODIES = {
+    'simple': lambda: SimplePendulum(5.0, math.radians(120), 0.3, integrator='rk4'),
+    'double': lambda: DoublePendulum(2.0, 1.5, 1.0, 0.7, math.radians(120), math.radians(-10), 0.5, -1.0,
+                                     integrator='rk4'),
+    # Elos longos o bastante para cada passo ficar num só subpasso (bodies._chain_substeps);
+    # em run_chain os elos curtos também exercitam os subpassos
+    'chain': lambda: PendulumChain(np.full(20, 0.5), np.linspace(0.5, 0.05, 20), np.linspace(0.2, 1.2, 20),
+                                   np.linspace(-0.5, 0.5, 20), integrator='rk4'),
+}
+
+
+@pytest.mark.parametrize('name', list(BODIES))
+def test_step_many_rk4_matches_rk4_step(name):
+    body = BODIES[name]()
+    rhs = body.derivatives()
+    state, t = body.state, body.time
+    for _ in range(STEPS):
+        state = integrators.rk4_step(rhs, t, state, DT)
+        t += DT
+    body.step_many(STEPS, DT)
+    assert np.array_equal(body.state, state)
@@ -0,0 +1,42 @@
+from collections import OrderedDict
+
+import pygame
+
+# --- Camada de Texto com Cache ---
+# Fontes são criadas uma única vez por tamanho, e as superfícies de texto renderizadas
+# ficam num cache LRU chaveado por (texto, tamanho, cor). Rótulos fixos, como
+# "Pressione 'R' para Resetar", são renderizados uma vez; valores que mudam a cada
+# frame só custam o render, nunca a construção da fonte.
+
+MAX_CACHED_SURFACES = 512
+
+_fonts = {}
+_surfaces = OrderedDict()
+
+
+def get_font(font_size):
+    font = _fonts.get(font_size)
+    if font is None:
+        font = _fonts[font_size] = pygame.font.Font(None, font_size)
+    return font
+
+
+def render_text(text, font_size, color):
+    key = (text, font_size, color)
+    text_surface = _surfaces.get(key)
+    if text_surface is None:
+        text_surface = _surfaces[key] = get_font(font_size).render(text, True, color)
+        if len(_surfaces) > MAX_CACHED_SURFACES:
+            _surfaces.popitem(last=False)
+    else:
+        _surfaces.move_to_end(key)
+    return text_surface
+
+
+# --- Função para renderizar texto na tela ---
+def draw_text(surface, text, font_size, color, x, y):
+    return surface.blit(render_text(text, font_size, color), (x, y))
+
+
+def clear_cache():
+    _surfaces.clear()
@@ -0,0 +1,334 @@
+import numpy as np
+import pygame
+
+# --- Rastro de Trajetória ---
+# TrailBuffer: buffer circular pré-alocado (append em O(1), sem pop(0)).
+# LodTrail: o caminho inteiro em vários níveis de detalhe, com memória limitada. Na chegada,
+# pontos repetidos saem e um ponto colinear com os dois anteriores (mesma direção) só
+# estica o último segmento. O nível 0 guarda os pontos mais recentes como chegaram; cada
+# nível k >= 1 recebe os pontos do nível anterior e os simplifica em blocos por
+# Douglas–Peucker com tolerância base * 2^(k - 1) pixels. Quando um nível enche, a metade
+# mais antiga sai: ela já está, mais simplificada, nos níveis de cima, que cobrem cada vez
+# mais tempo com a mesma capacidade. O último nível não descarta nada: cheio, dobra a
+# própria tolerância e se simplifica de novo (como o desbaste de checkpoints.py), então o
+# caminho inteiro continua visível, cada vez mais grosso na parte mais antiga.
+# polyline(zoom) monta o caminho com o nível mais grosso cujo erro na tela fica abaixo de
+# ZOOM_TOLERANCE pixels para os pontos recentes, e os níveis de cima para o que é mais
+# antigo que ele: com zoom menor, menos pontos.
+# TrailRenderer: superfície persistente onde só o segmento mais novo é desenhado a cada
+# frame; a superfície inteira só é redesenhada (a partir de polyline) ao trocar os pontos,
+# mudar o zoom ou o último nível se simplificar de novo.
+# A área mudada desde a última take_damage() fica acumulada, para o desenho por
+# retângulos sujos (layers.LayeredScreen) compor só essa parte.
+
+TRAIL_COLORKEY = (0, 0, 0)
+
+
+class TrailBuffer:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.points = np.empty((capacity, 2), dtype=np.int32)
+        self.head = 0 # Próxima posição de escrita
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def append(self, point):
+        self.points[self.head] = point
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    # --- Adiciona vários pontos de uma vez (só os últimos capacity cabem) ---
+    def extend(self, points):
+        points = np.asarray(points, dtype=np.int32)[-self.capacity:]
+        indices = (self.head + np.arange(len(points))) % self.capacity
+        self.points[indices] = points
+        self.head = (self.head + len(points)) % self.capacity
+        self.count = min(self.count + len(points), self.capacity)
+
+    # --- Ponto mais recente (index=-1) ou anteriores (-2, -3, ...) ---
+    def last(self, index=-1):
+        if not -self.count <= index < 0:
+            raise IndexError("Índice fora do rastro.")
+        return tuple(self.points[(self.head + index) % self.capacity].tolist())
+
+    # --- Pontos em ordem cronológica (cópia contígua) ---
+    def ordered(self):
+        if self.count < self.capacity:
+            return self.points[:self.count].copy()
+        return np.concatenate((self.points[self.head:], self.points[:self.head]))
+
+
+LOD_CAPACITY = 4096 # Pontos por nível
+LOD_LEVELS = 8
+LOD_CHUNK = 256 # Pontos simplificados de uma vez em cada nível
+LOD_BASE_TOLERANCE = 1.0 # Tolerância do nível 1 (pixels); dobra a cada nível
+ZOOM_TOLERANCE = 0.5 # Erro máximo na tela (pixels) dos pontos recentes em polyline(zoom)
+
+
+# --- Douglas–Peucker: máscara dos pontos mantidos (os extremos sempre ficam) ---
+def douglas_peucker(points, tolerance):
+    points = np.asarray(points, dtype=float)
+    keep = np.zeros(len(points), dtype=bool)
+    if len(points) == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = points[first], points[last]
+        inner = points[first + 1:last] - start
+        chord = end - start
+        length = np.hypot(chord[0], chord[1])
+        if length:
+            distances = np.abs(inner[:, 0] * chord[1] - inner[:, 1] * chord[0]) / length
+        else:
+            distances = np.hypot(inner[:, 0], inner[:, 1])
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            middle = first + 1 + farthest
+            keep[middle] = True
+            stack.append((first, middle))
+            stack.append((middle, last))
+    return keep
+
+
+class _LodLevel:
+    def __init__(self, capacity, tolerance, top=False):
+        self.tolerance = tolerance
+        self.initial_tolerance = tolerance
+        self.top = top # Último nível: simplifica de novo em vez de descartar
+        self.points = np.empty((capacity, 2), dtype=np.int32)
+        self.sequence = np.empty(capacity, dtype=np.int64) # Ordem de chegada de cada ponto
+        self.count = 0
+        self.pending_points = [] # Ainda não simplificados (níveis >= 1)
+        self.pending_sequence = []
+        self.coarsenings = 0 # Vezes que o último nível se simplificou de novo
+
+    def clear(self):
+        self.count = 0
+        self.pending_points.clear()
+        self.pending_sequence.clear()
+        self.tolerance = self.initial_tolerance
+        self.coarsenings = 0
+
+    # --- Acrescenta pontos já aceitos; cheio, descarta a metade mais antiga ---
+    def commit(self, points, sequence):
+        capacity = len(self.points)
+        if self.top:
+            while self.count + len(points) > capacity:
+                self._coarsen()
+        elif self.count + len(points) > capacity:
+            keep = max(capacity // 2 - len(points), 0)
+            self.points[:keep] = self.points[self.count - keep:self.count]
+            self.sequence[:keep] = self.sequence[self.count - keep:self.count]
+            self.count = keep
+            points, sequence = points[-capacity:], sequence[-capacity:]
+        self.points[self.count:self.count + len(points)] = points
+        self.sequence[self.count:self.count + len(points)] = sequence
+        self.count += len(points)
+
+    # --- Dobra a tolerância até caber em metade da capacidade (os extremos sempre ficam) ---
+    def _coarsen(self):
+        target = max(len(self.points) // 2, 2)
+        while True:
+            self.tolerance = max(self.tolerance * 2, LOD_BASE_TOLERANCE)
+            keep = douglas_peucker(self.points[:self.count], self.tolerance)
+            if np.count_nonzero(keep) <= target:
+                break
+        kept = int(np.count_nonzero(keep))
+        self.points[:kept] = self.points[:self.count][keep]
+        self.sequence[:kept] = self.sequence[:self.count][keep]
+        self.count = kept
+        self.coarsenings += 1
+
+    # --- Pontos (e ordem de chegada) em ordem cronológica, incluindo os pendentes ---
+    def ordered(self):
+        points, sequence = self.points[:self.count], self.sequence[:self.count]
+        if self.pending_points:
+            points = np.concatenate((points, np.array(self.pending_points, dtype=np.int32)))
+            sequence = np.concatenate((sequence, np.array(self.pending_sequence, dtype=np.int64)))
+        return points, sequence
+
+
+class LodTrail:
+    def __init__(self, capacity=LOD_CAPACITY, levels=LOD_LEVELS, chunk=LOD_CHUNK, base_tolerance=LOD_BASE_TOLERANCE):
+        self.chunk = min(chunk, capacity // 2)
+        self.levels = [_LodLevel(capacity, 0.0 if level == 0 else base_tolerance * 2 ** (level - 1), level == levels - 1)
+                       for level in range(levels)]
+        self.arrivals = 0 # Pontos aceitos (ordem de chegada do próximo)
+
+    def __len__(self):
+        return self.arrivals
+
+    def clear(self):
+        for level in self.levels:
+            level.clear()
+        self.arrivals = 0
+
+    # --- Último ponto (index=-1) ou o anterior (-2) do nível 0 ---
+    def last(self, index=-1):
+        level = self.levels[0]
+        if not -level.count <= index < 0:
+            raise IndexError("Índice fora do rastro.")
+        return tuple(level.points[level.count + index].tolist())
+
+    # --- Acrescenta um ponto; devolve False se foi descartado (repetido) ---
+    def append(self, point):
+        level = self.levels[0]
+        x, y = int(point[0]), int(point[1])
+        if level.count:
+            last_x, last_y = level.points[level.count - 1]
+            if x == last_x and y == last_y:
+                return False
+            if level.count >= 2:
+                previous_x, previous_y = level.points[level.count - 2]
+                dx1, dy1 = int(last_x - previous_x), int(last_y - previous_y)
+                dx2, dy2 = x - int(last_x), y - int(last_y)
+                if dx1 * dy2 == dy1 * dx2 and dx1 * dx2 + dy1 * dy2 > 0:
+                    # Colinear e no mesmo sentido: o último ponto (ainda não repassado) anda
+                    level.points[level.count - 1] = (x, y)
+                    level.sequence[level.count - 1] = self.arrivals
+                    self.arrivals += 1
+                    return True
+            # O último ponto não muda mais: sobe para o nível 1
+            self._forward(1, level.points[level.count - 1:level.count].copy(), level.sequence[level.count - 1:level.count].copy())
+        level.commit(np.array([[x, y]], dtype=np.int32), np.array([self.arrivals]))
+        self.arrivals += 1
+        return True
+
+    # --- Entrega pontos a um nível >= 1; a cada bloco cheio, simplifica e sobe o resultado ---
+    def _forward(self, index, points, sequence):
+        if index >= len(self.levels):
+            return
+        level = self.levels[index]
+        level.pending_points.extend(points.tolist())
+        level.pending_sequence.extend(sequence.tolist())
+        if len(level.pending_points) < self.chunk:
+            return
+        pending = np.array(level.pending_points, dtype=np.int32)
+        pending_sequence = np.array(level.pending_sequence, dtype=np.int64)
+        level.pending_points.clear()
+        level.pending_sequence.clear()
+        if level.count:
+            # O último ponto já aceito ancora o bloco (continuidade entre blocos)
+            keep = douglas_peucker(np.concatenate((level.points[level.count - 1:level.count], pending)), level.tolerance)[1:]
+        else:
+            keep = douglas_peucker(pending, level.tolerance)
+        level.commit(pending[keep], pending_sequence[keep])
+        self._forward(index + 1, pending[keep], pending_sequence[keep])
+
+    # --- Nível mais grosso cujo erro na tela, com esse zoom, fica dentro de ZOOM_TOLERANCE ---
+    def level_for_zoom(self, zoom):
+        level_index = 0
+        for index, level in enumerate(self.levels):
+            if level.tolerance * zoom <= ZOOM_TOLERANCE:
+                level_index = index
+        return level_index
+
+    # --- Caminho inteiro (n, 2) em ordem cronológica, com o detalhe adequado ao zoom ---
+    def polyline(self, zoom=1.0):
+        index = self.level_for_zoom(zoom)
+        points, sequence = self.levels[index].ordered()
+        parts = [points]
+        if index:
+            # Pontos novos que ainda não subiram até este nível: vêm do nível 0
+            newest = self.levels[0]
+            after = sequence[-1] if len(sequence) else -1
+            tail = newest.sequence[:newest.count] > after
+            parts.append(newest.points[:newest.count][tail])
+            if not len(sequence) and tail.any():
+                sequence = newest.sequence[:newest.count][tail]
+        # Pontos mais antigos que o início deste nível: vêm dos níveis de cima
+        boundary = sequence[0] if len(sequence) else self.arrivals
+        for level in self.levels[index + 1:]:
+            older_points, older_sequence = level.ordered()
+            older = older_sequence < boundary
+            if older.any():
+                parts.insert(0, older_points[older])
+                boundary = older_sequence[older][0]
+        return np.concatenate(parts) if len(parts) > 1 else points.copy()
+
+    # --- Vezes que o último nível se simplificou de novo (o desenho antigo mudou) ---
+    @property
+    def coarsenings(self):
+        return self.levels[-1].coarsenings
+
+
+class TrailRenderer:
+    def __init__(self, size, color, width=1, capacity=LOD_CAPACITY, levels=LOD_LEVELS):
+        self.trail = LodTrail(capacity, levels)
+        self.color = color
+        self.width = width
+        # Vista: ponto = center + (ponto guardado - center) * zoom
+        self.zoom = 1.0
+        self.center = (0, 0)
+        self.surface = pygame.Surface(size).convert() if pygame.display.get_surface() else pygame.Surface(size)
+        self.surface.set_colorkey(TRAIL_COLORKEY)
+        self.surface.fill(TRAIL_COLORKEY)
+        self.coarsenings = 0
+        self.damage = None
+
+    def __len__(self):
+        return len(self.trail)
+
+    def clear(self):
+        self.trail.clear()
+        self.surface.fill(TRAIL_COLORKEY)
+        self.coarsenings = 0
+        self.damage = self.surface.get_rect()
+
+    def _to_screen(self, points):
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        return np.rint(np.asarray(self.center) + (points - np.asarray(self.center)) * self.zoom).astype(np.int32)
+
+    def append(self, point):
+        trail = self.trail
+        if not trail.append(point):
+            return
+        if trail.coarsenings != self.coarsenings:
+            # A parte mais antiga ficou mais grossa: redesenha
+            self.rebuild()
+        elif trail.levels[0].count > 1:
+            # Desenha apenas o segmento novo (em colineares, o segmento esticado)
+            start, end = self._to_screen((trail.last(-2), trail.last(-1))).tolist()
+            segment = pygame.draw.line(self.surface, self.color, start, end, self.width)
+            self.damage = segment if self.damage is None else self.damage.union(segment)
+
+    # --- Troca o rastro inteiro pelos pontos dados (ex.: ao navegar num replay) ---
+    def replace(self, points):
+        self.trail.clear()
+        for point in np.asarray(points).tolist():
+            self.trail.append(point)
+        self.rebuild()
+
+    # --- Muda a vista (zoom em torno de center) e redesenha com o nível adequado ---
+    def set_view(self, zoom, center):
+        self.zoom = zoom
+        self.center = tuple(center)
+        self.rebuild()
+
+    # --- Redesenha a superfície inteira a partir do caminho no nível de detalhe do zoom ---
+    def rebuild(self):
+        self.coarsenings = self.trail.coarsenings
+        self.surface.fill(TRAIL_COLORKEY)
+        points = self.trail.polyline(self.zoom)
+        if len(points) > 1:
+            pygame.draw.lines(self.surface, self.color, False, self._to_screen(points).tolist(), self.width)
+        self.damage = self.surface.get_rect()
+
+    # --- Área mudada desde a última chamada (None se nada mudou) ---
+    def take_damage(self):
+        damage, self.damage = self.damage, None
+        return damage
+
+    def draw(self, surface):
+        surface.blit(self.surface, (0, 0))